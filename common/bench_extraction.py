@@ -0,0 +1,86 @@
+"""Benchmark the shared extraction engine against the previous PDF paths.
+
+Compares, on generated 1, 10 and 100-page PDFs:
+  * pypdf2_concat   - the resume analyzer's old PyPDF2 loop (text += ...)
+  * fitz_concat     - the interview backend's old PyMuPDF loop (text += ...)
+  * shared_serial   - common.extraction, single process (page generator)
+  * shared_parallel - common.extraction, page ranges on the process pool
+
+Usage (from the repository root):
+    python -m common.bench_extraction [--pages 1 10 100] [--repeat 5]
+"""
+import io
+import time
+import argparse
+import statistics
+
+import fitz  # PyMuPDF
+
+from common.extraction import extract_pdf_text, _get_pool
+
+LINE = "Experienced software engineer with Python, FastAPI, SQL and cloud deployment skills."
+
+def make_pdf(pages: int, lines_per_page: int = 45) -> bytes:
+    doc = fitz.open()
+    for number in range(pages):
+        page = doc.new_page()
+        text = "\n".join(f"{number}.{line} {LINE}" for line in range(lines_per_page))
+        page.insert_textbox(fitz.Rect(36, 36, 576, 806), text, fontsize=8)
+    content = doc.tobytes()
+    doc.close()
+    return content
+
+def pypdf2_concat(content: bytes) -> str:
+    import PyPDF2
+    pdf_reader = PyPDF2.PdfReader(io.BytesIO(content))
+    text = ""
+    for page in pdf_reader.pages:
+        text += page.extract_text() + "\n"
+    return text
+
+def fitz_concat(content: bytes) -> str:
+    text = ""
+    with fitz.open(stream=content, filetype="pdf") as pdf:
+        for page in pdf:
+            text += page.get_text()
+    return text.strip()
+
+def shared_serial(content: bytes) -> str:
+    return extract_pdf_text(content, parallel=False)
+
+def shared_parallel(content: bytes) -> str:
+    return extract_pdf_text(content, parallel=True)
+
+METHODS = [pypdf2_concat, fitz_concat, shared_serial, shared_parallel]
+
+def time_method(method, content: bytes, repeat: int) -> list:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        method(content)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    # Start pool workers up front so process spawn is not billed to the first run
+    _get_pool().submit(sum, []).result()
+
+    print(f"{'pages':>5}  {'method':<16}{'median ms':>10}{'min ms':>10}{'pages/s':>10}")
+    for pages in args.pages:
+        content = make_pdf(pages)
+        for method in METHODS:
+            try:
+                timings = time_method(method, content, args.repeat)
+            except ImportError as e:
+                print(f"{pages:>5}  {method.__name__:<16}  skipped ({e})")
+                continue
+            median = statistics.median(timings)
+            print(f"{pages:>5}  {method.__name__:<16}{median * 1000:>10.1f}{min(timings) * 1000:>10.1f}{pages / median:>10.0f}")
+
+if __name__ == "__main__":
+    main()
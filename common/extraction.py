@@ -0,0 +1,152 @@
+"""Document text extraction shared by the interview backend and the resume analyzer.
+
+PDFs are read with PyMuPDF. Page text is produced by a generator rather than
+accumulated into one growing string. Large documents are split into page
+ranges and extracted on a process pool; workers open the document from a
+file path rather than receiving a copy of its bytes with every range. Every
+document is subject to a page cap and a size cap.
+"""
+import io
+import os
+import atexit
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor, wait
+
+import fitz  # PyMuPDF
+import docx
+
+DOC_MAX_PAGES = int(os.getenv("DOC_MAX_PAGES", "200"))
+DOC_MAX_BYTES = int(os.getenv("DOC_MAX_BYTES", str(20 * 1024 * 1024)))
+# Documents with at least this many pages are fanned out across processes
+PARALLEL_PAGE_THRESHOLD = int(os.getenv("DOC_PARALLEL_PAGES", "24"))
+EXTRACTION_WORKERS = int(os.getenv("DOC_EXTRACTION_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+class DocumentTooLarge(ValueError):
+    """Raised when a document exceeds DOC_MAX_BYTES"""
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=EXTRACTION_WORKERS)
+            atexit.register(_pool.shutdown, wait=False, cancel_futures=True)
+        return _pool
+
+def _check_size(path, max_bytes: int = DOC_MAX_BYTES):
+    if os.path.getsize(path) > max_bytes:
+        raise DocumentTooLarge(f"Document exceeds {max_bytes} bytes")
+
+def read_source(source, max_bytes: int = DOC_MAX_BYTES) -> bytes:
+    """Return the raw bytes of a path, bytes object or file-like upload"""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        content = bytes(source)
+    elif isinstance(source, (str, os.PathLike)):
+        _check_size(source, max_bytes)
+        with open(source, "rb") as file:
+            content = file.read()
+    elif hasattr(source, "getvalue"):
+        content = source.getvalue()
+    else:
+        content = source.read()
+    if len(content) > max_bytes:
+        raise DocumentTooLarge(f"Document exceeds {max_bytes} bytes")
+    return content
+
+def _extract_page_range(path: str, start: int, stop: int) -> list:
+    """Worker: text of pages [start, stop) of the PDF at path"""
+    with fitz.open(path, filetype="pdf") as pdf:
+        return [pdf[number].get_text() for number in range(start, stop)]
+
+def iter_pdf_pages(source, max_pages: int = DOC_MAX_PAGES):
+    """Yield the text of each PDF page in order, up to max_pages"""
+    content = read_source(source)
+    with fitz.open(stream=content, filetype="pdf") as pdf:
+        for number in range(min(pdf.page_count, max_pages)):
+            yield pdf[number].get_text()
+
+def iter_pdf_pages_parallel(source, max_pages: int = DOC_MAX_PAGES, workers: int = EXTRACTION_WORKERS,
+                            page_count: int = None):
+    """Like iter_pdf_pages, but extracts contiguous page ranges on the process pool.
+
+    A path source is opened by the workers directly; anything else is written
+    once to a temporary file for them. page_count (already capped at
+    max_pages) saves opening the document here when the caller knows it.
+    """
+    temp_path = None
+    if isinstance(source, (str, os.PathLike)):
+        _check_size(source)
+        path = os.fspath(source)
+    else:
+        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as temp:
+            temp.write(read_source(source))
+        path = temp_path = temp.name
+
+    futures = []
+    try:
+        if page_count is None:
+            with fitz.open(path, filetype="pdf") as pdf:
+                page_count = min(pdf.page_count, max_pages)
+        if page_count == 0:
+            return
+        chunk = -(-page_count // max(workers, 1))
+        pool = _get_pool()
+        futures = [pool.submit(_extract_page_range, path, start, min(start + chunk, page_count))
+                   for start in range(0, page_count, chunk)]
+        for future in futures:
+            yield from future.result()
+    finally:
+        if temp_path is not None:
+            # Workers must be done with the file before it can be removed (Windows keeps it locked)
+            for future in futures:
+                future.cancel()
+            wait(futures)
+            os.remove(temp_path)
+
+def extract_pdf_text(source, max_pages: int = DOC_MAX_PAGES, parallel: bool = None) -> str:
+    """Extract PDF text, fanning out across processes for large documents.
+
+    parallel=None decides by page count (PARALLEL_PAGE_THRESHOLD).
+    """
+    content = read_source(source)
+    with fitz.open(stream=content, filetype="pdf") as pdf:
+        page_count = min(pdf.page_count, max_pages)
+        if parallel is None:
+            parallel = EXTRACTION_WORKERS > 1 and page_count >= PARALLEL_PAGE_THRESHOLD
+        if not parallel:
+            return "".join(pdf[number].get_text() for number in range(page_count)).strip()
+    # Workers can open a path source themselves instead of a temporary copy
+    parallel_source = source if isinstance(source, (str, os.PathLike)) else content
+    return "".join(iter_pdf_pages_parallel(parallel_source, max_pages, page_count=page_count)).strip()
+
+def iter_docx_paragraphs(source):
+    """Yield non-empty paragraph text of a DOCX document"""
+    doc = docx.Document(io.BytesIO(read_source(source)))
+    for para in doc.paragraphs:
+        if para.text.strip():
+            yield para.text
+
+def extract_docx_text(source) -> str:
+    return "\n".join(iter_docx_paragraphs(source)).strip()
+
+def extract_txt_text(source) -> str:
+    return read_source(source).decode("utf-8").strip()
+
+EXTRACTORS = {
+    "pdf": extract_pdf_text,
+    "docx": extract_docx_text,
+    "txt": extract_txt_text
+}
+
+def extract_text(source, filename: str = None) -> str:
+    """Extract text from a PDF, DOCX or TXT source, dispatching on the file extension"""
+    if filename is None:
+        filename = source if isinstance(source, str) else getattr(source, "name", "")
+    file_extension = str(filename).lower().split('.')[-1]
+    extractor = EXTRACTORS.get(file_extension)
+    if extractor is None:
+        raise ValueError(f"Unsupported file format: {file_extension}. Please upload PDF, DOCX, or TXT files.")
+    return extractor(source)
@@ -0,0 +1,160 @@
+"""Scheduling proxy in front of Ollama, shared by every process that generates text.
+
+Generation requests (/api/chat, /api/generate) are admitted through one
+LLMScheduler, so live interview turns are served before queued analysis and
+batch work, whichever process sent them. Callers tag requests with the
+X-LLM-Priority header (interactive, analysis or batch; batch if absent). When
+the queue is full or a request waits longer than LLM_QUEUE_TIMEOUT, the proxy
+answers 429 with Retry-After. Everything else is passed straight through, and
+responses (including NDJSON streams) are relayed as they arrive.
+
+    python -m common.llm_gateway --port 11500 --upstream http://localhost:11434
+    OLLAMA_HOST=http://localhost:11500 uvicorn main:app   # and the Streamlit app
+
+GET /gateway/stats returns the scheduler state as JSON.
+"""
+import json
+import time
+import argparse
+import http.client
+import threading
+from urllib.parse import urlsplit
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from common.llm_scheduler import LLMScheduler, SchedulerBusy, PRIORITIES, PRIORITY_HEADER, LLM_MAX_IN_FLIGHT, LLM_MAX_QUEUE
+
+SCHEDULED_PATHS = ("/api/chat", "/api/generate")
+HOP_BY_HOP = {"connection", "keep-alive", "transfer-encoding", "te", "trailer", "upgrade", "proxy-connection", "content-length", "host"}
+UPSTREAM_TIMEOUT = 600
+
+class GatewayHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    # Set by serve()
+    scheduler = None
+    upstream = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, payload: dict, status: int = 200, headers: dict = None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/gateway/stats":
+            self.send_json(self.scheduler.stats())
+        else:
+            self.forward()
+
+    def do_HEAD(self):
+        self.forward()
+
+    def do_DELETE(self):
+        self.forward()
+
+    def do_POST(self):
+        if self.path.split("?")[0] not in SCHEDULED_PATHS:
+            self.forward()
+            return
+        priority = self.headers.get(PRIORITY_HEADER, "batch").lower()
+        if priority not in PRIORITIES:
+            priority = "batch"
+        # Read the body first so a rejected request leaves the connection usable
+        body = self.read_body()
+        try:
+            self.scheduler.acquire(priority)
+        except SchedulerBusy as e:
+            self.send_json(
+                {"error": f"{e}; retry after {e.retry_after}s", "retry_after": e.retry_after},
+                status=429, headers={"Retry-After": str(e.retry_after)}
+            )
+            return
+        start = time.monotonic()
+        try:
+            self.forward(body)
+        finally:
+            self.scheduler.release(time.monotonic() - start)
+
+    def read_body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def forward(self, body: bytes = None):
+        """Relay the request upstream and stream the response back chunk by chunk"""
+        if body is None:
+            body = self.read_body()
+        headers = {name: value for name, value in self.headers.items()
+                   if name.lower() not in HOP_BY_HOP and name.lower() != PRIORITY_HEADER.lower()}
+        upstream = http.client.HTTPConnection(self.upstream.hostname, self.upstream.port or 80, timeout=UPSTREAM_TIMEOUT)
+        try:
+            upstream.request(self.command, self.path, body=body or None, headers=headers)
+            response = upstream.getresponse()
+        except OSError as e:
+            upstream.close()
+            self.send_json({"error": f"Ollama unreachable: {e}"}, status=502)
+            return
+
+        try:
+            self.send_response(response.status)
+            for name, value in response.getheaders():
+                if name.lower() not in HOP_BY_HOP:
+                    self.send_header(name, value)
+            if self.command == "HEAD" or response.status in (204, 304):
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            while True:
+                chunk = response.read1(65536)
+                if not chunk:
+                    break
+                self.wfile.write(f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n")
+                self.wfile.flush()
+            self.wfile.write(b"0\r\n\r\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            # Client went away mid-stream; closing upstream stops the generation
+            self.close_connection = True
+        finally:
+            upstream.close()
+
+def serve(host: str = "127.0.0.1", port: int = 11500, upstream: str = "http://localhost:11434",
+          scheduler: LLMScheduler = None) -> ThreadingHTTPServer:
+    """Start the gateway on a background thread and return it"""
+    handler = type("ConfiguredGatewayHandler", (GatewayHandler,), {
+        "scheduler": scheduler or LLMScheduler(),
+        "upstream": urlsplit(upstream)
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11500)
+    parser.add_argument("--upstream", default="http://localhost:11434", help="Ollama server URL")
+    parser.add_argument("--max-in-flight", type=int, default=LLM_MAX_IN_FLIGHT, help="concurrent generations (match OLLAMA_NUM_PARALLEL)")
+    parser.add_argument("--max-queue", type=int, default=LLM_MAX_QUEUE)
+    args = parser.parse_args(argv)
+
+    server = serve(args.host, args.port, args.upstream, LLMScheduler(args.max_in_flight, args.max_queue))
+    print(f"LLM gateway on http://{args.host}:{args.port} -> {args.upstream} "
+          f"({args.max_in_flight} in flight, queue {args.max_queue})", flush=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,250 @@
+"""Priority scheduling of LLM generations shared by the interview backend and the resume analyzer.
+
+A generation must hold one of a fixed number of slots (normally Ollama's
+OLLAMA_NUM_PARALLEL). Callers that cannot get a slot wait in a bounded
+queue ordered by priority, then arrival, so live interview turns overtake
+queued analysis and batch work. A full queue, or a wait longer than the
+caller's timeout, raises SchedulerBusy with a retry hint instead of piling
+up requests in front of Ollama.
+
+Each process gets its own scheduler. To coordinate several processes, run
+llm_gateway.py in front of Ollama and point OLLAMA_HOST at it.
+"""
+import os
+import re
+import math
+import time
+import heapq
+import asyncio
+import itertools
+import threading
+from contextlib import contextmanager, asynccontextmanager
+
+PRIORITIES = {"interactive": 0, "analysis": 1, "batch": 2}
+
+LLM_MAX_IN_FLIGHT = int(os.getenv("LLM_MAX_IN_FLIGHT", os.getenv("OLLAMA_NUM_PARALLEL", "2")))
+LLM_MAX_QUEUE = int(os.getenv("LLM_MAX_QUEUE", "32"))
+# Longest a caller waits for a slot before giving up (seconds)
+LLM_QUEUE_TIMEOUT = float(os.getenv("LLM_QUEUE_TIMEOUT", "30"))
+# Header used to pass the priority through llm_gateway.py
+PRIORITY_HEADER = "X-LLM-Priority"
+
+class SchedulerBusy(Exception):
+    """Raised when no generation slot is available; retry_after is in seconds"""
+
+    def __init__(self, message: str, retry_after: int = 1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+def busy_from_error(error: Exception):
+    """SchedulerBusy for an HTTP 429 from an upstream gateway, else None"""
+    status = getattr(error, "status_code", None)
+    if status != 429 and "status code 429" not in str(error):
+        return None
+    match = re.search(r"retry after (\d+)", str(error))
+    return SchedulerBusy("LLM is busy", int(match.group(1)) if match else 1)
+
+class _Waiter:
+    __slots__ = ("priority", "enqueued", "wake", "granted", "abandoned")
+
+    def __init__(self, priority: int, wake):
+        self.priority = priority
+        self.enqueued = time.monotonic()
+        self.wake = wake
+        self.granted = False
+        self.abandoned = False
+
+class LLMScheduler:
+    """Bounded priority queue in front of a fixed number of generation slots.
+
+    Usable from threads (slot()) and from asyncio (aslot()). observer, if
+    given, is called as observer(priority_name, wait_seconds, outcome) with
+    outcome "granted", "rejected" or "timeout".
+    """
+
+    def __init__(self, max_in_flight: int = LLM_MAX_IN_FLIGHT, max_queue: int = LLM_MAX_QUEUE,
+                 queue_timeout: float = LLM_QUEUE_TIMEOUT, observer=None):
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.observer = observer
+        self._lock = threading.Lock()
+        self._heap = []
+        self._sequence = itertools.count()
+        self._in_flight = 0
+        # Moving average of how long a slot is held, for retry hints
+        self._service_seconds = 5.0
+        self.granted = {name: 0 for name in PRIORITIES}
+        self.rejected = {name: 0 for name in PRIORITIES}
+
+    # ---------- core ----------
+
+    def _priority(self, priority) -> tuple:
+        if isinstance(priority, str):
+            if priority not in PRIORITIES:
+                raise ValueError(f"Unknown priority: {priority}. Available: {list(PRIORITIES)}")
+            return priority, PRIORITIES[priority]
+        name = next((key for key, value in PRIORITIES.items() if value == priority), str(priority))
+        return name, priority
+
+    def retry_after(self) -> int:
+        """Seconds until a new request would likely get a slot"""
+        waiting = len(self._heap) + 1
+        return max(1, min(60, math.ceil(self._service_seconds * waiting / self.max_in_flight)))
+
+    def _enqueue(self, name: str, priority: int, wake):
+        """Take a free slot (returns None) or queue a waiter (returns it)"""
+        with self._lock:
+            if self._in_flight < self.max_in_flight and not self._heap:
+                self._in_flight += 1
+                self.granted[name] = self.granted.get(name, 0) + 1
+                return None
+            if len(self._heap) >= self.max_queue:
+                self.rejected[name] = self.rejected.get(name, 0) + 1
+                retry_after = self.retry_after()
+            else:
+                waiter = _Waiter(priority, wake)
+                heapq.heappush(self._heap, (priority, next(self._sequence), waiter))
+                return waiter
+        self._observe(name, 0.0, "rejected")
+        raise SchedulerBusy(f"LLM queue is full ({self.max_queue} waiting)", retry_after)
+
+    def _abandon(self, name: str, waiter: _Waiter) -> bool:
+        """Give up waiting; returns True if the slot was granted in the meantime"""
+        with self._lock:
+            if waiter.granted:
+                return True
+            waiter.abandoned = True
+            self._heap = [entry for entry in self._heap if entry[2] is not waiter]
+            heapq.heapify(self._heap)
+            self.rejected[name] = self.rejected.get(name, 0) + 1
+        self._observe(name, time.monotonic() - waiter.enqueued, "timeout")
+        return False
+
+    def _granted(self, name: str, waiter: _Waiter):
+        with self._lock:
+            self.granted[name] = self.granted.get(name, 0) + 1
+        self._observe(name, time.monotonic() - waiter.enqueued, "granted")
+
+    def release(self, held_seconds: float = None):
+        with self._lock:
+            if held_seconds is not None:
+                self._service_seconds = 0.8 * self._service_seconds + 0.2 * held_seconds
+            while self._heap:
+                _, _, waiter = heapq.heappop(self._heap)
+                if not waiter.abandoned:
+                    # Hand the slot straight to the next waiter
+                    waiter.granted = True
+                    waiter.wake()
+                    return
+            self._in_flight -= 1
+
+    def _observe(self, name: str, seconds: float, outcome: str):
+        if self.observer is not None:
+            self.observer(name, seconds, outcome)
+
+    # ---------- threads ----------
+
+    def acquire(self, priority="batch", timeout: float = None):
+        """Block until a slot is free; raises SchedulerBusy on a full queue or timeout"""
+        name, level = self._priority(priority)
+        event = threading.Event()
+        waiter = self._enqueue(name, level, event.set)
+        if waiter is None:
+            self._observe(name, 0.0, "granted")
+            return
+        timeout = self.queue_timeout if timeout is None else timeout
+        if event.wait(timeout) or self._abandon(name, waiter):
+            self._granted(name, waiter)
+            return
+        raise SchedulerBusy(f"No LLM slot within {timeout:.0f}s", self.retry_after())
+
+    @contextmanager
+    def slot(self, priority="batch", timeout: float = None):
+        self.acquire(priority, timeout)
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(time.monotonic() - start)
+
+    # ---------- asyncio ----------
+
+    async def aacquire(self, priority="interactive", timeout: float = None):
+        name, level = self._priority(priority)
+        loop = asyncio.get_running_loop()
+        ready = loop.create_future()
+
+        def wake():
+            loop.call_soon_threadsafe(lambda: ready.done() or ready.set_result(True))
+
+        waiter = self._enqueue(name, level, wake)
+        if waiter is None:
+            self._observe(name, 0.0, "granted")
+            return
+        timeout = self.queue_timeout if timeout is None else timeout
+        try:
+            await asyncio.wait_for(ready, timeout)
+        except asyncio.TimeoutError:
+            if not self._abandon(name, waiter):
+                raise SchedulerBusy(f"No LLM slot within {timeout:.0f}s", self.retry_after())
+        except asyncio.CancelledError:
+            # A slot handed over while the caller went away must not leak
+            if self._abandon(name, waiter):
+                self.release()
+            raise
+        self._granted(name, waiter)
+
+    @asynccontextmanager
+    async def aslot(self, priority="interactive", timeout: float = None):
+        await self.aacquire(priority, timeout)
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(time.monotonic() - start)
+
+    # ---------- introspection ----------
+
+    def stats(self) -> dict:
+        with self._lock:
+            queued = {name: 0 for name in PRIORITIES}
+            for _, _, waiter in self._heap:
+                name, _ = self._priority(waiter.priority)
+                queued[name] = queued.get(name, 0) + 1
+            return {
+                "in_flight": self._in_flight,
+                "max_in_flight": self.max_in_flight,
+                "queued": queued,
+                "max_queue": self.max_queue,
+                "granted_total": dict(self.granted),
+                "rejected_total": dict(self.rejected),
+                "avg_slot_seconds": round(self._service_seconds, 2)
+            }
+
+def scheduled(generate, priority="batch", scheduler: LLMScheduler = None, timeout: float = None):
+    """Wrap a blocking generate(prompt) callable so every call holds a slot.
+
+    An HTTP 429 from an upstream gateway is raised as SchedulerBusy as well.
+    """
+    def call(prompt):
+        with (scheduler or get_scheduler()).slot(priority, timeout):
+            try:
+                return generate(prompt)
+            except Exception as e:
+                busy = busy_from_error(e)
+                if busy is not None:
+                    raise busy from e
+                raise
+    return call
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+def get_scheduler() -> LLMScheduler:
+    """Process-wide scheduler, created on first use"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = LLMScheduler()
+        return _scheduler
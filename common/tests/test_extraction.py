@@ -0,0 +1,42 @@
+import os
+import tempfile
+
+import pytest
+
+fitz = pytest.importorskip("fitz")
+pytest.importorskip("docx")
+
+from common.extraction import extract_pdf_text, iter_pdf_pages_parallel
+
+def make_pdf(pages: int) -> bytes:
+    doc = fitz.open()
+    for number in range(pages):
+        doc.new_page().insert_text((72, 72), f"Page {number} of the sample document")
+    content = doc.tobytes()
+    doc.close()
+    return content
+
+@pytest.fixture(scope="module")
+def pdf_bytes():
+    return make_pdf(30)
+
+def test_parallel_matches_serial(pdf_bytes):
+    assert extract_pdf_text(pdf_bytes, parallel=True) == extract_pdf_text(pdf_bytes, parallel=False)
+    assert "Page 29 of" in extract_pdf_text(pdf_bytes, parallel=True)
+
+def test_page_cap_applies_to_both_paths(pdf_bytes):
+    for parallel in (False, True):
+        text = extract_pdf_text(pdf_bytes, max_pages=5, parallel=parallel)
+        assert "Page 4 of" in text and "Page 5 of" not in text
+
+def test_parallel_from_bytes_leaves_no_temporary_file(pdf_bytes):
+    before = set(os.listdir(tempfile.gettempdir()))
+    pages = iter_pdf_pages_parallel(pdf_bytes, workers=3)
+    assert next(pages).startswith("Page 0")
+    pages.close()
+    assert set(os.listdir(tempfile.gettempdir())) - before == set()
+
+def test_parallel_reads_paths_in_place(pdf_bytes, tmp_path):
+    path = tmp_path / "sample.pdf"
+    path.write_bytes(pdf_bytes)
+    assert len(list(iter_pdf_pages_parallel(str(path), workers=2))) == 30
@@ -0,0 +1,79 @@
+import json
+import time
+import asyncio
+import threading
+import http.client
+
+import pytest
+
+from common.llm_scheduler import LLMScheduler, SchedulerBusy, busy_from_error, PRIORITY_HEADER
+
+def test_waiters_are_served_by_priority_then_arrival():
+    async def run():
+        scheduler = LLMScheduler(max_in_flight=1, max_queue=10, queue_timeout=5)
+        order = []
+        await scheduler.aacquire("batch")
+
+        async def turn(name, priority):
+            async with scheduler.aslot(priority):
+                order.append(name)
+
+        tasks = [asyncio.create_task(turn(name, priority)) for name, priority in
+                 (("batch-1", "batch"), ("analysis", "analysis"), ("interactive", "interactive"), ("batch-2", "batch"))]
+        await asyncio.sleep(0)
+        assert scheduler.stats()["queued"] == {"interactive": 1, "analysis": 1, "batch": 2}
+        scheduler.release()
+        await asyncio.gather(*tasks)
+        return order, scheduler.stats()
+
+    order, stats = asyncio.run(run())
+    assert order == ["interactive", "analysis", "batch-1", "batch-2"]
+    assert stats["in_flight"] == 0
+
+def test_full_queue_is_rejected_with_a_retry_hint():
+    scheduler = LLMScheduler(max_in_flight=1, max_queue=1, queue_timeout=5)
+    scheduler.acquire("interactive")
+    waiter = threading.Thread(target=scheduler.acquire, args=("batch",))
+    waiter.start()
+    while not scheduler.stats()["queued"]["batch"]:
+        time.sleep(0.001)
+    with pytest.raises(SchedulerBusy) as busy:
+        scheduler.acquire("interactive")
+    assert busy.value.retry_after >= 1
+    assert scheduler.stats()["rejected_total"]["interactive"] == 1
+    # The slot passes straight to the queued request
+    scheduler.release()
+    waiter.join(timeout=5)
+    stats = scheduler.stats()
+    assert stats["in_flight"] == 1 and stats["queued"]["batch"] == 0
+
+def test_wait_past_the_timeout_gives_up_and_leaves_the_queue():
+    scheduler = LLMScheduler(max_in_flight=1, max_queue=4)
+    scheduler.acquire("interactive")
+    with pytest.raises(SchedulerBusy):
+        scheduler.acquire("batch", timeout=0.05)
+    assert scheduler.stats()["queued"]["batch"] == 0
+    scheduler.release()
+    assert scheduler.stats()["in_flight"] == 0
+
+def test_gateway_answers_429_with_retry_after():
+    from common.llm_gateway import serve
+
+    scheduler = LLMScheduler(max_in_flight=1, max_queue=0)
+    scheduler.acquire("interactive")
+    # The upstream is never contacted for a rejected request
+    server = serve(port=0, upstream="http://127.0.0.1:9", scheduler=scheduler)
+    try:
+        connection = http.client.HTTPConnection(*server.server_address, timeout=5)
+        connection.request("POST", "/api/generate", body=b"{}", headers={PRIORITY_HEADER: "batch"})
+        response = connection.getresponse()
+        payload = json.loads(response.read())
+        assert response.status == 429
+        assert int(response.getheader("Retry-After")) == payload["retry_after"] >= 1
+    finally:
+        server.shutdown()
+
+def test_upstream_429_becomes_scheduler_busy():
+    busy = busy_from_error(RuntimeError("Ollama call failed with status code 429: queue full; retry after 7s"))
+    assert isinstance(busy, SchedulerBusy) and busy.retry_after == 7
+    assert busy_from_error(RuntimeError("status code 500")) is None
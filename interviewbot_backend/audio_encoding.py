@@ -0,0 +1,128 @@
+import os
+import wave
+import shutil
+import logging
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Preferred compact codecs, tried in order: (extension, ffmpeg codec arguments)
+AUDIO_CODECS = [
+    (".ogg", ["-c:a", "libopus", "-b:a", os.getenv("AUDIO_OPUS_BITRATE", "24k"), "-application", "voip"]),
+    (".mp3", ["-c:a", "libmp3lame", "-b:a", os.getenv("AUDIO_MP3_BITRATE", "48k")]),
+]
+AUDIO_ENCODE_WORKERS = int(os.getenv("AUDIO_ENCODE_WORKERS", "2"))
+# Delivery preference when several encodings of a clip exist
+AUDIO_EXTENSIONS = [".ogg", ".mp3", ".wav", ".aiff"]
+
+MEDIA_TYPES = {
+    ".ogg": "audio/ogg",
+    ".mp3": "audio/mpeg",
+    ".wav": "audio/wav",
+    ".aiff": "audio/aiff"
+}
+
+def sniff_media_type(path: str) -> str:
+    """Media type from the file header (TTS engines ignore the requested extension)"""
+    with open(path, "rb") as file:
+        header = file.read(12)
+    if header.startswith(b"RIFF") and header[8:12] == b"WAVE":
+        return "audio/wav"
+    if header.startswith(b"OggS"):
+        return "audio/ogg"
+    if header.startswith(b"FORM"):
+        return "audio/aiff"
+    if header.startswith(b"ID3") or header[:2] in (b"\xff\xfb", b"\xff\xf3", b"\xff\xf2"):
+        return "audio/mpeg"
+    return MEDIA_TYPES.get(os.path.splitext(path)[1].lower(), "application/octet-stream")
+
+def find_clip(base_path: str) -> str:
+    """Best available encoding of a clip given its path without extension, or None"""
+    for extension in AUDIO_EXTENSIONS:
+        if os.path.exists(base_path + extension):
+            return base_path + extension
+    return None
+
+def concat_wav(paths: list, dest_path: str) -> str:
+    """Join WAV clips into dest_path, in order; returns dest_path, or None if they are not WAVs of one format"""
+    tmp_path = f"{os.path.splitext(dest_path)[0]}.{os.getpid()}.tmp.wav"
+    try:
+        with wave.open(tmp_path, "wb") as joined:
+            params = None
+            for path in paths:
+                with wave.open(path, "rb") as clip:
+                    clip_params = (clip.getnchannels(), clip.getsampwidth(), clip.getframerate())
+                    if params is None:
+                        params = clip_params
+                        joined.setnchannels(params[0])
+                        joined.setsampwidth(params[1])
+                        joined.setframerate(params[2])
+                    elif clip_params != params:
+                        raise wave.Error(f"{path} does not match the format of the first clip")
+                    joined.writeframes(clip.readframes(clip.getnframes()))
+            if params is None:
+                raise wave.Error("No clips to join")
+        os.replace(tmp_path, dest_path)
+        return dest_path
+    except (wave.Error, EOFError, OSError) as e:
+        logger.warning(f"[ENCODE] Could not join clips into {dest_path}: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return None
+
+class AudioEncoder:
+    """Background re-encoding of synthesized WAV clips into a compact codec with ffmpeg.
+
+    If ffmpeg (or every codec) is unavailable, clips are simply served as WAV.
+    """
+
+    def __init__(self, workers: int = AUDIO_ENCODE_WORKERS):
+        self.ffmpeg = shutil.which(os.getenv("FFMPEG_BINARY", "ffmpeg"))
+        self.codecs = list(AUDIO_CODECS)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="encode") if self.ffmpeg else None
+        if not self.ffmpeg:
+            logger.warning("⚠️ ffmpeg not found. Audio clips will be served uncompressed.")
+
+    @property
+    def available(self) -> bool:
+        return self._executor is not None and bool(self.codecs)
+
+    def encoded_path(self, source_path: str) -> str:
+        """Existing compact encoding of source_path, or None"""
+        base = os.path.splitext(source_path)[0]
+        for extension, _ in AUDIO_CODECS:
+            if os.path.exists(base + extension):
+                return base + extension
+        return None
+
+    def encode(self, source_path: str) -> str:
+        """Encode source_path next to itself; returns the new path or None"""
+        base = os.path.splitext(source_path)[0]
+        for extension, arguments in list(self.codecs):
+            target = base + extension
+            tmp_path = f"{base}.{os.getpid()}.tmp{extension}"
+            command = [self.ffmpeg, "-nostdin", "-loglevel", "error", "-y", "-i", source_path, "-ac", "1", *arguments, tmp_path]
+            try:
+                subprocess.run(command, check=True, capture_output=True, timeout=60)
+                os.replace(tmp_path, target)
+                return target
+            except (subprocess.CalledProcessError, subprocess.TimeoutExpired, OSError) as e:
+                stderr = getattr(e, "stderr", b"") or b""
+                logger.warning(f"[ENCODE] {extension} encoding failed: {stderr.decode(errors='ignore').strip() or str(e)}")
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                if b"Unknown encoder" in stderr:
+                    # This ffmpeg build lacks the codec; stop trying it
+                    self.codecs = [codec for codec in self.codecs if codec[0] != extension]
+        return None
+
+    def submit(self, source_path: str):
+        """Queue encoding of source_path; returns a Future or None if encoding is unavailable"""
+        if not self.available:
+            return None
+        return self._executor.submit(self.encode, source_path)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
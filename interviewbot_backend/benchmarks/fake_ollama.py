@@ -0,0 +1,170 @@
+"""
+Stand-in Ollama HTTP server for benchmarks.
+
+Implements the parts of the Ollama API the backend uses (/api/chat and
+/api/generate, streamed as NDJSON or not, plus /api/tags, /api/show and
+/api/version) and produces a canned interviewer reply at a configurable
+pace, so load tests measure the backend rather than the model.
+
+    python fake_ollama.py --port 11435 --latency 0.2 --token-rate 40 --tokens 60
+"""
+import json
+import time
+import argparse
+import threading
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+MODELS = ["llama3.2", "llama3"]
+
+REPLY = (
+    "Thanks, that is a helpful overview of your background. "
+    "Could you walk me through a recent project where you owned the design end to end? "
+    "What trade-offs did you make, and how did you measure whether it worked? "
+    "Please also tell me how you handled disagreements with your team along the way."
+)
+
+def reply_tokens(count: int) -> list:
+    """count word-sized tokens of the canned reply (repeated as needed)"""
+    words = REPLY.split(" ")
+    return [words[i % len(words)] + " " for i in range(count)]
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+class FakeOllamaHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    # Set by serve()
+    latency = 0.2
+    token_rate = 40.0
+    tokens = 60
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, payload: dict, status: int = 200):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_chunk(self, payload: dict):
+        line = json.dumps(payload).encode("utf-8") + b"\n"
+        self.wfile.write(f"{len(line):x}\r\n".encode() + line + b"\r\n")
+        self.wfile.flush()
+
+    def read_json(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def do_GET(self):
+        if self.path == "/api/tags":
+            self.send_json({"models": [{"name": f"{name}:latest", "model": f"{name}:latest", "size": 0} for name in MODELS]})
+        elif self.path == "/api/version":
+            self.send_json({"version": "0.0.0-fake"})
+        elif self.path == "/":
+            self.send_json({"status": "Ollama is running"})
+        else:
+            self.send_json({"error": "not found"}, status=404)
+
+    def do_POST(self):
+        request = self.read_json()
+        if self.path == "/api/chat":
+            prompt = "".join(str(message.get("content", "")) for message in request.get("messages", []))
+            self.generate(request, prompt, chat=True)
+        elif self.path == "/api/generate":
+            self.generate(request, str(request.get("prompt", "")), chat=False)
+        elif self.path == "/api/show":
+            self.send_json({"modelfile": "", "parameters": "", "template": "", "details": {"family": "llama"}})
+        else:
+            self.send_json({"error": "not found"}, status=404)
+
+    def generate(self, request: dict, prompt: str, chat: bool):
+        model = request.get("model", MODELS[0])
+        start = time.perf_counter()
+        # Prompt evaluation before the first token
+        time.sleep(self.latency)
+        prompt_done = time.perf_counter()
+        tokens = reply_tokens(self.tokens)
+
+        def chunk(text: str, done: bool) -> dict:
+            payload = {"model": model, "created_at": datetime.now(timezone.utc).isoformat(), "done": done}
+            if chat:
+                payload["message"] = {"role": "assistant", "content": text}
+            else:
+                payload["response"] = text
+            return payload
+
+        def final() -> dict:
+            end = time.perf_counter()
+            payload = chunk("", True)
+            payload.update({
+                "done_reason": "stop",
+                "total_duration": int((end - start) * 1e9),
+                "load_duration": 0,
+                "prompt_eval_count": estimate_tokens(prompt),
+                "prompt_eval_duration": int((prompt_done - start) * 1e9),
+                "eval_count": len(tokens),
+                "eval_duration": int((end - prompt_done) * 1e9)
+            })
+            return payload
+
+        interval = 1.0 / self.token_rate if self.token_rate > 0 else 0.0
+        if request.get("stream", True):
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            try:
+                for token in tokens:
+                    time.sleep(interval)
+                    self.send_chunk(chunk(token, False))
+                self.send_chunk(final())
+                self.wfile.write(b"0\r\n\r\n")
+                self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                self.close_connection = True
+        else:
+            time.sleep(interval * len(tokens))
+            payload = final()
+            content = "".join(tokens).strip()
+            if chat:
+                payload["message"]["content"] = content
+            else:
+                payload["response"] = content
+            self.send_json(payload)
+
+def serve(host: str = "127.0.0.1", port: int = 11435, latency: float = 0.2,
+          token_rate: float = 40.0, tokens: int = 60) -> ThreadingHTTPServer:
+    """Start the fake server on a background thread and return it"""
+    handler = type("ConfiguredHandler", (FakeOllamaHandler,), {
+        "latency": latency, "token_rate": token_rate, "tokens": tokens
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds before the first token")
+    parser.add_argument("--token-rate", type=float, default=40.0, help="tokens per second (0 = unthrottled)")
+    parser.add_argument("--tokens", type=int, default=60, help="tokens per reply")
+    args = parser.parse_args(argv)
+
+    server = serve(args.host, args.port, args.latency, args.token_rate, args.tokens)
+    print(f"Fake Ollama on http://{args.host}:{args.port} "
+          f"({args.latency}s latency, {args.token_rate} tok/s, {args.tokens} tokens)", flush=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
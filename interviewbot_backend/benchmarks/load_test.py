@@ -0,0 +1,369 @@
+"""
+End-to-end load test for the interview backend.
+
+Starts the fake Ollama server (fake_ollama.py) and the FastAPI app in
+subprocesses, with TTS rendering silence (TTS_ENGINE=silent) and a fixed
+transcript instead of speech recognition (STT_BACKEND=stub). It then runs
+concurrent interviews - upload a resume, answer N questions, end the
+session - and reports throughput, p50/p95/p99 latency per endpoint and the
+server's memory growth per session.
+
+    python benchmarks/load_test.py --sessions 50 --concurrency 10 --turns 3
+    python benchmarks/load_test.py --stream --token-rate 25 --json baseline.json
+    python benchmarks/load_test.py --url http://127.0.0.1:8000 --server-pid 1234
+
+Run it from interviewbot_backend. The server runs in a scratch directory, so
+uploads and audio do not end up in the working tree.
+"""
+import io
+import os
+import sys
+import json
+import time
+import wave
+import socket
+import asyncio
+import argparse
+import tempfile
+import subprocess
+from collections import defaultdict
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FAKE_OLLAMA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_ollama.py")
+
+RESUME = """Jane Doe - Backend Engineer
+Experience: 5 years building Python services with FastAPI, Django and PostgreSQL.
+Led the migration of a payments platform to Kubernetes on AWS, cutting p95 latency by 40%.
+Projects: real-time analytics pipeline (Kafka, Spark), internal LLM evaluation tooling.
+Skills: Python, SQL, Docker, Kubernetes, Terraform, Redis, REST API design, CI/CD.
+"""
+
+def silent_wav(seconds: float = 1.0, sample_rate: int = 16000) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as clip:
+        clip.setnchannels(1)
+        clip.setsampwidth(2)
+        clip.setframerate(sample_rate)
+        clip.writeframes(b"\0\0" * int(sample_rate * seconds))
+    return buffer.getvalue()
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def process_rss(pid: int) -> int:
+    """Resident set size of a process in bytes, or None if it cannot be read"""
+    if pid is None:
+        return None
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        import psutil
+        return psutil.Process(pid).memory_info().rss
+    except Exception:
+        return None
+
+def percentile(values: list, q: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(q / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+class Recorder:
+    """Per-endpoint latencies and error counts"""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def record(self, endpoint: str, seconds: float, ok: bool = True):
+        if ok:
+            self.latencies[endpoint].append(seconds)
+        else:
+            self.errors[endpoint] += 1
+
+    def summary(self) -> dict:
+        summary = {}
+        for endpoint in sorted(set(self.latencies) | set(self.errors)):
+            values = self.latencies.get(endpoint, [])
+            summary[endpoint] = {
+                "count": len(values),
+                "errors": self.errors.get(endpoint, 0),
+                "p50_ms": round(percentile(values, 50) * 1000, 1),
+                "p95_ms": round(percentile(values, 95) * 1000, 1),
+                "p99_ms": round(percentile(values, 99) * 1000, 1),
+                "max_ms": round(max(values, default=0) * 1000, 1)
+            }
+        return summary
+
+class MemorySampler:
+    """Polls server RSS and /sessions/stats to track peak memory against live sessions"""
+
+    def __init__(self, client: httpx.AsyncClient, pid: int, interval: float = 0.25):
+        self.client = client
+        self.pid = pid
+        self.interval = interval
+        self.peak_rss = None
+        self.peak_sessions = 0
+        self.peak_session_bytes = 0
+
+    def sample_rss(self):
+        rss = process_rss(self.pid)
+        if rss is not None:
+            self.peak_rss = max(self.peak_rss or 0, rss)
+        return rss
+
+    async def run(self):
+        while True:
+            self.sample_rss()
+            try:
+                stats = (await self.client.get("/sessions/stats")).json()
+                self.peak_sessions = max(self.peak_sessions, stats.get("active_sessions", 0))
+                self.peak_session_bytes = max(self.peak_session_bytes, stats.get("memory_used_bytes", 0))
+            except (httpx.HTTPError, ValueError):
+                pass
+            await asyncio.sleep(self.interval)
+
+async def timed(recorder: Recorder, endpoint: str, request):
+    start = time.perf_counter()
+    try:
+        response = await request
+    except httpx.HTTPError:
+        recorder.record(endpoint, time.perf_counter() - start, ok=False)
+        return None
+    recorder.record(endpoint, time.perf_counter() - start, ok=response.status_code < 400)
+    return response if response.status_code < 400 else None
+
+async def ask_stream(client: httpx.AsyncClient, recorder: Recorder, session_id: str, answer: bytes) -> bool:
+    """One /ask_stream/ turn; records total time plus time to first token and first audio clip"""
+    start = time.perf_counter()
+    first_token = first_audio = None
+    ok = False
+    try:
+        async with client.stream("POST", "/ask_stream/", data={"session_id": session_id},
+                                 files={"user_answer_audio": ("answer.wav", answer, "audio/wav")}) as response:
+            if response.status_code >= 400:
+                recorder.record("POST /ask_stream/", time.perf_counter() - start, ok=False)
+                return False
+            async for line in response.aiter_lines():
+                if line == "event: token" and first_token is None:
+                    first_token = time.perf_counter() - start
+                elif line == "event: audio" and first_audio is None:
+                    first_audio = time.perf_counter() - start
+                elif line == "event: done":
+                    ok = True
+                elif line == "event: error":
+                    ok = False
+    except httpx.HTTPError:
+        pass
+    recorder.record("POST /ask_stream/", time.perf_counter() - start, ok=ok)
+    if first_token is not None:
+        recorder.record("ask_stream first token", first_token)
+    if first_audio is not None:
+        recorder.record("ask_stream first audio", first_audio)
+    return ok
+
+async def interview(client: httpx.AsyncClient, recorder: Recorder, args, answer: bytes) -> bool:
+    """upload -> N answers -> end session"""
+    params = {"wait_for_audio": str(args.wait_for_audio).lower()}
+    response = await timed(recorder, "POST /upload_resume/", client.post(
+        "/upload_resume/", params=params, files={"file": ("resume.txt", RESUME.encode("utf-8"), "text/plain")}
+    ))
+    if response is None:
+        return False
+    session_id = response.json()["session_id"]
+
+    ok = True
+    for _ in range(args.turns):
+        if args.stream:
+            ok = await ask_stream(client, recorder, session_id, answer) and ok
+        else:
+            response = await timed(recorder, "POST /ask/", client.post(
+                "/ask/", params=params, data={"session_id": session_id},
+                files={"user_answer_audio": ("answer.wav", answer, "audio/wav")}
+            ))
+            ok = response is not None and ok
+        if args.think_time:
+            await asyncio.sleep(args.think_time)
+
+    response = await timed(recorder, "DELETE /session", client.delete(f"/session/{session_id}"))
+    return response is not None and ok
+
+async def run_load(args, base_url: str, server_pid: int) -> dict:
+    recorder = Recorder()
+    answer = silent_wav()
+    limits = httpx.Limits(max_connections=args.concurrency + 4, max_keepalive_connections=args.concurrency + 4)
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+        # One warm-up interview so first-request costs stay out of the numbers
+        await interview(client, Recorder(), args, answer)
+        baseline_rss = process_rss(server_pid)
+
+        sampler = MemorySampler(client, server_pid)
+        sampler_task = asyncio.create_task(sampler.run())
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def bounded():
+            async with semaphore:
+                return await interview(client, recorder, args, answer)
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(bounded() for _ in range(args.sessions)))
+        elapsed = time.perf_counter() - start
+
+        sampler_task.cancel()
+        sampler.sample_rss()
+        final_rss = process_rss(server_pid)
+        final_stats = (await client.get("/sessions/stats")).json()
+
+    completed = sum(results)
+    requests = sum(len(values) for endpoint, values in recorder.latencies.items() if endpoint.startswith(("POST", "DELETE")))
+    memory = {
+        "baseline_rss_mb": mb(baseline_rss),
+        "peak_rss_mb": mb(sampler.peak_rss),
+        "final_rss_mb": mb(final_rss),
+        "peak_active_sessions": sampler.peak_sessions,
+        "peak_session_state_kb": round(sampler.peak_session_bytes / 1024, 1),
+        "sessions_left_open": final_stats.get("active_sessions")
+    }
+    if baseline_rss and sampler.peak_rss and sampler.peak_sessions:
+        memory["rss_growth_per_live_session_kb"] = round((sampler.peak_rss - baseline_rss) / sampler.peak_sessions / 1024, 1)
+    if baseline_rss and final_rss:
+        # Memory still held once every session has been deleted (leak indicator)
+        memory["rss_retained_per_session_kb"] = round((final_rss - baseline_rss) / max(1, args.sessions) / 1024, 1)
+    if sampler.peak_sessions:
+        memory["state_per_live_session_kb"] = round(sampler.peak_session_bytes / sampler.peak_sessions / 1024, 1)
+
+    return {
+        "config": {
+            "sessions": args.sessions, "concurrency": args.concurrency, "turns": args.turns,
+            "stream": args.stream, "wait_for_audio": args.wait_for_audio,
+            "latency": args.latency, "token_rate": args.token_rate, "tokens": args.tokens
+        },
+        "elapsed_seconds": round(elapsed, 2),
+        "sessions_completed": completed,
+        "sessions_failed": args.sessions - completed,
+        "throughput": {
+            "sessions_per_second": round(completed / elapsed, 2),
+            "requests_per_second": round(requests / elapsed, 2),
+            "turns_per_second": round(completed * (args.turns + 1) / elapsed, 2)
+        },
+        "endpoints": recorder.summary(),
+        "memory": memory
+    }
+
+def mb(value: int) -> float:
+    return round(value / (1024 * 1024), 1) if value else None
+
+async def wait_until_ready(base_url: str, process: subprocess.Popen, timeout: float = 60):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url, timeout=2) as client:
+        while time.monotonic() < deadline:
+            if process is not None and process.poll() is not None:
+                raise RuntimeError(f"Server exited with code {process.returncode}")
+            try:
+                if (await client.get("/")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.25)
+    raise RuntimeError(f"Server at {base_url} did not become ready within {timeout}s")
+
+def start_servers(args, workdir: str) -> tuple:
+    """Launch the fake Ollama server and the backend; returns (processes, backend URL)"""
+    ollama_port = free_port()
+    ollama = subprocess.Popen([
+        sys.executable, FAKE_OLLAMA, "--port", str(ollama_port), "--latency", str(args.latency),
+        "--token-rate", str(args.token_rate), "--tokens", str(args.tokens)
+    ], stdout=subprocess.DEVNULL)
+
+    port = free_port()
+    env = dict(os.environ)
+    env.update({
+        "OLLAMA_HOST": f"http://127.0.0.1:{ollama_port}",
+        "TTS_ENGINE": "silent",
+        "STT_BACKEND": "stub",
+        "SESSION_MAX_COUNT": str(max(200, args.concurrency * 2)),
+        "PYTHONPATH": os.pathsep.join(filter(None, [BACKEND_DIR, env.get("PYTHONPATH")]))
+    })
+    log = open(os.path.join(workdir, "server.log"), "wb")
+    backend = subprocess.Popen([
+        sys.executable, "-m", "uvicorn", "main:app", "--app-dir", BACKEND_DIR,
+        "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning", "--no-access-log"
+    ], cwd=workdir, env=env, stdout=log, stderr=subprocess.STDOUT)
+    return [backend, ollama], f"http://127.0.0.1:{port}"
+
+def print_report(report: dict):
+    config = report["config"]
+    print(f"\n{report['sessions_completed']}/{config['sessions']} interviews "
+          f"({config['turns']} answers each, concurrency {config['concurrency']}) in {report['elapsed_seconds']}s")
+    throughput = report["throughput"]
+    print(f"Throughput: {throughput['sessions_per_second']} sessions/s, "
+          f"{throughput['turns_per_second']} turns/s, {throughput['requests_per_second']} requests/s\n")
+    print(f"{'endpoint':<26}{'count':>7}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for endpoint, row in report["endpoints"].items():
+        print(f"{endpoint:<26}{row['count']:>7}{row['errors']:>8}{row['p50_ms']:>10}"
+              f"{row['p95_ms']:>10}{row['p99_ms']:>10}{row['max_ms']:>10}")
+    print("\nMemory:")
+    for key, value in report["memory"].items():
+        print(f"  {key:<32}{value}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=20, help="interviews to run")
+    parser.add_argument("--concurrency", type=int, default=10, help="interviews in flight at once")
+    parser.add_argument("--turns", type=int, default=3, help="answers per interview")
+    parser.add_argument("--stream", action="store_true", help="answer through /ask_stream/ instead of /ask/")
+    parser.add_argument("--wait-for-audio", action="store_true", help="have /upload_resume/ and /ask/ wait for TTS")
+    parser.add_argument("--think-time", type=float, default=0.0, help="seconds between answers")
+    parser.add_argument("--latency", type=float, default=0.2, help="fake model: seconds before the first token")
+    parser.add_argument("--token-rate", type=float, default=40.0, help="fake model: tokens per second")
+    parser.add_argument("--tokens", type=int, default=60, help="fake model: tokens per reply")
+    parser.add_argument("--timeout", type=float, default=120.0, help="per-request timeout in seconds")
+    parser.add_argument("--url", help="benchmark an already running backend instead of starting one")
+    parser.add_argument("--server-pid", type=int, help="backend PID for RSS sampling when using --url")
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args(argv)
+
+    processes = []
+    with tempfile.TemporaryDirectory(prefix="interview-bench-") as workdir:
+        try:
+            if args.url:
+                base_url, server_pid = args.url.rstrip("/"), args.server_pid
+            else:
+                processes, base_url = start_servers(args, workdir)
+                server_pid = processes[0].pid
+            asyncio.run(wait_until_ready(base_url, processes[0] if processes else None))
+            report = asyncio.run(run_load(args, base_url, server_pid))
+        except RuntimeError as e:
+            log_path = os.path.join(workdir, "server.log")
+            if os.path.exists(log_path):
+                with open(log_path, errors="ignore") as log:
+                    sys.stderr.write(log.read()[-4000:])
+            print(f"❌ {e}", file=sys.stderr)
+            return 1
+        finally:
+            for process in processes:
+                process.terminate()
+            for process in processes:
+                try:
+                    process.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(report, file, indent=2)
+    return 0 if report["sessions_failed"] == 0 else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,328 @@
+import re
+from datetime import date
+from context_budget import PROFILE_TOKEN_BUDGET, estimate_tokens, clip_words, clip_tokens
+
+# Resume section headings, matched against whole lines
+SECTION_HEADINGS = {
+    "summary": ("summary", "professional summary", "profile", "objective", "career objective", "about me"),
+    "skills": ("skills", "technical skills", "key skills", "core competencies", "technologies", "tech stack", "tools"),
+    "experience": ("experience", "work experience", "professional experience", "employment", "employment history",
+                   "work history", "internships", "internship", "internship experience"),
+    "projects": ("projects", "personal projects", "academic projects", "key projects", "project experience"),
+    "education": ("education", "academics", "academic background", "qualifications"),
+    "certifications": ("certifications", "certificates", "courses", "achievements", "awards"),
+}
+HEADING_LOOKUP = {name: section for section, names in SECTION_HEADINGS.items() for name in names}
+
+# Used to find skills in resumes without a skills section
+KNOWN_SKILLS = (
+    "Python", "Java", "JavaScript", "TypeScript", "C++", "C#", "Go", "Rust", "Kotlin", "Swift", "SQL", "HTML", "CSS",
+    "React", "Angular", "Vue", "Node.js", "Django", "Flask", "FastAPI", "Spring", "Spring Boot", ".NET",
+    "TensorFlow", "PyTorch", "scikit-learn", "Pandas", "NumPy", "LangChain", "Machine Learning", "Deep Learning",
+    "NLP", "Computer Vision", "MySQL", "PostgreSQL", "MongoDB", "Redis", "Docker", "Kubernetes", "AWS", "Azure",
+    "GCP", "Git", "Linux", "REST", "GraphQL", "Microservices", "CI/CD", "Jenkins", "Terraform", "Spark", "Hadoop",
+)
+
+EMAIL = re.compile(r"\S+@\S+\.\S+")
+URL = re.compile(r"(https?://|www\.)\S+|\b\S+\.(com|in|io|dev|me)/\S*", re.IGNORECASE)
+PHONE = re.compile(r"\+?\d[\d\s().-]{8,}\d")
+# Bullet markers only (PDF extraction turns "o" and "○" list markers into text);
+# indentation alone does not make a bullet
+BULLET = re.compile(r"^\s*(?:[•·▪●◦○▸►✓\-*–>]|o(?=\s|$))\s*")
+CONTACT_LABEL = re.compile(r"^(e-?mail|mobile|phone|tel|linkedin|github|portfolio|website)\s*:?\s*$", re.IGNORECASE)
+
+MONTHS = {name: index for index, name in enumerate(
+    ("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"), start=1)}
+MONTH = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?"
+DATE = rf"(?:{MONTH}\s*'?\d{{2,4}}|\d{{1,2}}/\d{{4}}|\d{{4}})"
+DATE_RANGE = re.compile(rf"({DATE})\s*(?:-|–|—|to|till|until)\s*({DATE}|present|current|now|ongoing|today)", re.IGNORECASE)
+
+# Progressively stricter (skills, roles, projects, words per item) limits tried until the profile fits
+PROFILE_LIMITS = ((30, 6, 5, 25), (20, 5, 4, 15), (15, 4, 3, 10), (10, 3, 2, 0), (6, 2, 1, 0))
+# Below this share of lines under recognised headings, the extraction is not trusted
+MIN_STRUCTURED_SHARE = 0.5
+
+def _heading(line: str) -> str:
+    """Section for a heading line such as "SKILLS SUMMARY" or "Work Experience:", else None"""
+    if len(line) > 40 or re.search(r":\s*\S", line):
+        return None
+    key = " ".join(re.sub(r"[^a-z ]", " ", line.lower()).split())
+    if not key or len(key.split()) > 4:
+        return None
+    if key in HEADING_LOOKUP:
+        return HEADING_LOOKUP[key]
+    # Longest known heading the line starts with, then one it ends with
+    for name in sorted(HEADING_LOOKUP, key=len, reverse=True):
+        if key.startswith(name + " "):
+            return HEADING_LOOKUP[name]
+    for name in sorted(HEADING_LOOKUP, key=len, reverse=True):
+        if key.endswith(" " + name):
+            return HEADING_LOOKUP[name]
+    return None
+
+def _scrub_phones(line: str) -> str:
+    """Drop phone numbers, sparing date ranges such as "2018 - 2021" that look like one"""
+    dates = []
+
+    def stash(match):
+        dates.append(match.group(0))
+        return f"\0{len(dates) - 1}\0"
+
+    line = PHONE.sub("", DATE_RANGE.sub(stash, line))
+    return re.sub(r"\0(\d+)\0", lambda match: dates[int(match.group(1))], line)
+
+def _clean(line: str) -> str:
+    line = URL.sub("", EMAIL.sub("", _scrub_phones(line)))
+    line = " ".join(line.split()).strip(" |,;")
+    return "" if CONTACT_LABEL.match(line) else line
+
+def _is_date_line(line: str) -> bool:
+    """A line that holds little more than a date range, e.g. "Mar 2024 - Jun 2024 (Expected)" """
+    match = DATE_RANGE.search(line)
+    return match is not None and len(re.sub(r"[^A-Za-z]", "", line[:match.start()] + line[match.end():])) <= 10
+
+def split_sections(resume_text: str) -> dict:
+    """Group cleaned resume lines by section as (line, is_bullet) pairs.
+
+    Lines before the first heading go under "header". A lone bullet marker
+    makes the next line a bullet, and lines starting in lower case are joined
+    to the line before (text wrapped by PDF extraction).
+    """
+    sections = {"header": []}
+    current = "header"
+    pending_bullet = False
+    for raw in resume_text.splitlines():
+        marker = BULLET.match(raw)
+        if marker is None:
+            section = _heading(raw.strip())
+            if section is not None:
+                current = section
+                sections.setdefault(current, [])
+                pending_bullet = False
+                continue
+        line = _clean(raw[marker.end():] if marker else raw)
+        if not line:
+            pending_bullet = pending_bullet or marker is not None
+            continue
+        lines = sections.setdefault(current, [])
+        is_bullet = marker is not None or pending_bullet
+        pending_bullet = False
+        if not is_bullet and lines and line[0].islower():
+            previous, previous_bullet = lines[-1]
+            lines[-1] = (f"{previous} {line}", previous_bullet)
+        else:
+            lines.append((line, is_bullet))
+    return sections
+
+def split_entries(lines: list) -> list:
+    """Group a section's lines into entries of (header lines, bullet lines).
+
+    A new entry starts at a non-bullet line once the current entry has
+    bullets or a date, e.g. "Company / Role / Jan 2020 - Present / • ...".
+    """
+    entries = []
+    for line, is_bullet in lines:
+        if not entries or (not is_bullet and (entries[-1][1] or any(DATE_RANGE.search(h) for h in entries[-1][0]))):
+            entries.append(([], []))
+        entries[-1][1 if is_bullet else 0].append(line)
+    return entries
+
+def _month_index(value: str, is_end: bool) -> int:
+    """Months since year 0 for a resume date, or None if it cannot be read"""
+    value = value.lower().strip()
+    if value in ("present", "current", "now", "ongoing", "today"):
+        today = date.today()
+        return today.year * 12 + today.month
+    match = re.search(r"(\d{1,2})/(\d{4})", value)
+    if match:
+        return int(match.group(2)) * 12 + int(match.group(1))
+    year = re.search(r"\d{2,4}", value)
+    if not year:
+        return None
+    year = int(year.group())
+    if year < 100:
+        year += 2000
+    month = MONTHS.get(value[:3])
+    return year * 12 + (month or (12 if is_end else 1))
+
+def date_span(line: str) -> tuple:
+    """(start, end) month indexes of the first date range in line, or None"""
+    match = DATE_RANGE.search(line)
+    if not match:
+        return None
+    start = _month_index(match.group(1), False)
+    end = _month_index(match.group(2), True)
+    if start is None or end is None or end < start:
+        return None
+    return start, end
+
+def years_of_experience(lines: list) -> float:
+    """Total years covered by date ranges in lines, with overlaps counted once"""
+    spans = sorted(span for span in map(date_span, lines) if span is not None)
+    months = 0
+    current_start, current_end = None, None
+    for start, end in spans:
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                months += current_end - current_start + 1
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        months += current_end - current_start + 1
+    return round(months / 12 * 2) / 2
+
+def extract_skills(sections: dict, resume_text: str) -> list:
+    skills = []
+    for line, _ in sections.get("skills", []):
+        # "Languages: Python, Java" -> drop the label
+        if ":" in line:
+            line = line.split(":", 1)[1]
+        skills.extend(item.strip(" .") for item in re.split(r"[,|;•·/]", line))
+    if not skills:
+        skills = [skill for skill in KNOWN_SKILLS
+                  if re.search(rf"(?<![\w+#.]){re.escape(skill)}(?![\w+#])", resume_text, re.IGNORECASE)]
+    seen = set()
+    unique = []
+    for skill in skills:
+        if skill and len(skill) <= 40 and skill.lower() not in seen:
+            seen.add(skill.lower())
+            unique.append(skill)
+    return unique
+
+def _describe(header: list) -> tuple:
+    """(title, date range) for an entry header, with date-only lines folded into the date"""
+    title = [line for line in header if not _is_date_line(line)]
+    match = next((DATE_RANGE.search(line) for line in header if DATE_RANGE.search(line)), None)
+    text = ", ".join(line.rstrip(":") for line in title)
+    # A date inside a title line is kept once, in the parenthesis
+    if match is not None:
+        text = " ".join(text.replace(match.group(0), "").split()).strip(" ,;")
+    return text, match.group(0) if match else ""
+
+def extract_roles(sections: dict) -> list:
+    """One line per experience entry: organisation and title, with dates"""
+    roles = []
+    for header, _ in split_entries(sections.get("experience", [])):
+        title, dates = _describe(header)
+        if title:
+            roles.append(clip_words(title, 15) + (f" ({dates})" if dates else ""))
+    return roles
+
+def extract_projects(sections: dict) -> list:
+    """(name, first description line) for each project entry"""
+    projects = []
+    for header, bullets in split_entries(sections.get("projects", [])):
+        title, _ = _describe(header)
+        if title:
+            projects.append((clip_words(title, 12), bullets[0] if bullets else ""))
+        elif bullets:
+            projects.append((clip_words(bullets[0], 8), bullets[0]))
+    return projects
+
+def extract_education(sections: dict) -> list:
+    education = []
+    for header, bullets in split_entries(sections.get("education", []))[:2]:
+        title, dates = _describe(header + bullets)
+        if title:
+            education.append(clip_words(title, 20) + (f" ({dates})" if dates else ""))
+    return education
+
+def _looks_like_title(text: str) -> bool:
+    # A fully lower-case first word marks a wrapped sentence; "iNeuron" or "eBay" are still names
+    words = text.split()
+    return bool(words) and not words[0].islower() and not text.endswith(".") and len(words) <= 25
+
+def is_plausible(sections: dict, profile: "CandidateProfile") -> bool:
+    """Whether the extraction can be trusted over the plain resume text.
+
+    Most lines must sit under recognised headings, something beyond skills
+    must have been found, and role/project names must read like titles
+    rather than sentence fragments.
+    """
+    total = sum(len(lines) for lines in sections.values())
+    structured = total - len(sections.get("header", []))
+    if not total or structured / total < MIN_STRUCTURED_SHARE:
+        return False
+    if not (profile.roles or profile.projects):
+        return False
+    return all(_looks_like_title(title) for title in profile.roles + [name for name, _ in profile.projects])
+
+class CandidateProfile:
+    """Compact, structured view of a resume used in place of the raw text in prompts"""
+
+    def __init__(self, name: str = None, summary: str = "", years: float = 0.0, skills: list = None,
+                 roles: list = None, projects: list = None, education: list = None, fallback: str = ""):
+        self.name = name
+        self.summary = summary
+        self.years = years
+        self.skills = skills or []
+        self.roles = roles or []
+        self.projects = projects or []
+        self.education = education or []
+        # Cleaned resume text, used when no structure could be recognised
+        self.fallback = fallback
+
+    def render(self, max_skills: int = 30, max_roles: int = 6, max_projects: int = 5, description_words: int = 25) -> str:
+        if not (self.skills or self.roles or self.projects):
+            return self.fallback
+        lines = []
+        if self.name:
+            lines.append(f"Name: {self.name}")
+        if self.summary:
+            lines.append(f"Summary: {clip_words(self.summary, 40)}")
+        if self.years:
+            lines.append(f"Experience: about {self.years:g} years")
+        if self.roles:
+            lines.append("Roles:")
+            lines.extend(f"- {role}" for role in self.roles[:max_roles])
+        if self.skills:
+            lines.append(f"Skills: {', '.join(self.skills[:max_skills])}")
+        if self.projects:
+            lines.append("Projects:")
+            for name, description in self.projects[:max_projects]:
+                if description and description_words:
+                    lines.append(f"- {name}: {clip_words(description, description_words)}")
+                else:
+                    lines.append(f"- {name}")
+        if self.education:
+            lines.append(f"Education: {'; '.join(self.education)}")
+        return "\n".join(lines)
+
+    def to_prompt(self, budget: int = PROFILE_TOKEN_BUDGET) -> str:
+        """Rendered profile within roughly budget tokens, dropping detail until it fits"""
+        text = ""
+        for limits in PROFILE_LIMITS:
+            text = self.render(*limits)
+            if estimate_tokens(text) <= budget:
+                return text
+        return clip_tokens(text, budget)
+
+def build_profile(resume_text: str) -> CandidateProfile:
+    """Extract skills, roles, projects and years of experience from resume text.
+
+    Purely heuristic (section headings, bullets, date ranges), so it runs
+    once at upload without a model call. Contact details are dropped. When
+    the resume's layout is not recognised, the profile holds the cleaned
+    text instead (trimmed to the budget by to_prompt()).
+    """
+    sections = split_sections(resume_text)
+    fallback = "\n".join(filter(None, (_clean(BULLET.sub("", line, count=1)) for line in resume_text.splitlines())))
+    header = [line for line, _ in sections.get("header", [])]
+    name = header[0] if header and len(header[0].split()) <= 4 and not re.search(r"\d", header[0]) else None
+    experience_headers = [line for header_lines, _ in split_entries(sections.get("experience", []))
+                          for line in header_lines]
+
+    profile = CandidateProfile(
+        name=name,
+        summary=" ".join(line for line, _ in sections.get("summary", [])),
+        years=years_of_experience(experience_headers),
+        skills=extract_skills(sections, resume_text),
+        roles=extract_roles(sections),
+        projects=extract_projects(sections),
+        education=extract_education(sections),
+        fallback=fallback
+    )
+    if not is_plausible(sections, profile):
+        return CandidateProfile(fallback=fallback)
+    return profile
@@ -0,0 +1,78 @@
+import os
+import re
+
+# Upper bound on prompt + reply per turn; smaller prompts evaluate faster
+# than filling the whole window (OLLAMA_NUM_CTX)
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "4096"))
+# Room kept free for the interviewer's reply
+RESPONSE_TOKEN_RESERVE = int(os.getenv("RESPONSE_TOKEN_RESERVE", "512"))
+PROFILE_TOKEN_BUDGET = int(os.getenv("PROFILE_TOKEN_BUDGET", "500"))
+SUMMARY_TOKEN_BUDGET = int(os.getenv("SUMMARY_TOKEN_BUDGET", "300"))
+# Most recent exchanges that are always kept verbatim
+KEEP_RECENT_TURNS = 2
+# When the conversation overflows, fold old turns until it is back to this
+# share of its budget, so folds (which change the prompt prefix and cost a
+# KV-cache miss) happen every few turns rather than on every turn
+FOLD_TARGET = 0.6
+
+# Llama-family tokenizers average roughly four characters per token on English text
+CHARS_PER_TOKEN = 4
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+def clip_words(text: str, max_words: int) -> str:
+    words = text.split()
+    return " ".join(words[:max_words]) + (" ..." if len(words) > max_words else "")
+
+def clip_tokens(text: str, max_tokens: int) -> str:
+    """Cut text to roughly max_tokens, at a line or word boundary where possible"""
+    limit = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text
+    cut = text[:limit]
+    boundary = max(cut.rfind("\n"), cut.rfind(" "))
+    return (cut[:boundary] if boundary > limit // 2 else cut).rstrip() + " ..."
+
+class ContextBudget:
+    """Splits the context budget between the fixed system prompt (guidelines +
+    candidate profile), a rolling summary of earlier turns, the recent
+    conversation and the reply.
+    """
+
+    def __init__(self, total: int = CONTEXT_TOKEN_BUDGET, response_reserve: int = RESPONSE_TOKEN_RESERVE,
+                 profile: int = PROFILE_TOKEN_BUDGET, summary: int = SUMMARY_TOKEN_BUDGET):
+        self.total = total
+        self.response_reserve = response_reserve
+        self.profile = profile
+        self.summary = summary
+
+    def conversation(self, system_tokens: int) -> int:
+        """Tokens left for verbatim turns once the system prompt and summary are placed"""
+        return max(0, self.total - self.response_reserve - system_tokens - self.summary)
+
+QUESTION_PREFIX = re.compile(r"^\(Question #\d+ of the interview\)\n")
+SENTENCE = re.compile(r"[^.!?]+[.!?]*")
+
+def last_question(reply: str, max_words: int = 30) -> str:
+    """The interviewer's closing question (or last sentence) from a reply"""
+    sentences = [sentence.strip() for sentence in SENTENCE.findall(reply) if sentence.strip()]
+    if not sentences:
+        return ""
+    questions = [sentence for sentence in sentences if sentence.endswith("?")]
+    return clip_words((questions or sentences)[-1], max_words)
+
+def turn_digest(prompt: str, reply: str, answer_words: int = 30) -> str:
+    """One summary line for an exchange: the candidate's answer and the question it led to"""
+    parts = []
+    if QUESTION_PREFIX.match(prompt):
+        parts.append(f"candidate: {clip_words(QUESTION_PREFIX.sub('', prompt), answer_words)}")
+    question = last_question(reply)
+    if question:
+        parts.append(f"interviewer: {question}")
+    return "- " + "; ".join(parts)
+
+def render_summary(lines: list, omitted: int) -> str:
+    header = "Summary of earlier turns in this interview (oldest first"
+    header += f"; {omitted} older turns omitted):" if omitted else "):"
+    return "\n".join([header] + lines)
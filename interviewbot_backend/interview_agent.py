@@ -1,8 +1,24 @@
 import os
+import re
+import sys
 import uuid
+import time
+import asyncio
 import logging
+import threading
 from dotenv import load_dotenv
 from langchain_ollama import ChatOllama
+from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
+from tts_service import TTSService, TTSQueueFull, TTS_TIMEOUT, get_tts_service
+from audio_encoding import find_clip, concat_wav
+from metrics import STAGE_SECONDS, LLM_REJECTED, record_llm_usage
+from candidate_profile import CandidateProfile, build_profile
+from context_budget import ContextBudget, KEEP_RECENT_TURNS, FOLD_TARGET, estimate_tokens, turn_digest, render_summary
+from concurrent.futures import Future
+
+# The LLM scheduler is shared with the resume analyzer (repo root/common)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from common.llm_scheduler import LLMScheduler, SchedulerBusy, get_scheduler, busy_from_error, PRIORITY_HEADER
 
 load_dotenv()
 
@@ -12,18 +28,63 @@ logger = logging.getLogger(__name__)
 STATIC_AUDIO_DIR = "static/audio"
 os.makedirs(STATIC_AUDIO_DIR, exist_ok=True)
 
+# A sentence is complete once terminal punctuation is followed by whitespace
+SENTENCE_END = re.compile(r"(?<=[.!?])[\"')\]]*\s+")
+
+def split_sentences(buffer: str) -> tuple:
+    """Split complete sentences off the front of a streaming buffer.
+
+    Returns (sentences, remainder) where remainder is the trailing, possibly
+    unfinished sentence that should stay buffered for the next chunk.
+    """
+    sentences = []
+    start = 0
+    for match in SENTENCE_END.finditer(buffer):
+        sentence = buffer[start:match.end()].strip()
+        if sentence:
+            sentences.append(sentence)
+        start = match.end()
+    return sentences, buffer[start:]
+
+OLLAMA_BASE_URL = os.getenv("OLLAMA_HOST", "http://localhost:11434")
+# How long Ollama keeps the model loaded after the last request
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+# Context window; must hold the whole conversation, otherwise Ollama
+# truncates from the front and the cached system prefix is lost
+OLLAMA_NUM_CTX = int(os.getenv("OLLAMA_NUM_CTX", "8192"))
+
+# Shared LLM clients keyed by model name. ChatOllama wraps pooled httpx
+# clients, so one instance can serve every session concurrently.
+_llm_clients = {}
+_llm_lock = threading.Lock()
+_default_model = None
+
+def create_llm(model_name: str) -> ChatOllama:
+    return ChatOllama(
+        model=model_name,
+        temperature=0.7,
+        base_url=OLLAMA_BASE_URL,
+        keep_alive=OLLAMA_KEEP_ALIVE,
+        num_ctx=OLLAMA_NUM_CTX,
+        # Lets an LLM gateway (common/llm_gateway.py) put interview turns first
+        client_kwargs={"headers": {PRIORITY_HEADER: "interactive"}}
+    )
+
 def test_ollama_models():
+    """Probe candidate models and return the first one that answers.
+
+    The probe also loads the model on the Ollama side (kept resident for
+    OLLAMA_KEEP_ALIVE), and the working client is kept for reuse.
+    """
     models_to_test = ["llama3.2"]
     
     for model_name in models_to_test:
         try:
             print(f"\n🧪 Testing Ollama model: {model_name}")
-            llm = ChatOllama(
-                model=model_name,
-                temperature=0.7
-            )
+            llm = create_llm(model_name)
             response = llm.invoke("Hello! Can you respond with 'Ollama working'?")
             print(f"✅ {model_name} is working! Response: {response.content}")
+            _llm_clients.setdefault(model_name, llm)
             return model_name
         except Exception as e:
             print(f"❌ {model_name} failed: {str(e)}")
@@ -35,51 +96,32 @@ def test_ollama_models():
     print("3. langchain-ollama is installed: 'pip install langchain-ollama'")
     return None
 
-class InterviewAgent:
-    def __init__(self, resume_text: str, model_name: str = None):
-        # Auto-detect working model if not specified
+def get_shared_llm(model_name: str = None) -> ChatOllama:
+    """Return the process-wide client for model_name (or the detected default).
+
+    Model detection runs at most once per process; call this at startup so
+    the probe and model load happen before the first session arrives.
+    """
+    global _default_model
+    with _llm_lock:
         if model_name is None:
-            print("🔍 Auto-detecting working Ollama model...")
-            model_name = test_ollama_models()
-            if model_name is None:
-                raise ValueError("No working Ollama model found")
-        
-        try:
-            self.llm = ChatOllama(
-                model=model_name,
-                temperature=0.7
-            )
-            print(f"✅ Using Ollama model: {model_name}")
-            self.model_name = model_name
-        except Exception as e:
-            raise ValueError(f"Failed to initialize Ollama model {model_name}: {str(e)}")
+            if _default_model is None:
+                print("🔍 Auto-detecting working Ollama model...")
+                _default_model = test_ollama_models()
+                if _default_model is None:
+                    raise ValueError("No working Ollama model found")
+            model_name = _default_model
 
-        # Initialize TTS engine
-        try:
-            import pyttsx3
-            self.tts_engine = pyttsx3.init()
-            self.tts_engine.setProperty('rate', 200)
-            self.tts_engine.setProperty('volume', 0.9)
-            voices = self.tts_engine.getProperty('voices')
-            for voice in voices:
-                if "Zira" in voice.name or "David" in voice.name:
-                    self.tts_engine.setProperty('voice', voice.id)
-                    break
-            self.tts_available = True
-            logger.info("✅ TTS engine initialized successfully")
-        except Exception as e:
-            logger.warning(f"⚠️ TTS initialization failed: {str(e)}. Audio responses will be disabled.")
-            self.tts_available = False
-            self.tts_engine = None
+        if model_name not in _llm_clients:
+            try:
+                _llm_clients[model_name] = create_llm(model_name)
+            except Exception as e:
+                raise ValueError(f"Failed to initialize Ollama model {model_name}: {str(e)}")
+        return _llm_clients[model_name]
 
-        # Resume context
-        self.resume_context = f"Candidate Resume:\n{resume_text}\n\n"
-        
-        # Conversation history
-        self.conversation_history = []
-        
-        # Updated base prompt with dynamic difficulty, ending, and feedback instructions
-        self.base_prompt = """
+class InterviewAgent:
+    # Updated base prompt with dynamic difficulty, ending, and feedback instructions
+    base_prompt = """
 You are an AI Interviewer conducting a technical interview. 
 Act like a friendly, experienced human interviewer, using natural, conversational language. 
 You will interview the candidate based on:
@@ -102,93 +144,338 @@ Interview Guidelines:
 - In the feedback, highlight strengths, areas for improvement, and specific suggestions on how to improve (e.g., resources, practice areas). Be encouraging and constructive.
 
 Keep responses concise, clear, and human-like, as if speaking aloud.
+
+After each candidate response, based on the response and the interview progress, either: 1) provide brief feedback and ask the next appropriate (and potentially harder) interview question, or 2) if the interview is complete after covering all key areas, provide comprehensive feedback on the candidate's performance (strengths, improvements, suggestions) and end the interview without asking another question.
 """
+
+    def __init__(self, resume_text: str, model_name: str = None, llm: ChatOllama = None, tts: TTSService = None,
+                 scheduler: LLMScheduler = None):
+        self._attach(model_name, llm, tts, scheduler)
+        logger.info(f"✅ Using Ollama model: {self.model_name}")
+
+        # Compact profile extracted once; the raw resume never goes into prompts
+        self.budget = ContextBudget()
+        self.profile = build_profile(resume_text)
+        self.resume_context = f"Candidate Profile:\n{self.profile.to_prompt(self.budget.profile)}\n\n"
+        
+        # Conversation history
+        self.conversation_history = []
+        
+        # Chat transcript sent to the model. The system message (profile +
+        # guidelines) never changes and turns are only appended, so Ollama
+        # can reuse its KV cache for everything but the newest turn. Once the
+        # turns outgrow their budget, the oldest are folded into a summary
+        # (see _fit_context).
+        self.system_message = SystemMessage(content=f"{self.resume_context}{self.base_prompt}")
+        self.messages = [self.system_message]
+        self.summary_lines = []
+        self.summary_omitted = 0
         
         self.interview_started = False
         self.question_count = 0
         self.session_id = str(uuid.uuid4())
 
+    def _attach(self, model_name: str = None, llm: ChatOllama = None, tts: TTSService = None,
+                scheduler: LLMScheduler = None):
+        """Connect the per-process resources a session needs (nothing here is serialized)"""
+        # Reuse the shared client; model detection only happens on first use
+        self.llm = llm if llm is not None else get_shared_llm(model_name)
+        self.model_name = self.llm.model
+        # Generations wait here for a slot; turns are interactive priority
+        self.scheduler = scheduler if scheduler is not None else get_scheduler()
+
+        # Shared TTS worker pool (engines are not created per session)
+        self.tts = tts if tts is not None else get_tts_service()
+        # Pending/finished audio per question number (this worker only);
+        # a concurrent Future, or an asyncio task for a streamed turn
+        self.audio_futures = {}
+        # When each question's clip was queued, kept with the session so
+        # other workers can tell a clip still rendering from a failed one
+        self.audio_index = {}
+
         # New: Separate folder for AI response audio
         self.audio_dir = os.path.join("static", "audio")
         os.makedirs(self.audio_dir, exist_ok=True)
 
-    def text_to_speech(self, text: str) -> str:
-        """Convert text to speech and save in static/audio folder"""
-        logger.info(f"[TTS] Starting text-to-speech conversion...")
-        
-        if not self.tts_available or self.tts_engine is None:
-            logger.warning("[TTS] TTS not available, skipping audio generation")
-            return None
-        
+    def to_state(self) -> dict:
+        """JSON-serializable session state; from_state() rebuilds an equivalent agent"""
+        return {
+            "session_id": self.session_id,
+            "model_name": self.model_name,
+            "profile": vars(self.profile),
+            "resume_context": self.resume_context,
+            "system_prompt": self.system_message.content,
+            "messages": [[message.type, message.content] for message in self.messages[1:]],
+            "summary_lines": self.summary_lines,
+            "summary_omitted": self.summary_omitted,
+            "conversation_history": self.conversation_history,
+            "interview_started": self.interview_started,
+            "question_count": self.question_count,
+            "audio_index": self.audio_index
+        }
+
+    @classmethod
+    def from_state(cls, state: dict, llm: ChatOllama = None, tts: TTSService = None,
+                   scheduler: LLMScheduler = None) -> "InterviewAgent":
+        """Rehydrate a session saved with to_state(), without re-reading the resume"""
+        agent = cls.__new__(cls)
+        agent._attach(state["model_name"], llm, tts, scheduler)
+        agent.budget = ContextBudget()
+        agent.profile = CandidateProfile(**state["profile"])
+        agent.system_message = SystemMessage(content=state["system_prompt"])
+        agent.resume_context = state["resume_context"]
+        message_types = {"system": SystemMessage, "human": HumanMessage, "ai": AIMessage}
+        agent.messages = [agent.system_message] + [message_types[kind](content=content)
+                                                   for kind, content in state["messages"]]
+        agent.summary_lines = list(state["summary_lines"])
+        agent.summary_omitted = state["summary_omitted"]
+        agent.conversation_history = [tuple(entry) for entry in state["conversation_history"]]
+        agent.interview_started = state["interview_started"]
+        agent.question_count = state["question_count"]
+        agent.session_id = state["session_id"]
+        # JSON object keys are strings
+        agent.audio_index = {int(number): queued for number, queued in state["audio_index"].items()}
+        return agent
+
+    @property
+    def tts_available(self) -> bool:
+        return self.tts.available
+
+    def audio_path_for(self, question_number: int) -> str:
+        """Best available encoding of a question's clip (compact codec first), or None"""
+        return find_clip(os.path.join(self.audio_dir, f"{self.session_id}_q{question_number}"))
+
+    def submit_speech(self, text: str, audio_name: str = None) -> Future:
+        """Queue text for synthesis; the Future resolves to the audio path or None"""
+        if audio_name is None:
+            audio_name = f"{self.session_id}_q{self.question_count}.wav"
+        audio_path = os.path.join(self.audio_dir, audio_name)
+        logger.info(f"[TTS] Queueing audio for: {audio_path}")
         try:
-            audio_path = os.path.join(self.audio_dir, f"{self.session_id}_q{self.question_count}.mp3")
-            logger.info(f"[TTS] Saving audio to: {audio_path}")
-            
-            self.tts_engine.save_to_file(text, audio_path)
-            
-            import threading
-            
-            def run_tts():
-                try:
-                    self.tts_engine.runAndWait()
-                except Exception as e:
-                    logger.error(f"[TTS] Error in runAndWait: {str(e)}")
-            
-            tts_thread = threading.Thread(target=run_tts, daemon=True)
-            tts_thread.start()
-            tts_thread.join(timeout=10)
-            
-            if tts_thread.is_alive():
+            return self.tts.submit(text, audio_path)
+        except TTSQueueFull:
+            logger.warning("[TTS] Queue full, skipping audio generation")
+            future = Future()
+            future.set_result(None)
+            return future
+
+    def audio_status(self, question_number: int) -> str:
+        """One of "ready", "pending", "failed" or "missing" for a question's clip"""
+        future = self.audio_futures.get(question_number)
+        if future is not None and not future.done():
+            return "pending"
+        if self.audio_path_for(question_number) is not None:
+            return "ready"
+        queued = self.audio_index.get(question_number)
+        if future is None and queued is not None:
+            # Queued by another worker; assume it is still rendering until it would have timed out
+            return "pending" if time.time() - queued < TTS_TIMEOUT else "failed"
+        return "failed" if future is not None else "missing"
+
+    async def _join_turn_audio(self, question_number: int, reply: str, sentence_clips: list) -> str:
+        """Whole-reply clip of a streamed turn, joined from its sentence clips once they are rendered"""
+        audio_name = f"{self.session_id}_q{question_number}.wav"
+        paths = await asyncio.gather(*sentence_clips)
+        if paths and None not in paths:
+            joined = await asyncio.to_thread(concat_wav, paths, os.path.join(self.audio_dir, audio_name))
+            if joined is not None:
+                return joined
+        # Some sentences failed, or the engine did not write WAV: render the reply in one piece
+        return await asyncio.wrap_future(self.submit_speech(reply, audio_name))
+
+    def _next_message(self, user_input: str = None) -> HumanMessage:
+        """The human message that opens the next turn"""
+        if not self.interview_started:
+            return HumanMessage(content="Start the interview by asking the candidate for a brief self-introduction.")
+
+        if user_input is None:
+            raise ValueError("User input is required for continuing the interview")
+        return HumanMessage(content=f"(Question #{self.question_count + 1} of the interview)\n{user_input}")
+
+    def _build_prompt(self, user_input: str = None) -> list:
+        """Chat messages for the next turn: the unchanged transcript plus the new message"""
+        return self.messages + [self._next_message(user_input)]
+
+    def _record_turn(self, user_input: str, reply: str):
+        """Append a completed turn to the transcript and advance the question counter"""
+        self.messages.append(self._next_message(user_input))
+        self.messages.append(AIMessage(content=reply))
+        if not self.interview_started:
+            self.interview_started = True
+        else:
+            self.conversation_history.append(("human", user_input))
+        self.conversation_history.append(("assistant", reply))
+        self.question_count += 1
+        self._fit_context()
+
+    def _fit_context(self):
+        """Fold the oldest exchanges into the summary once the transcript outgrows its budget.
+
+        Folding goes down to FOLD_TARGET of the budget rather than just under
+        it, so the prompt prefix (and Ollama's KV cache) stays stable for the
+        next few turns. The summary itself is capped by dropping its oldest lines.
+        """
+        first_turn = 2 if self.summary_lines else 1
+        turns = self.messages[first_turn:]
+        budget = self.budget.conversation(estimate_tokens(self.system_message.content))
+        used = sum(estimate_tokens(message.content) for message in turns)
+        if used <= budget:
+            return
+
+        target = budget * FOLD_TARGET
+        while len(turns) > 2 * KEEP_RECENT_TURNS and used > target:
+            prompt, reply = turns[0], turns[1]
+            used -= estimate_tokens(prompt.content) + estimate_tokens(reply.content)
+            self.summary_lines.append(turn_digest(prompt.content, reply.content))
+            turns = turns[2:]
+        while len(self.summary_lines) > 1 and estimate_tokens("\n".join(self.summary_lines)) > self.budget.summary:
+            self.summary_lines.pop(0)
+            self.summary_omitted += 1
+
+        summary = SystemMessage(content=render_summary(self.summary_lines, self.summary_omitted))
+        self.messages = [self.system_message, summary] + turns
+        logger.info(f"[AGENT] Folded older turns into summary; {len(turns) // 2} recent turns kept verbatim")
+
+    @staticmethod
+    def _busy(error: Exception):
+        """SchedulerBusy for a saturated LLM (local queue or upstream gateway), else None"""
+        if isinstance(error, SchedulerBusy):
+            return error
+        busy = busy_from_error(error)
+        if busy is not None:
+            LLM_REJECTED.inc(priority="interactive", reason="gateway")
+        return busy
+
+    def _observe_llm(self, response, start: float):
+        """Record latency and token usage of a completed generation"""
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.observe(elapsed, stage="llm")
+        record_llm_usage(getattr(response, "response_metadata", None), elapsed)
+
+    async def ainterview_turn(self, user_input: str = None, wait_for_audio: bool = True) -> tuple:
+        """Async interview logic: native async LLM call, TTS on the shared worker pool.
+
+        With wait_for_audio=False the reply text is returned immediately and
+        the clip keeps rendering in the background (see audio_status()).
+        Callers must serialize turns for the same agent (see the per-session
+        lock in main.py); the agent itself is not safe for concurrent turns.
+        Raises SchedulerBusy when the LLM is saturated; the turn is not
+        recorded, so it can simply be retried.
+        """
+        logger.info(f"[AGENT] ainterview_turn called. Started: {self.interview_started}, Input: {user_input[:50] if user_input else 'None'}...")
+
+        try:
+            prompt = self._build_prompt(user_input)
+            async with self.scheduler.aslot("interactive"):
+                start = time.perf_counter()
+                response = await self.llm.ainvoke(prompt)
+            self._observe_llm(response, start)
+            self._record_turn(user_input, response.content)
+            future = self.submit_speech(response.content)
+            self.audio_futures[self.question_count] = future
+            self.audio_index[self.question_count] = time.time()
+            if not wait_for_audio:
+                return response.content, None
+            try:
+                audio_path = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout=TTS_TIMEOUT)
+            except asyncio.TimeoutError:
                 logger.error("[TTS] TTS timeout - taking too long!")
-                return None
-            
-            if os.path.exists(audio_path) and os.path.getsize(audio_path) > 0:
-                logger.info(f"[TTS] ✅ Audio file created successfully: {audio_path}")
-                return audio_path
-            else:
-                logger.error(f"[TTS] Audio file not created or empty: {audio_path}")
-                return None
-                
+                audio_path = None
+            return response.content, audio_path
+
         except Exception as e:
-            logger.error(f"[TTS] ❌ TTS Error: {str(e)}", exc_info=True)
-            return None
+            busy = self._busy(e)
+            if busy is e:
+                raise
+            if busy is not None:
+                raise busy from e
+            logger.error(f"[AGENT] ❌ Error in ainterview_turn: {str(e)}", exc_info=True)
+            error_msg = f"I apologize, but I encountered an error. Could you please repeat your last response?"
+            return error_msg, None
+
+    async def astream_turn(self, user_input: str = None):
+        """Stream an interview turn as it is generated.
+
+        Yields event dicts: ``token`` for each LLM chunk, ``audio`` for each
+        synthesized sentence (in order, as soon as it is ready) and a final
+        ``done`` event carrying the full reply. Sentences are handed to TTS as
+        soon as they are complete, so the first clip is ready while the rest
+        of the reply is still being generated. If the LLM is saturated a
+        single ``error`` event with ``retry_after`` (seconds) is yielded.
+        """
+        logger.info(f"[AGENT] astream_turn called. Started: {self.interview_started}, Input: {user_input[:50] if user_input else 'None'}...")
+        question_number = self.question_count + 1
+        pending_audio = []
+        # Every sentence clip in order, for the whole-reply clip served by /audio/
+        sentence_clips = []
+        sentence_index = 0
+
+        def synthesize(sentence: str):
+            nonlocal sentence_index
+            sentence_index += 1
+            audio_name = f"{self.session_id}_q{question_number}_s{sentence_index}.wav"
+            future = asyncio.wrap_future(self.submit_speech(sentence, audio_name))
+            pending_audio.append((sentence_index, sentence, future, time.monotonic() + TTS_TIMEOUT))
+            sentence_clips.append(future)
+
+        def ready_audio_events():
+            events = []
+            while pending_audio and pending_audio[0][2].done():
+                index, sentence, future, _ = pending_audio.pop(0)
+                events.append({"type": "audio", "sentence": index, "text": sentence, "audio_path": future.result()})
+            return events
 
-    def interview_turn(self, user_input: str = None) -> tuple:
-        """Main interview logic"""
-        logger.info(f"[AGENT] interview_turn called. Started: {self.interview_started}, Input: {user_input[:50] if user_input else 'None'}...")
-        
         try:
-            if not self.interview_started:
-                # First turn
-                self.interview_started = True
-                prompt = f"{self.resume_context}\n{self.base_prompt}\n\nStart the interview by asking the candidate for a brief self-introduction."
-                response = self.llm.invoke(prompt)
-                self.conversation_history.append(("assistant", response.content))
-                self.question_count += 1
-                audio_path = self.text_to_speech(response.content)
-                return response.content, audio_path
-                
-            else:
-                # Subsequent turns
-                if user_input is None:
-                    raise ValueError("User input is required for continuing the interview")
-                
-                context = f"{self.resume_context}\n{self.base_prompt}\n\n"
-                context += f"This is question #{self.question_count + 1} of the interview.\n\n"
-                context += "Recent conversation:\n"
-                for role, message in self.conversation_history[-6:]:
-                    context += f"{role}: {message}\n"
-                context += f"human: {user_input}\n\n"
-                context += "Based on the candidate's response and the interview progress, either: 1) provide brief feedback and ask the next appropriate (and potentially harder) interview question, or 2) if the interview is complete after covering all key areas, provide comprehensive feedback on the candidate's performance (strengths, improvements, suggestions) and end the interview without asking another question.\n\nassistant:"
-                
-                response = self.llm.invoke(context)
-                self.conversation_history.append(("human", user_input))
-                self.conversation_history.append(("assistant", response.content))
-                self.question_count += 1
-                audio_path = self.text_to_speech(response.content)
-                return response.content, audio_path
-                
+            prompt = self._build_prompt(user_input)
+            reply = ""
+            buffer = ""
+            final_chunk = None
+            async with self.scheduler.aslot("interactive"):
+                start = time.perf_counter()
+                async for chunk in self.llm.astream(prompt):
+                    if chunk.response_metadata:
+                        # Token counts and durations arrive on the last chunk
+                        final_chunk = chunk
+                    if not chunk.content:
+                        continue
+                    if not reply:
+                        STAGE_SECONDS.observe(time.perf_counter() - start, stage="llm_first_token")
+                    reply += chunk.content
+                    buffer += chunk.content
+                    yield {"type": "token", "content": chunk.content}
+
+                    sentences, buffer = split_sentences(buffer)
+                    for sentence in sentences:
+                        synthesize(sentence)
+                    for event in ready_audio_events():
+                        yield event
+
+            self._observe_llm(final_chunk, start)
+            if buffer.strip():
+                synthesize(buffer.strip())
+            self._record_turn(user_input, reply)
+            self.audio_futures[self.question_count] = asyncio.ensure_future(
+                self._join_turn_audio(self.question_count, reply, sentence_clips))
+            self.audio_index[self.question_count] = time.time()
+
+            for index, sentence, future, deadline in pending_audio:
+                try:
+                    # Shielded so a clip that is late for this stream can still finish for /audio/
+                    audio_path = await asyncio.wait_for(asyncio.shield(future), timeout=max(0.0, deadline - time.monotonic()))
+                except asyncio.TimeoutError:
+                    logger.error(f"[TTS] TTS timeout for sentence {index}")
+                    audio_path = None
+                yield {"type": "audio", "sentence": index, "text": sentence, "audio_path": audio_path}
+            pending_audio.clear()
+
+            yield {"type": "done", "ai_response": reply, "question_number": self.question_count}
+
         except Exception as e:
-            logger.error(f"[AGENT] ❌ Error in interview_turn: {str(e)}", exc_info=True)
+            busy = self._busy(e)
+            if busy is not None:
+                logger.warning(f"[AGENT] LLM busy, asking client to retry in {busy.retry_after}s")
+                yield {"type": "error", "detail": "LLM is busy", "retry_after": busy.retry_after}
+                return
+            logger.error(f"[AGENT] ❌ Error in astream_turn: {str(e)}", exc_info=True)
             error_msg = f"I apologize, but I encountered an error. Could you please repeat your last response?"
-            return error_msg, None
\ No newline at end of file
+            yield {"type": "error", "ai_response": error_msg}
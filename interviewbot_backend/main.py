@@ -1,18 +1,56 @@
 import os
+import json
+import hashlib
 import uuid
 import logging
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, WebSocket, WebSocketDisconnect, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, FileResponse, StreamingResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
-from interview_agent import InterviewAgent, test_ollama_models
-from resume_parser import parse_resume
+from interview_agent import InterviewAgent, SchedulerBusy, get_shared_llm, get_scheduler
+from tts_service import get_tts_service
+from session_manager import SessionManager, SessionNotFound, SessionBusy
+from speech_stream import Utterance, STT_SAMPLE_RATE, transcribe_audio_file, load_recognizer_model
+from audio_encoding import sniff_media_type
+from resume_parser import parse_resume_bytes
+from metrics import (
+    REGISTRY, STAGE_SECONDS, ACTIVE_SESSIONS, SESSION_MEMORY, LLM_IN_FLIGHT, LLM_QUEUED,
+    TraceMiddleware, install_trace_logging, observe_llm_queue, run_blocking
+)
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 import asyncio
 
 logging.basicConfig(level=logging.INFO)
+# Log lines carry the trace ID of the request they belong to
+install_trace_logging()
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="AI Interview System", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Resolve and warm the model once; every session shares this client
+    loop = asyncio.get_running_loop()
+    try:
+        llm = await loop.run_in_executor(None, get_shared_llm)
+    except ValueError as e:
+        logger.error(f"❌ {str(e)}. Check 'ollama serve' and model pull")
+        raise
+    app.state.model_name = llm.model
+    logger.info(f"✅ Ollama model ready: {llm.model}")
+    tts = get_tts_service()
+    # Local STT models (Vosk) take seconds to load; do it once, before the first answer
+    try:
+        await loop.run_in_executor(STT_EXECUTOR, load_recognizer_model)
+    except Exception as e:
+        logger.error(f"❌ Could not load the STT model: {str(e)}")
+    sessions.start()
+    yield
+    await sessions.stop()
+    tts.shutdown()
+    for executor in (PARSE_EXECUTOR, STT_EXECUTOR):
+        executor.shutdown(wait=False, cancel_futures=True)
+
+app = FastAPI(title="AI Interview System", version="1.0.0", lifespan=lifespan)
 
 # CORS
 app.add_middleware(
@@ -20,121 +58,280 @@ app.add_middleware(
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
-    allow_headers=["*"]
+    allow_headers=["*"],
+    expose_headers=["X-Trace-ID"]
 )
+# Trace IDs and per-route latency (see /metrics)
+app.add_middleware(TraceMiddleware)
 
 # Directories
 UPLOAD_DIR = "uploads"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
+# Keep a copy of uploaded resumes on disk (parsing itself works from memory)
+RETAIN_UPLOADS = os.getenv("RETAIN_UPLOADS", "false").lower() == "true"
 
 STATIC_AUDIO_DIR = os.path.join("static", "audio")
 os.makedirs(STATIC_AUDIO_DIR, exist_ok=True)
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
-# Active sessions
-sessions = {}
+# Bounded executors for blocking stages so they never run on the event loop.
+# TTS has its own worker pool (see tts_service.py).
+PARSE_EXECUTOR = ThreadPoolExecutor(max_workers=int(os.getenv("PARSE_WORKERS", "4")), thread_name_prefix="parse")
+STT_EXECUTOR = ThreadPoolExecutor(max_workers=int(os.getenv("STT_WORKERS", "4")), thread_name_prefix="stt")
+
+# Sessions live in a shared store (SESSION_STORE), so several workers can
+# serve them; agents are cached per worker. Idle sessions are reaped in the background.
+sessions = SessionManager(rehydrate=InterviewAgent.from_state)
+ACTIVE_SESSIONS.set_function(lambda: sessions.session_count)
+SESSION_MEMORY.set_function(lambda: sessions.memory_used)
+
+# Every interview turn takes an LLM slot from this scheduler (see common/llm_scheduler.py)
+scheduler = get_scheduler()
+scheduler.observer = observe_llm_queue
+LLM_IN_FLIGHT.set_function(lambda: scheduler.stats()["in_flight"])
+LLM_QUEUED.set_function(lambda: sum(scheduler.stats()["queued"].values()))
+
+@app.exception_handler(SchedulerBusy)
+async def scheduler_busy_handler(request: Request, exc: SchedulerBusy):
+    # Explicit backpressure: the client should retry the same request later
+    return JSONResponse(
+        status_code=429,
+        content={"detail": str(exc), "retry_after": exc.retry_after},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+@app.exception_handler(SessionNotFound)
+async def session_not_found_handler(request: Request, exc: SessionNotFound):
+    return JSONResponse(status_code=404, content={"detail": "Session not found"})
+
+@app.exception_handler(SessionBusy)
+async def session_busy_handler(request: Request, exc: SessionBusy):
+    return JSONResponse(status_code=409, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
+def write_file(path: str, content: bytes):
+    with open(path, "wb") as f:
+        f.write(content)
 
 @app.get("/")
 async def root():
     return {"message": "AI Interview System API", "status": "running"}
 
 @app.post("/upload_resume/")
-async def upload_resume(file: UploadFile = File(...)):
+async def upload_resume(file: UploadFile = File(...), wait_for_audio: bool = True):
     allowed_extensions = ['.pdf', '.docx', '.txt']
     file_extension = os.path.splitext(file.filename)[1].lower()
     if file_extension not in allowed_extensions:
         raise HTTPException(status_code=400, detail=f"Unsupported file type. Allowed: {allowed_extensions}")
 
-    file_path = os.path.join(UPLOAD_DIR, f"{uuid.uuid4()}_{file.filename}")
     content = await file.read()
-    with open(file_path, "wb") as f:
-        f.write(content)
+    file_path = None
+    if RETAIN_UPLOADS:
+        file_path = os.path.join(UPLOAD_DIR, f"{uuid.uuid4()}_{file.filename}")
+        await run_blocking(PARSE_EXECUTOR, write_file, file_path, content)
 
-    resume_text = parse_resume(file_path)
+    try:
+        with STAGE_SECONDS.time(stage="parse"):
+            resume_text = await run_blocking(PARSE_EXECUTOR, parse_resume_bytes, content, file.filename)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     if not resume_text or len(resume_text.strip()) < 50:
         raise HTTPException(status_code=400, detail="Resume content too short")
 
     session_id = str(uuid.uuid4())
-    agent = InterviewAgent(resume_text)
-    sessions[session_id] = {'agent': agent, 'file_path': file_path}
+    agent = await run_blocking(None, InterviewAgent, resume_text)
+    await sessions.add(session_id, agent, file_path)
 
-    first_question, audio_path = agent.interview_turn()
+    try:
+        async with sessions.turn(session_id) as session:
+            agent = session['agent']
+            first_question, audio_path = await agent.ainterview_turn(wait_for_audio=wait_for_audio)
+    except SchedulerBusy:
+        # No question was asked; drop the session so the upload can be retried cleanly
+        await sessions.remove(session_id)
+        raise
     return {
         "status": "success",
         "session_id": session_id,
         "first_question": first_question,
-        "audio_path": audio_path
+        "audio_path": audio_path,
+        "audio_status": agent.audio_status(agent.question_count),
+        "audio_url": f"/audio/{session_id}/{agent.question_count}"
     }
 
-@app.post("/ask/")
-async def ask_question(session_id: str = Form(...), user_answer_audio: UploadFile = File(...)):
-    if session_id not in sessions:
-        raise HTTPException(status_code=404, detail="Invalid session ID")
-    session = sessions[session_id]
-    agent = session['agent']
-
-    # Save user audio temporarily
-    user_audio_path = os.path.join(UPLOAD_DIR, f"{uuid.uuid4()}_{user_answer_audio.filename}")
-    with open(user_audio_path, "wb") as f:
-        f.write(await user_answer_audio.read())
-
-    # Transcribe
-    import speech_recognition as sr
-    recognizer = sr.Recognizer()
+async def transcribe_upload(user_answer_audio: UploadFile) -> str:
+    audio_bytes = await user_answer_audio.read()
     try:
-        with sr.AudioFile(user_audio_path) as source:
-            audio_data = recognizer.record(source)
-            user_answer = recognizer.recognize_google(audio_data)
+        with STAGE_SECONDS.time(stage="stt"):
+            return await run_blocking(STT_EXECUTOR, transcribe_audio_file, audio_bytes)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"STT failed: {str(e)}")
-    finally:
-        if os.path.exists(user_audio_path):
-            os.remove(user_audio_path)
 
-    ai_response, audio_path = agent.interview_turn(user_answer.strip())
+@app.post("/ask/")
+async def ask_question(session_id: str = Form(...), user_answer_audio: UploadFile = File(...), wait_for_audio: bool = True):
+    if await sessions.get(session_id) is None:
+        raise HTTPException(status_code=404, detail="Invalid session ID")
+
+    user_answer = await transcribe_upload(user_answer_audio)
+
+    # Turns for one session are serialized (across workers too); different sessions run concurrently
+    async with sessions.turn(session_id) as session:
+        agent = session['agent']
+        ai_response, audio_path = await agent.ainterview_turn(user_answer.strip(), wait_for_audio=wait_for_audio)
     return {
         "status": "success",
         "transcribed_answer": user_answer,
         "ai_response": ai_response,
         "audio_path": audio_path,
+        "audio_status": agent.audio_status(agent.question_count),
+        "audio_url": f"/audio/{session_id}/{agent.question_count}",
         "question_number": agent.question_count
     }
 
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.post("/ask_stream/")
+async def ask_question_stream(session_id: str = Form(...), user_answer_audio: UploadFile = File(...)):
+    """Server-Sent Events variant of /ask/.
+
+    Emits ``transcript``, then ``token`` events as the reply is generated and
+    ``audio`` events per sentence as soon as each clip is synthesized,
+    followed by ``done``.
+    """
+    if await sessions.get(session_id) is None:
+        raise HTTPException(status_code=404, detail="Invalid session ID")
+
+    user_answer = await transcribe_upload(user_answer_audio)
+
+    async def event_stream():
+        yield sse_event("transcript", {"transcribed_answer": user_answer})
+        try:
+            async with sessions.turn(session_id) as session:
+                async for event in session['agent'].astream_turn(user_answer.strip()):
+                    yield sse_event(event.pop("type"), event)
+        except (SessionNotFound, SessionBusy) as e:
+            yield sse_event("error", {"detail": str(e)})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.websocket("/ws/answer/{session_id}")
+async def answer_stream(websocket: WebSocket, session_id: str):
+    """Stream candidate answers as raw audio and get interviewer turns back.
+
+    The client sends 16-bit mono PCM as binary frames (optionally preceded by
+    {"type": "config", "sample_rate": N}, N being 8000, 16000, 32000 or 48000;
+    malformed control messages get an ``error`` event). Audio is fed to the
+    recognizer as it arrives; voice-activity detection finds the end of the
+    answer (the client may also send {"type": "end"}). The server replies with
+    ``partial``/``final`` transcripts followed by the same turn events as
+    /ask_stream/ (``token``, ``audio``, ``done``), then listens for the next
+    answer.
+    """
+    if await sessions.get(session_id) is None:
+        await websocket.close(code=4404, reason="Invalid session ID")
+        return
+    await websocket.accept()
+
+    sample_rate = STT_SAMPLE_RATE
+    utterance = await run_blocking(STT_EXECUTOR, Utterance, sample_rate)
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+
+            ended = False
+            if message.get("bytes"):
+                ended = await run_blocking(STT_EXECUTOR, utterance.feed, message["bytes"])
+                if utterance.partial:
+                    await websocket.send_json({"type": "partial", "text": utterance.partial})
+            elif message.get("text"):
+                try:
+                    control = json.loads(message["text"])
+                    if not isinstance(control, dict):
+                        raise ValueError("expected a JSON object")
+                    if control.get("type") == "config":
+                        utterance = await run_blocking(STT_EXECUTOR, Utterance, int(control.get("sample_rate", sample_rate)))
+                        sample_rate = utterance.sample_rate
+                    elif control.get("type") == "end":
+                        ended = True
+                except (ValueError, TypeError) as e:
+                    # json.JSONDecodeError is a ValueError; the session stays open for a corrected message
+                    await websocket.send_json({"type": "error", "detail": f"Invalid control message: {str(e)}"})
+                    continue
+
+            if not ended:
+                continue
+
+            try:
+                # Only the tail is timed; earlier audio was recognized while it streamed in
+                with STAGE_SECONDS.time(stage="stt"):
+                    user_answer = await run_blocking(STT_EXECUTOR, utterance.finish)
+            except Exception as e:
+                user_answer = ""
+                logger.error(f"❌ Streaming STT failed: {str(e)}")
+            utterance = await run_blocking(STT_EXECUTOR, Utterance, sample_rate)
+            if not user_answer:
+                await websocket.send_json({"type": "error", "detail": "STT failed: no speech recognized"})
+                continue
+
+            await websocket.send_json({"type": "final", "transcribed_answer": user_answer})
+            try:
+                async with sessions.turn(session_id) as session:
+                    async for event in session['agent'].astream_turn(user_answer):
+                        await websocket.send_json(event)
+            except (SessionNotFound, SessionBusy) as e:
+                await websocket.send_json({"type": "error", "detail": str(e)})
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.error(f"❌ Answer stream failed: {str(e)}", exc_info=True)
+        try:
+            await websocket.send_json({"type": "error", "detail": "Internal error"})
+            await websocket.close(code=1011)
+        except Exception:
+            pass
+
 @app.get("/audio/{session_id}/{question_number}")
-async def get_audio(session_id: str, question_number: int):
-    session = sessions.get(session_id)
+async def get_audio(session_id: str, question_number: int, request: Request):
+    session = await sessions.get(session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
 
-    # Use STATIC_AUDIO_DIR instead of uploads
-    audio_path = os.path.join(STATIC_AUDIO_DIR, f"{session['agent'].session_id}_q{question_number}.mp3")
-    if not os.path.exists(audio_path):
+    agent = session['agent']
+    audio_status = agent.audio_status(question_number)
+    if audio_status == "pending":
+        # Clip is still rendering on the TTS pool; poll again shortly
+        return JSONResponse(status_code=202, content={"status": "pending"}, headers={"Retry-After": "1"})
+    if audio_status != "ready":
         raise HTTPException(status_code=404, detail="Audio file not found")
-    
-    # Serve as MP3
-    return FileResponse(audio_path, media_type="audio/mpeg")
+    audio_path = agent.audio_path_for(question_number)
+
+    # The ETag changes when the compact encoding replaces the WAV
+    stat = os.stat(audio_path)
+    etag = '"' + hashlib.md5(f"{audio_path}-{stat.st_mtime_ns}-{stat.st_size}".encode()).hexdigest() + '"'
+    headers = {"ETag": etag, "Cache-Control": "private, max-age=3600"}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+
+    # FileResponse handles Range requests, so clips can be streamed and resumed
+    return FileResponse(audio_path, media_type=sniff_media_type(audio_path), headers=headers)
 
 
 @app.delete("/session/{session_id}")
 async def end_session(session_id: str):
-    session = sessions.get(session_id)
-    if session:
-        # Remove resume
-        if os.path.exists(session['file_path']):
-            os.remove(session['file_path'])
-        # Remove AI audio
-        agent = session['agent']
-        for i in range(1, agent.question_count + 1):
-            audio_file = os.path.join(STATIC_AUDIO_DIR, f"{agent.session_id}_q{i}.mp3")
-            if os.path.exists(audio_file):
-                os.remove(audio_file)
-        del sessions[session_id]
+    # Removes the uploaded resume and generated audio as well
+    if await sessions.remove(session_id):
         return {"status": "success", "message": "Session ended"}
     raise HTTPException(status_code=404, detail="Session not found")
 
 @app.get("/session/{session_id}/status")
 async def get_session_status(session_id: str):
-    session = sessions.get(session_id)
+    session = await sessions.get(session_id)
     if session:
         agent = session['agent']
         return {
@@ -144,18 +341,25 @@ async def get_session_status(session_id: str):
         }
     raise HTTPException(status_code=404, detail="Session not found")
 
+@app.get("/sessions/stats")
+async def get_sessions_stats():
+    return await run_blocking(None, sessions.stats)
+
+@app.get("/llm/stats")
+async def get_llm_stats():
+    return scheduler.stats()
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus text-format metrics: stage timings, token usage, TTS queue and sessions"""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
 if __name__ == "__main__":
     import uvicorn
     print("🚀 Starting AI Interview System...")
-    working_model = test_ollama_models()
-    if working_model:
-        server = uvicorn.Server(
-            uvicorn.Config(app=app, host="0.0.0.0", port=8000)
-        )
-        try:
-            server.run()
-        except KeyboardInterrupt:
-            print("Shutting down server...")
-            asyncio.run(server.shutdown())  # Graceful shutdown
-    else:
-        print("❌ No working Ollama model found. Check 'ollama serve' and model pull")
+    # Model detection and warm-up happen once per worker in the app lifespan.
+    # With several workers, each has its own LLM scheduler and TTS pool: run
+    # common/llm_gateway.py in front of Ollama so generations are still capped
+    # in one place, and size TTS_WORKERS per worker.
+    workers = int(os.getenv("UVICORN_WORKERS", "1"))
+    uvicorn.run("main:app", host="0.0.0.0", port=8000, workers=workers)
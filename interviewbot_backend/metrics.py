@@ -0,0 +1,272 @@
+import time
+import uuid
+import asyncio
+import logging
+import functools
+import threading
+import contextvars
+from bisect import bisect_left
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Seconds; covers sub-millisecond cache hits up to slow generations
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+RATE_BUCKETS = (1, 2, 5, 10, 20, 30, 50, 75, 100, 200)
+TOKEN_BUCKETS = (64, 128, 256, 512, 1024, 2048, 4096, 8192)
+
+# ---------- trace IDs ----------
+
+trace_id_var = contextvars.ContextVar("trace_id", default="-")
+
+def new_trace_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+class TraceIdFilter(logging.Filter):
+    """Adds the current request's trace ID to log records as %(trace_id)s"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.trace_id = trace_id_var.get()
+        return True
+
+def install_trace_logging(fmt: str = "%(levelname)s:%(name)s:[%(trace_id)s] %(message)s"):
+    """Tag every record handled by the root logger with the trace ID"""
+    for handler in logging.getLogger().handlers:
+        handler.addFilter(TraceIdFilter())
+        handler.setFormatter(logging.Formatter(fmt))
+
+async def run_blocking(executor, func, *args):
+    """Run a blocking callable on the given executor without stalling the event loop.
+
+    The trace ID (and any other context variable) is carried into the worker thread.
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(executor, functools.partial(context.run, func, *args))
+
+# ---------- metric types ----------
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{str(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name: str, documentation: str, labels: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+        REGISTRY.register(self)
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(labels.get(name, "") for name in self.label_names)
+
+    def header(self) -> list:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: tuple = ()):
+        super().__init__(name, documentation, labels)
+        self._values = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def collect(self) -> list:
+        with self._lock:
+            values = dict(self._values)
+        return [f"{self.name}{_format_labels(self.label_names, key)} {value}" for key, value in sorted(values.items())]
+
+class Gauge(_Metric):
+    """Gauge set directly, or read from a callback at scrape time"""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labels: tuple = (), function=None):
+        super().__init__(name, documentation, labels)
+        self._values = {}
+        self.function = function
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def set_function(self, function):
+        self.function = function
+
+    def collect(self) -> list:
+        if self.function is not None:
+            try:
+                return [f"{self.name} {self.function()}"]
+            except Exception as e:
+                logger.warning(f"[METRICS] {self.name} callback failed: {str(e)}")
+                return []
+        with self._lock:
+            values = dict(self._values)
+        return [f"{self.name}{_format_labels(self.label_names, key)} {value}" for key, value in sorted(values.items())]
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        # key -> [bucket counts..., +Inf count, sum]
+        self._values = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[bisect_left(self.buckets, value)] += 1
+            series[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def collect(self) -> list:
+        with self._lock:
+            values = {key: list(series) for key, series in self._values.items()}
+        lines = []
+        for key, series in sorted(values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), series[:-1]):
+                cumulative += count
+                le = 'le="' + str(bound) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, le)} {cumulative}")
+            labels = _format_labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{labels} {series[-1]}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric: _Metric):
+        self._metrics.append(metric)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.header())
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+REGISTRY = Registry()
+
+# ---------- backend metrics ----------
+
+STAGE_SECONDS = Histogram(
+    "interview_stage_seconds",
+    "Time spent per pipeline stage (parse, stt, llm, llm_first_token, llm_prompt_eval, tts, tts_queue_wait)",
+    labels=("stage",)
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", labels=("method", "route", "status")
+)
+LLM_PROMPT_TOKENS = Counter("llm_prompt_tokens_total", "Prompt tokens evaluated by the model")
+LLM_COMPLETION_TOKENS = Counter("llm_completion_tokens_total", "Tokens generated by the model")
+LLM_PROMPT_SIZE = Histogram("llm_prompt_tokens", "Prompt size per generation in tokens", buckets=TOKEN_BUCKETS)
+LLM_TOKENS_PER_SECOND = Histogram(
+    "llm_tokens_per_second", "Generation speed reported by Ollama", labels=("phase",), buckets=RATE_BUCKETS
+)
+TTS_RENDERS = Counter("tts_renders_total", "TTS requests by outcome (cache_hit, shared, rendered, failed, rejected, timeout)", labels=("outcome",))
+ACTIVE_SESSIONS = Gauge("interview_active_sessions", "Live interview sessions")
+SESSION_MEMORY = Gauge("interview_session_memory_bytes", "Estimated memory held by live sessions")
+TTS_INFLIGHT = Gauge("tts_inflight_renders", "Distinct clips queued or rendering on the TTS pool")
+LLM_QUEUE_WAIT = Histogram("llm_queue_wait_seconds", "Time waiting for an LLM slot", labels=("priority",))
+LLM_REJECTED = Counter("llm_rejected_total", "Generations refused by the LLM scheduler", labels=("priority", "reason"))
+LLM_IN_FLIGHT = Gauge("llm_in_flight", "Generations holding an LLM slot")
+LLM_QUEUED = Gauge("llm_queued", "Generations waiting for an LLM slot")
+
+def observe_llm_queue(priority: str, seconds: float, outcome: str):
+    """LLMScheduler observer: queue wait for granted slots, counts of refusals"""
+    if outcome == "granted":
+        LLM_QUEUE_WAIT.observe(seconds, priority=priority)
+    else:
+        LLM_REJECTED.inc(priority=priority, reason=outcome)
+
+def record_llm_usage(metadata: dict, elapsed: float = None):
+    """Record token counts and speeds from an Ollama response's metadata.
+
+    Ollama reports prompt_eval_count/eval_count and their durations in
+    nanoseconds; prompt_eval_count is absent when the whole prompt was
+    served from the KV cache.
+    """
+    if not metadata or "eval_count" not in metadata:
+        return
+    prompt_tokens = metadata.get("prompt_eval_count") or 0
+    completion_tokens = metadata.get("eval_count") or 0
+    LLM_PROMPT_TOKENS.inc(prompt_tokens)
+    LLM_COMPLETION_TOKENS.inc(completion_tokens)
+    LLM_PROMPT_SIZE.observe(prompt_tokens)
+
+    prompt_seconds = (metadata.get("prompt_eval_duration") or 0) / 1e9
+    eval_seconds = (metadata.get("eval_duration") or 0) / 1e9
+    if prompt_seconds:
+        STAGE_SECONDS.observe(prompt_seconds, stage="llm_prompt_eval")
+        LLM_TOKENS_PER_SECOND.observe(prompt_tokens / prompt_seconds, phase="prompt")
+    if eval_seconds:
+        LLM_TOKENS_PER_SECOND.observe(completion_tokens / eval_seconds, phase="generation")
+
+    logger.info(
+        f"[LLM] prompt={prompt_tokens} tok in {prompt_seconds:.2f}s, "
+        f"completion={completion_tokens} tok in {eval_seconds:.2f}s"
+        + (f", total {elapsed:.2f}s" if elapsed is not None else "")
+    )
+
+class TraceMiddleware:
+    """ASGI middleware: assigns each request (or WebSocket) a trace ID and times HTTP requests.
+
+    An incoming X-Request-ID header is reused as the trace ID; it is echoed
+    back as X-Trace-ID. Latency is labelled with the route template rather
+    than the raw path, so session IDs do not create new series.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        trace_id = headers.get(b"x-request-id", b"").decode("latin-1")[:64] or new_trace_id()
+        token = trace_id_var.set(trace_id)
+        status = {"code": 500}
+        start = time.perf_counter()
+
+        async def send_with_trace(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"x-trace-id", trace_id.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_trace)
+        finally:
+            if scope["type"] == "http":
+                elapsed = time.perf_counter() - start
+                route = getattr(scope.get("route"), "path", "unmatched")
+                HTTP_REQUEST_SECONDS.observe(elapsed, method=scope["method"], route=route, status=status["code"])
+                logger.info(f"[HTTP] {scope['method']} {scope['path']} {status['code']} in {elapsed * 1000:.1f} ms")
+            trace_id_var.reset(token)
@@ -1,43 +1,104 @@
-import fitz  # PyMuPDF
-import docx
 import os
+import sys
+import hashlib
+import threading
+from collections import OrderedDict
 
-def extract_text_from_pdf(file_path: str) -> str:
+# The extraction engine is shared with the resume analyzer (repo root/common)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from common.extraction import extract_pdf_text, extract_docx_text, extract_txt_text
+
+# Total characters of parsed text kept in the parse cache
+PARSE_CACHE_MAX_CHARS = int(os.getenv("PARSE_CACHE_MAX_CHARS", str(32 * 1024 * 1024)))
+
+def extract_text_from_pdf(source) -> str:
+    """Extract PDF text from a path or raw bytes"""
     try:
-        text = ""
-        with fitz.open(file_path) as pdf:
-            for page in pdf:
-                text += page.get_text()
-        return text.strip()
+        return extract_pdf_text(source)
     except Exception as e:
         raise ValueError(f"Error reading PDF file: {str(e)}")
 
-def extract_text_from_docx(file_path: str) -> str:
+def extract_text_from_docx(source) -> str:
+    """Extract DOCX text from a path or raw bytes"""
     try:
-        doc = docx.Document(file_path)
-        text = "\n".join([para.text for para in doc.paragraphs if para.text.strip()])
-        return text.strip()
+        return extract_docx_text(source)
     except Exception as e:
         raise ValueError(f"Error reading DOCX file: {str(e)}")
 
-def extract_text_from_txt(file_path: str) -> str:
+def extract_text_from_txt(source) -> str:
+    """Read TXT content from a path or raw bytes"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            return file.read().strip()
+        return extract_txt_text(source)
     except Exception as e:
         raise ValueError(f"Error reading TXT file: {str(e)}")
 
-def parse_resume(file_path: str) -> str:
-    if not os.path.exists(file_path):
-        raise ValueError("File does not exist")
-    
-    file_extension = file_path.lower().split('.')[-1]
-    
+def _extract(source, file_extension: str) -> str:
     if file_extension == "pdf":
-        return extract_text_from_pdf(file_path)
+        return extract_text_from_pdf(source)
     elif file_extension == "docx":
-        return extract_text_from_docx(file_path)
+        return extract_text_from_docx(source)
     elif file_extension == "txt":
-        return extract_text_from_txt(file_path)
+        return extract_text_from_txt(source)
     else:
-        raise ValueError(f"Unsupported file format: {file_extension}. Please upload PDF, DOCX, or TXT files.")
\ No newline at end of file
+        raise ValueError(f"Unsupported file format: {file_extension}. Please upload PDF, DOCX, or TXT files.")
+
+def parse_resume(file_path: str) -> str:
+    if not os.path.exists(file_path):
+        raise ValueError("File does not exist")
+
+    file_extension = file_path.lower().split('.')[-1]
+    return _extract(file_path, file_extension)
+
+class ParseCache:
+    """Thread-safe LRU of parsed text keyed by content hash, bounded by total characters"""
+
+    def __init__(self, max_chars: int = PARSE_CACHE_MAX_CHARS):
+        self.max_chars = max_chars
+        self._entries = OrderedDict()
+        self._chars = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> str:
+        with self._lock:
+            text = self._entries.get(key)
+            if text is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return text
+
+    def put(self, key: str, text: str):
+        if len(text) > self.max_chars:
+            return
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = text
+            self._chars += len(text)
+            while self._chars > self.max_chars:
+                _, evicted = self._entries.popitem(last=False)
+                self._chars -= len(evicted)
+
+parse_cache = ParseCache()
+
+def content_hash(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+def parse_resume_bytes(content: bytes, filename: str) -> str:
+    """Parse an uploaded resume straight from memory.
+
+    Results are cached by content hash, so re-uploading the same file
+    skips extraction entirely.
+    """
+    file_extension = filename.lower().split('.')[-1]
+    key = f"{file_extension}:{content_hash(content)}"
+    cached = parse_cache.get(key)
+    if cached is not None:
+        return cached
+
+    text = _extract(content, file_extension)
+    parse_cache.put(key, text)
+    return text
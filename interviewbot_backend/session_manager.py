@@ -0,0 +1,293 @@
+import os
+import glob
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+from session_store import SessionStore, open_store
+from metrics import run_blocking
+
+logger = logging.getLogger(__name__)
+
+STATIC_AUDIO_DIR = os.path.join("static", "audio")
+
+SESSION_IDLE_TTL = float(os.getenv("SESSION_IDLE_TTL", "1800"))
+SESSION_MAX_COUNT = int(os.getenv("SESSION_MAX_COUNT", "200"))
+SESSION_MEMORY_BUDGET = int(os.getenv("SESSION_MEMORY_BUDGET", str(256 * 1024 * 1024)))
+SESSION_REAP_INTERVAL = float(os.getenv("SESSION_REAP_INTERVAL", "60"))
+# A turn holds the session's lease for at most this long (covers a worker dying mid-turn)
+SESSION_TURN_LEASE = float(os.getenv("SESSION_TURN_LEASE", "120"))
+# How long a turn waits for one already running on another worker
+SESSION_TURN_WAIT = float(os.getenv("SESSION_TURN_WAIT", "30"))
+
+class SessionNotFound(Exception):
+    """The session does not exist (never created, ended or expired)"""
+
+class SessionBusy(Exception):
+    """Another turn for the session is still running (possibly on another worker)"""
+
+def estimate_agent_bytes(agent) -> int:
+    """Rough memory footprint of an agent's per-session state (transcript + history)"""
+    size = sum(len(message.content) for message in agent.messages)
+    size += sum(len(message) for _, message in agent.conversation_history)
+    # str is ~1 byte per ASCII char; add a fixed allowance for objects/futures
+    return size + 4096
+
+class SessionManager:
+    """Interview sessions kept in a shared store, with agents cached per worker.
+
+    Session state is serialized to the store (see session_store.py) after
+    every turn, so any uvicorn worker can serve any turn of any session.
+    Each worker caches rehydrated agents and checks the stored version on
+    every access, rebuilding the agent only when another worker has moved
+    the session on. Cached agents beyond SESSION_MEMORY_BUDGET are dropped
+    least recently used first; they are rehydrated on demand.
+
+    Turns run inside turn(): a local lock serializes them within a worker
+    and a lease in the store across workers. Sessions expire after
+    SESSION_IDLE_TTL seconds without access, and the least recently used
+    ones are removed beyond SESSION_MAX_COUNT. Removing a session also
+    deletes its uploaded resume and generated audio. Sessions in the middle
+    of a turn are never evicted.
+    """
+
+    def __init__(self, rehydrate, store: SessionStore = None, idle_ttl: float = SESSION_IDLE_TTL,
+                 max_sessions: int = SESSION_MAX_COUNT, memory_budget: int = SESSION_MEMORY_BUDGET,
+                 reap_interval: float = SESSION_REAP_INTERVAL, turn_lease: float = SESSION_TURN_LEASE,
+                 turn_wait: float = SESSION_TURN_WAIT):
+        # rehydrate(state) -> agent, e.g. InterviewAgent.from_state
+        self.rehydrate = rehydrate
+        self.store = store if store is not None else open_store()
+        self.idle_ttl = idle_ttl
+        self.max_sessions = max_sessions
+        self.memory_budget = memory_budget
+        self.reap_interval = reap_interval
+        self.turn_lease = turn_lease
+        self.turn_wait = turn_wait
+        # Store queries and rehydration are blocking; keep them off the event loop
+        self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="session")
+        self._agents = OrderedDict()
+        self._memory_used = 0
+        self._reaper = None
+        # Sessions in the store as of the last count (reaper pass or a change on this worker),
+        # so stats and metrics scrapes never query the store
+        self.session_count = 0
+        self.evicted = 0
+        self.expired = 0
+        self.rehydrated = 0
+
+    async def _run(self, func, *args):
+        return await run_blocking(self._executor, func, *args)
+
+    # ---------- per-worker agent cache ----------
+
+    def _cache(self, session_id: str, agent, version: int, file_path: str) -> dict:
+        """Insert or refresh the cached entry; an existing entry keeps its lock"""
+        entry = self._agents.get(session_id)
+        if entry is None:
+            entry = self._agents[session_id] = {'lock': asyncio.Lock(), 'size': 0}
+        entry.update(agent=agent, version=version, file_path=file_path, last_access=time.monotonic())
+        self._resize(entry)
+        self._agents.move_to_end(session_id)
+        self._enforce_memory(keep=session_id)
+        return entry
+
+    def _resize(self, entry: dict):
+        size = estimate_agent_bytes(entry['agent'])
+        self._memory_used += size - entry['size']
+        entry['size'] = size
+
+    def _drop(self, session_id: str):
+        entry = self._agents.pop(session_id, None)
+        if entry is not None:
+            self._memory_used -= entry['size']
+
+    def _enforce_memory(self, keep: str = None):
+        while self._memory_used > self.memory_budget:
+            victim = next(
+                (session_id for session_id, entry in self._agents.items()
+                 if session_id != keep and not entry['lock'].locked()),
+                None
+            )
+            if victim is None:
+                break
+            # Only the cached agent goes; the session itself stays in the store
+            self._drop(victim)
+
+    def _load(self, session_id: str) -> tuple:
+        """(agent, version) rebuilt from the store, or None; runs on the executor"""
+        loaded = self.store.load(session_id)
+        if loaded is None:
+            return None
+        state, version = loaded
+        return self.rehydrate(state), version
+
+    # ---------- sessions ----------
+
+    async def add(self, session_id: str, agent, file_path: str = None) -> dict:
+        version = await self._run(self.store.create, session_id, agent.to_state(), file_path, agent.session_id)
+        entry = self._cache(session_id, agent, version, file_path)
+        await self._enforce_count(keep=session_id)
+        return entry
+
+    async def get(self, session_id: str) -> dict:
+        """Return the session with an up-to-date agent and mark it as recently used, or None"""
+        head = await self._run(self.store.head, session_id)
+        if head is None:
+            self._drop(session_id)
+            return None
+        entry = self._agents.get(session_id)
+        if entry is not None and entry['version'] == head['version']:
+            entry['last_access'] = time.monotonic()
+            self._agents.move_to_end(session_id)
+            return entry
+
+        loaded = await self._run(self._load, session_id)
+        if loaded is None:
+            self._drop(session_id)
+            return None
+        agent, version = loaded
+        self.rehydrated += 1
+        return self._cache(session_id, agent, version, head['file_path'])
+
+    @asynccontextmanager
+    async def turn(self, session_id: str):
+        """Run one turn with exclusive access to the session, saving its state afterwards.
+
+        Raises SessionNotFound, or SessionBusy when a turn running elsewhere
+        does not finish within SESSION_TURN_WAIT. If the body raises, nothing
+        is saved and the cached agent is rebuilt from the store next time.
+        """
+        entry = await self.get(session_id)
+        if entry is None:
+            raise SessionNotFound(f"Session {session_id} not found")
+        async with entry['lock']:
+            owner = await self._acquire_lease(session_id)
+            try:
+                # Another worker may have run a turn while we waited
+                entry = await self.get(session_id)
+                if entry is None:
+                    raise SessionNotFound(f"Session {session_id} not found")
+                try:
+                    yield entry
+                except BaseException:
+                    entry['version'] = None
+                    raise
+                version = await self._run(self.store.save, session_id, entry['agent'].to_state(), entry['version'])
+                if version is None:
+                    logger.warning(f"⚠️ Session {session_id} changed or ended during the turn; turn not saved")
+                entry['version'] = version
+                self._resize(entry)
+                self._enforce_memory(keep=session_id)
+            finally:
+                await self._run(self.store.release_lease, session_id, owner)
+
+    async def _acquire_lease(self, session_id: str) -> str:
+        """Wait for the session's lease; returns its owner token"""
+        deadline = time.monotonic() + self.turn_wait
+        delay = 0.05
+        while True:
+            owner = await self._run(self.store.acquire_lease, session_id, self.turn_lease)
+            if owner is not None:
+                return owner
+            if time.monotonic() >= deadline:
+                raise SessionBusy("Another turn for this session is still in progress")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 1.0)
+
+    async def remove(self, session_id: str) -> bool:
+        self._drop(session_id)
+        row = await self._run(self.store.delete, session_id)
+        if row is None:
+            return False
+        self.session_count = max(0, self.session_count - 1)
+        await self._run(cleanup_session_files, row['file_path'], row['audio_prefix'])
+        return True
+
+    async def reap_expired(self) -> int:
+        """Remove sessions idle for longer than the TTL, and stale cached agents"""
+        expired = await self._run(self.store.expire, time.time() - self.idle_ttl)
+        for row in expired:
+            self._drop(row['session_id'])
+            await self._run(cleanup_session_files, row['file_path'], row['audio_prefix'])
+        if expired:
+            self.expired += len(expired)
+            logger.info(f"🧹 Reaped {len(expired)} idle sessions")
+
+        # Agents for sessions that moved to other workers (or were reaped there)
+        cutoff = time.monotonic() - self.idle_ttl
+        for session_id in [session_id for session_id, entry in self._agents.items()
+                           if entry['last_access'] < cutoff and not entry['lock'].locked()]:
+            self._drop(session_id)
+        self.session_count = await self._run(self.store.count)
+        return len(expired)
+
+    async def _enforce_count(self, keep: str = None):
+        self.session_count = await self._run(self.store.count)
+        excess = self.session_count - self.max_sessions
+        if excess <= 0:
+            return
+        candidates = await self._run(self.store.least_recent, excess + 1)
+        for victim in [session_id for session_id in candidates if session_id != keep][:excess]:
+            entry = self._agents.get(victim)
+            if entry is not None and entry['lock'].locked():
+                continue
+            logger.info(f"🧹 Evicting least recently used session {victim}")
+            if await self.remove(victim):
+                self.evicted += 1
+
+    async def _reap_forever(self):
+        while True:
+            try:
+                await self.reap_expired()
+            except Exception as e:
+                logger.error(f"❌ Session reaper failed: {str(e)}", exc_info=True)
+            await asyncio.sleep(self.reap_interval)
+
+    def start(self):
+        if self._reaper is None:
+            self._reaper = asyncio.create_task(self._reap_forever())
+
+    async def stop(self):
+        if self._reaper is not None:
+            self._reaper.cancel()
+            try:
+                await self._reaper
+            except asyncio.CancelledError:
+                pass
+            self._reaper = None
+        self._executor.shutdown(wait=False)
+
+    @property
+    def memory_used(self) -> int:
+        return self._memory_used
+
+    def stats(self) -> dict:
+        """Counters for /sessions/stats and /metrics; never touches the store"""
+        return {
+            "active_sessions": self.session_count,
+            "cached_agents": len(self._agents),
+            "busy_sessions": sum(1 for entry in self._agents.values() if entry['lock'].locked()),
+            "max_sessions": self.max_sessions,
+            "memory_used_bytes": self._memory_used,
+            "memory_budget_bytes": self.memory_budget,
+            "idle_ttl_seconds": self.idle_ttl,
+            "evicted_total": self.evicted,
+            "expired_total": self.expired,
+            "rehydrated_total": self.rehydrated,
+            "store": type(self.store).__name__
+        }
+
+def cleanup_session_files(file_path: str, audio_prefix: str):
+    """Delete the uploaded resume and all generated audio for a session"""
+    if file_path and os.path.exists(file_path):
+        os.remove(file_path)
+    if not audio_prefix:
+        return
+    for audio_file in glob.glob(os.path.join(STATIC_AUDIO_DIR, f"{audio_prefix}_q*")):
+        try:
+            os.remove(audio_file)
+        except OSError:
+            pass
@@ -0,0 +1,274 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+
+# "sqlite:///path/to/sessions.sqlite3" (shared by every worker) or "memory" (single worker only)
+SESSION_STORE = os.getenv("SESSION_STORE", "sqlite:///" + os.path.join("session_store", "sessions.sqlite3"))
+# head() rewrites last_access at most this often (seconds); saves always refresh it
+SESSION_TOUCH_INTERVAL = float(os.getenv("SESSION_TOUCH_INTERVAL", "10"))
+
+class SessionStore(ABC):
+    """Serialized interview sessions shared by all worker processes.
+
+    Each record holds the agent state (JSON), a version that is bumped on
+    every save, and a turn lease so that only one worker at a time runs a
+    turn for a session. Each lease carries an owner token, so a turn that
+    outlived its lease cannot release the one another worker took over. Row dicts returned by head()/delete()/expire() carry
+    session_id, version, file_path, audio_prefix and last_access.
+    """
+
+    @abstractmethod
+    def create(self, session_id: str, state: dict, file_path: str = None, audio_prefix: str = None) -> int:
+        ...
+
+    @abstractmethod
+    def head(self, session_id: str) -> dict:
+        """Row metadata without the state, refreshing last_access (possibly coarsely); None if missing"""
+
+    @abstractmethod
+    def load(self, session_id: str) -> tuple:
+        """(state, version), or None if missing"""
+
+    @abstractmethod
+    def save(self, session_id: str, state: dict, version: int) -> int:
+        """Store state if the row is still at version; returns the new version, or None"""
+
+    @abstractmethod
+    def acquire_lease(self, session_id: str, seconds: float) -> str:
+        """Owner token for release_lease(), or None while another turn holds the lease"""
+
+    @abstractmethod
+    def release_lease(self, session_id: str, owner: str):
+        """End the lease, unless it has since passed to another owner"""
+
+    @abstractmethod
+    def delete(self, session_id: str) -> dict:
+        ...
+
+    @abstractmethod
+    def expire(self, cutoff: float) -> list:
+        """Delete rows idle since before cutoff (wall clock) with no turn running"""
+
+    @abstractmethod
+    def least_recent(self, limit: int) -> list:
+        """IDs of the least recently used sessions with no turn running, oldest first"""
+
+    @abstractmethod
+    def count(self) -> int:
+        ...
+
+ROW_COLUMNS = "session_id, version, file_path, audio_prefix, last_access"
+
+def _row(values) -> dict:
+    return dict(zip(("session_id", "version", "file_path", "audio_prefix", "last_access"), values))
+
+class SQLiteSessionStore(SessionStore):
+    """Session store in one SQLite file; safe to share between processes on a host.
+
+    Each thread keeps its own connection. Reads through head() only write
+    last_access back once it is touch_interval seconds old, so polling
+    endpoints do not turn into a stream of write transactions.
+    """
+
+    def __init__(self, path: str, touch_interval: float = SESSION_TOUCH_INTERVAL):
+        self.path = path
+        self.touch_interval = touch_interval
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # WAL is recorded in the database file, so setting it once covers every connection
+        self._connect().execute("PRAGMA journal_mode=WAL")
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                " session_id TEXT PRIMARY KEY, state TEXT NOT NULL, version INTEGER NOT NULL,"
+                " file_path TEXT, audio_prefix TEXT, created REAL, last_access REAL,"
+                " lease_until REAL NOT NULL DEFAULT 0, lease_owner TEXT)"
+            )
+            # Stores created before leases had owners
+            if "lease_owner" not in {row[1] for row in conn.execute("PRAGMA table_info(sessions)")}:
+                conn.execute("ALTER TABLE sessions ADD COLUMN lease_owner TEXT")
+            conn.execute("CREATE INDEX IF NOT EXISTS sessions_last_access ON sessions (last_access)")
+
+    def _connect(self) -> sqlite3.Connection:
+        """This thread's connection; use as a context manager for one transaction"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            # With WAL, NORMAL still survives a worker crash but skips the fsync on every commit
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def create(self, session_id, state, file_path=None, audio_prefix=None):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO sessions (session_id, state, version, file_path, audio_prefix, created, last_access)"
+                " VALUES (?, ?, 1, ?, ?, ?, ?)",
+                (session_id, json.dumps(state), file_path, audio_prefix, now, now)
+            )
+        return 1
+
+    def head(self, session_id):
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(f"SELECT {ROW_COLUMNS} FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+            if row is None:
+                return None
+            head = _row(row)
+            if now - head["last_access"] >= self.touch_interval:
+                conn.execute("UPDATE sessions SET last_access = ? WHERE session_id = ?", (now, session_id))
+                head["last_access"] = now
+        return head
+
+    def load(self, session_id):
+        with self._connect() as conn:
+            row = conn.execute("SELECT state, version FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+        return (json.loads(row[0]), row[1]) if row else None
+
+    def save(self, session_id, state, version):
+        with self._connect() as conn:
+            updated = conn.execute(
+                "UPDATE sessions SET state = ?, version = version + 1, last_access = ?"
+                " WHERE session_id = ? AND version = ?",
+                (json.dumps(state), time.time(), session_id, version)
+            ).rowcount
+        return version + 1 if updated else None
+
+    def acquire_lease(self, session_id, seconds):
+        now = time.time()
+        owner = uuid.uuid4().hex
+        with self._connect() as conn:
+            acquired = conn.execute(
+                "UPDATE sessions SET lease_until = ?, lease_owner = ? WHERE session_id = ? AND lease_until < ?",
+                (now + seconds, owner, session_id, now)
+            ).rowcount == 1
+        return owner if acquired else None
+
+    def release_lease(self, session_id, owner):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE sessions SET lease_until = 0, lease_owner = NULL WHERE session_id = ? AND lease_owner = ?",
+                (session_id, owner)
+            )
+
+    def delete(self, session_id):
+        with self._connect() as conn:
+            row = conn.execute(f"SELECT {ROW_COLUMNS} FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+            if row is None:
+                return None
+            conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+        return _row(row)
+
+    def expire(self, cutoff):
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"DELETE FROM sessions WHERE last_access < ? AND lease_until < ? RETURNING {ROW_COLUMNS}",
+                (cutoff, time.time())
+            ).fetchall()
+        return [_row(row) for row in rows]
+
+    def least_recent(self, limit):
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT session_id FROM sessions WHERE lease_until < ? ORDER BY last_access LIMIT ?", (time.time(), limit)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def count(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+class MemorySessionStore(SessionStore):
+    """In-process store with the same semantics, for a single worker or tests.
+
+    State is still kept as JSON, so anything that would not survive the
+    SQLite store fails here too.
+    """
+
+    def __init__(self):
+        self._rows = {}
+        self._lock = threading.Lock()
+
+    def create(self, session_id, state, file_path=None, audio_prefix=None):
+        now = time.time()
+        with self._lock:
+            if session_id in self._rows:
+                raise KeyError(f"Session {session_id} already exists")
+            self._rows[session_id] = {
+                "session_id": session_id, "state": json.dumps(state), "version": 1, "file_path": file_path,
+                "audio_prefix": audio_prefix, "last_access": now, "lease_until": 0.0, "lease_owner": None
+            }
+        return 1
+
+    def _public(self, row: dict) -> dict:
+        return {key: row[key] for key in ("session_id", "version", "file_path", "audio_prefix", "last_access")}
+
+    def head(self, session_id):
+        with self._lock:
+            row = self._rows.get(session_id)
+            if row is None:
+                return None
+            row["last_access"] = time.time()
+            return self._public(row)
+
+    def load(self, session_id):
+        with self._lock:
+            row = self._rows.get(session_id)
+            return (json.loads(row["state"]), row["version"]) if row else None
+
+    def save(self, session_id, state, version):
+        with self._lock:
+            row = self._rows.get(session_id)
+            if row is None or row["version"] != version:
+                return None
+            row.update(state=json.dumps(state), version=version + 1, last_access=time.time())
+            return version + 1
+
+    def acquire_lease(self, session_id, seconds):
+        now = time.time()
+        with self._lock:
+            row = self._rows.get(session_id)
+            if row is None or row["lease_until"] >= now:
+                return None
+            row.update(lease_until=now + seconds, lease_owner=uuid.uuid4().hex)
+            return row["lease_owner"]
+
+    def release_lease(self, session_id, owner):
+        with self._lock:
+            row = self._rows.get(session_id)
+            if row is not None and row["lease_owner"] == owner:
+                row.update(lease_until=0.0, lease_owner=None)
+
+    def delete(self, session_id):
+        with self._lock:
+            row = self._rows.pop(session_id, None)
+        return self._public(row) if row else None
+
+    def expire(self, cutoff):
+        now = time.time()
+        with self._lock:
+            expired = [session_id for session_id, row in self._rows.items()
+                       if row["last_access"] < cutoff and row["lease_until"] < now]
+            return [self._public(self._rows.pop(session_id)) for session_id in expired]
+
+    def least_recent(self, limit):
+        now = time.time()
+        with self._lock:
+            rows = sorted((row for row in self._rows.values() if row["lease_until"] < now), key=lambda row: row["last_access"])
+        return [row["session_id"] for row in rows[:limit]]
+
+    def count(self):
+        with self._lock:
+            return len(self._rows)
+
+def open_store(url: str = SESSION_STORE) -> SessionStore:
+    if url == "memory":
+        return MemorySessionStore()
+    if url.startswith("sqlite:///"):
+        return SQLiteSessionStore(url[len("sqlite:///"):])
+    raise ValueError(f"Unsupported SESSION_STORE: {url}. Use 'memory' or 'sqlite:///path'")
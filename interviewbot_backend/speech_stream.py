@@ -0,0 +1,247 @@
+import os
+import sys
+import json
+import math
+import array
+import logging
+from abc import ABC, abstractmethod
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+# Candidate audio arrives as 16-bit little-endian mono PCM
+STT_SAMPLE_RATE = int(os.getenv("STT_SAMPLE_RATE", "16000"))
+STT_BACKEND = os.getenv("STT_BACKEND", "google")
+VAD_FRAME_MS = 30
+# Rates webrtcvad accepts; the energy fallback is held to the same set
+VAD_SAMPLE_RATES = (8000, 16000, 32000, 48000)
+# Trailing silence that ends an utterance
+VAD_SILENCE_MS = int(os.getenv("VAD_SILENCE_MS", "800"))
+# Voiced audio needed before silence can end an utterance
+VAD_MIN_SPEECH_MS = int(os.getenv("VAD_MIN_SPEECH_MS", "300"))
+# Audio kept from before the first voiced frame, so word onsets below the VAD threshold are not clipped
+VAD_PREROLL_MS = int(os.getenv("VAD_PREROLL_MS", "300"))
+MAX_UTTERANCE_SECONDS = int(os.getenv("MAX_UTTERANCE_SECONDS", "180"))
+
+def frame_rms(frame: bytes) -> float:
+    samples = array.array("h", frame[:len(frame) // 2 * 2])
+    if sys.byteorder == "big":
+        samples.byteswap()
+    if not samples:
+        return 0.0
+    return math.sqrt(sum(sample * sample for sample in samples) / len(samples))
+
+class EnergyVAD:
+    """Frame-level voice activity detection on RMS energy with an adaptive noise floor.
+
+    The floor starts at a quiet-room level rather than at the first frame,
+    which may already be speech, and only learns from frames judged silent.
+    """
+
+    def __init__(self, threshold_ratio: float = 3.0, min_rms: int = 300, initial_floor: float = 100.0):
+        self.threshold_ratio = threshold_ratio
+        self.min_rms = min_rms
+        self.noise_floor = initial_floor
+
+    def is_speech(self, frame: bytes, sample_rate: int) -> bool:
+        rms = frame_rms(frame)
+        speech = rms > max(self.min_rms, self.noise_floor * self.threshold_ratio)
+        if not speech:
+            # Track the background level slowly so the threshold follows the room
+            self.noise_floor = 0.95 * self.noise_floor + 0.05 * rms
+        return speech
+
+class WebRTCVAD:
+    """webrtcvad-based detection (pip install webrtcvad), used when available"""
+
+    def __init__(self, aggressiveness: int = 2):
+        import webrtcvad
+        self.vad = webrtcvad.Vad(aggressiveness)
+
+    def is_speech(self, frame: bytes, sample_rate: int) -> bool:
+        return self.vad.is_speech(frame, sample_rate)
+
+def create_vad():
+    try:
+        return WebRTCVAD()
+    except ImportError:
+        return EnergyVAD()
+
+class RecognizerBackend(ABC):
+    """Pluggable speech recognizer fed with PCM as the candidate speaks.
+
+    accept() may return a partial transcript; finish() returns the final one.
+    """
+
+    incremental = False
+
+    def __init__(self, sample_rate: int):
+        self.sample_rate = sample_rate
+
+    @classmethod
+    def load_model(cls):
+        """Load any model the backend needs up front; blocking, so call it off the event loop"""
+
+    def accept(self, pcm: bytes) -> str:
+        return None
+
+    @abstractmethod
+    def finish(self) -> str:
+        """Final transcript of everything accepted"""
+
+class GoogleRecognizer(RecognizerBackend):
+    """speech_recognition's Google recognizer; buffers audio and decodes it in memory"""
+
+    def __init__(self, sample_rate: int):
+        super().__init__(sample_rate)
+        self.buffer = bytearray()
+
+    def accept(self, pcm: bytes) -> str:
+        self.buffer.extend(pcm)
+        return None
+
+    def finish(self) -> str:
+        import speech_recognition as sr
+        if not self.buffer:
+            return ""
+        audio_data = sr.AudioData(bytes(self.buffer), self.sample_rate, 2)
+        return sr.Recognizer().recognize_google(audio_data)
+
+class VoskRecognizer(RecognizerBackend):
+    """Local incremental recognition with Vosk (pip install vosk; set VOSK_MODEL_PATH)"""
+
+    incremental = True
+    _model = None
+
+    @classmethod
+    def load_model(cls):
+        import vosk
+        if VoskRecognizer._model is None:
+            VoskRecognizer._model = vosk.Model(os.environ["VOSK_MODEL_PATH"])
+        return VoskRecognizer._model
+
+    def __init__(self, sample_rate: int):
+        super().__init__(sample_rate)
+        import vosk
+        self.recognizer = vosk.KaldiRecognizer(self.load_model(), sample_rate)
+        self.segments = []
+
+    def accept(self, pcm: bytes) -> str:
+        if self.recognizer.AcceptWaveform(pcm):
+            self.segments.append(json.loads(self.recognizer.Result()).get("text", ""))
+            return " ".join(filter(None, self.segments))
+        partial = json.loads(self.recognizer.PartialResult()).get("partial", "")
+        return " ".join(filter(None, self.segments + [partial]))
+
+    def finish(self) -> str:
+        self.segments.append(json.loads(self.recognizer.FinalResult()).get("text", ""))
+        return " ".join(filter(None, self.segments))
+
+class StubRecognizer(RecognizerBackend):
+    """Returns a fixed transcript (STT_STUB_TEXT) without any recognition; for benchmarks"""
+
+    def finish(self) -> str:
+        return os.getenv("STT_STUB_TEXT", "I have three years of experience building Python web services.")
+
+RECOGNIZERS = {
+    "google": GoogleRecognizer,
+    "vosk": VoskRecognizer,
+    "stub": StubRecognizer
+}
+
+def recognizer_class(backend: str = None) -> type:
+    backend = backend or STT_BACKEND
+    if backend not in RECOGNIZERS:
+        raise ValueError(f"Unknown STT backend: {backend}. Available: {list(RECOGNIZERS)}")
+    return RECOGNIZERS[backend]
+
+def create_recognizer(sample_rate: int, backend: str = None) -> RecognizerBackend:
+    return recognizer_class(backend)(sample_rate)
+
+def load_recognizer_model(backend: str = None):
+    """Load the configured backend's model (e.g. Vosk) once, before the first answer needs it"""
+    recognizer_class(backend).load_model()
+
+def decode_audio_file(audio_bytes: bytes) -> tuple:
+    """Decode an uploaded answer in memory into (16-bit mono PCM, sample rate).
+
+    Plain 16-bit mono WAV is read with the standard library; anything else
+    (stereo, other widths, AIFF, FLAC) goes through speech_recognition.
+    """
+    import io
+    import wave
+    try:
+        with wave.open(io.BytesIO(audio_bytes)) as clip:
+            if clip.getnchannels() == 1 and clip.getsampwidth() == 2:
+                return clip.readframes(clip.getnframes()), clip.getframerate()
+    except (wave.Error, EOFError):
+        pass
+    import speech_recognition as sr
+    with sr.AudioFile(io.BytesIO(audio_bytes)) as source:
+        audio_data = sr.Recognizer().record(source)
+    return audio_data.get_raw_data(convert_width=2), audio_data.sample_rate
+
+def transcribe_audio_file(audio_bytes: bytes, backend: str = None) -> str:
+    """Transcribe a complete uploaded answer with the configured recognizer backend"""
+    pcm, sample_rate = decode_audio_file(audio_bytes)
+    recognizer = create_recognizer(sample_rate, backend)
+    recognizer.accept(pcm)
+    return recognizer.finish().strip()
+
+class Utterance:
+    """Collects streamed PCM for one answer, detecting its end with VAD.
+
+    Audio is handed to the recognizer frame by frame as it arrives, so
+    incremental backends have (almost) finished by the time the candidate
+    stops talking.
+    """
+
+    def __init__(self, sample_rate: int = STT_SAMPLE_RATE, backend: str = None):
+        if sample_rate not in VAD_SAMPLE_RATES:
+            raise ValueError(f"Unsupported sample rate {sample_rate}. Use one of {list(VAD_SAMPLE_RATES)}")
+        self.sample_rate = sample_rate
+        self.frame_bytes = sample_rate * VAD_FRAME_MS // 1000 * 2
+        self.recognizer = create_recognizer(sample_rate, backend)
+        self.vad = create_vad()
+        self.pending = bytearray()
+        self.preroll = deque(maxlen=max(1, VAD_PREROLL_MS // VAD_FRAME_MS))
+        self.speech_ms = 0
+        self.silence_ms = 0
+        self.total_ms = 0
+        self.partial = None
+
+    def feed(self, pcm: bytes) -> bool:
+        """Consume a chunk of PCM; returns True once the utterance has ended"""
+        self.pending.extend(pcm)
+        ended = False
+        while len(self.pending) >= self.frame_bytes and not ended:
+            frame = bytes(self.pending[:self.frame_bytes])
+            del self.pending[:self.frame_bytes]
+            self.total_ms += VAD_FRAME_MS
+
+            if self.vad.is_speech(frame, self.sample_rate):
+                self.speech_ms += VAD_FRAME_MS
+                self.silence_ms = 0
+            else:
+                self.silence_ms += VAD_FRAME_MS
+
+            # Leading silence is not worth sending to the recognizer, apart from the pre-roll
+            if self.speech_ms:
+                if self.preroll:
+                    frame = b"".join(self.preroll) + frame
+                    self.preroll.clear()
+                partial = self.recognizer.accept(frame)
+                if partial is not None:
+                    self.partial = partial
+            else:
+                self.preroll.append(frame)
+
+            ended = (self.speech_ms >= VAD_MIN_SPEECH_MS and self.silence_ms >= VAD_SILENCE_MS) \
+                or self.total_ms >= MAX_UTTERANCE_SECONDS * 1000
+        return ended
+
+    def finish(self) -> str:
+        if self.pending and self.speech_ms:
+            self.recognizer.accept(bytes(self.pending))
+        self.pending.clear()
+        return self.recognizer.finish().strip()
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# The backend modules import each other as top-level modules, as when run from this directory
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(BACKEND_DIR))
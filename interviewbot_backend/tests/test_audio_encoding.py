@@ -0,0 +1,30 @@
+import wave
+
+from audio_encoding import concat_wav
+
+def write_clip(path, frames: int, rate: int = 16000):
+    with wave.open(str(path), "wb") as clip:
+        clip.setnchannels(1)
+        clip.setsampwidth(2)
+        clip.setframerate(rate)
+        clip.writeframes(b"\1\0" * frames)
+    return str(path)
+
+def test_concat_wav_joins_clips_in_order(tmp_path):
+    first = write_clip(tmp_path / "s1.wav", 1600)
+    second = write_clip(tmp_path / "s2.wav", 800)
+    joined = concat_wav([first, second], str(tmp_path / "q1.wav"))
+    with wave.open(joined, "rb") as clip:
+        assert clip.getnframes() == 2400
+        assert clip.getframerate() == 16000
+
+def test_concat_wav_refuses_mixed_formats(tmp_path):
+    first = write_clip(tmp_path / "s1.wav", 1600)
+    second = write_clip(tmp_path / "s2.wav", 800, rate=22050)
+    assert concat_wav([first, second], str(tmp_path / "q1.wav")) is None
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["s1.wav", "s2.wav"]
+
+def test_concat_wav_refuses_non_wav_clips(tmp_path):
+    aiff = tmp_path / "s1.wav"
+    aiff.write_bytes(b"FORM\0\0\0\4AIFF")
+    assert concat_wav([str(aiff)], str(tmp_path / "q1.wav")) is None
@@ -0,0 +1,72 @@
+from candidate_profile import build_profile, split_sections
+
+# Laid out the way PDF extraction returns a typical one-page resume: "o" list
+# markers, wrapped bullet lines, and dates on their own lines
+SAMPLE_RESUME = """JANE DOE
+jane.doe@example.com | +1 415 555 0100 | linkedin.com/in/janedoe
+EDUCATION
+State University
+Bachelor of Science in Computer Science; GPA: 3.8 Aug 2016 - May 2020
+SKILLS SUMMARY
+o Languages:
+Python, SQL, Go
+o Frameworks:
+Django, React, Pandas
+EXPERIENCE
+iCloudware
+Backend Engineer
+Jun 2020 - Dec 2022
+• Built billing services in Python and Go handling
+millions of invoices per month.
+• Cut p95 latency by 40% with query tuning.
+Northwind Labs
+Data Engineering Intern
+Jan 2020 - May 2020
+• Maintained nightly ETL jobs.
+PROJECTS
+Inventory forecaster
+Mar 2021 - Jun 2021
+• Forecast weekly stock levels with gradient boosting.
+Chat App using React
+• Realtime chat with websockets and Redis.
+"""
+
+def test_sample_resume_sections():
+    profile = build_profile(SAMPLE_RESUME)
+    assert profile.name == "JANE DOE"
+    assert profile.skills == ["Python", "SQL", "Go", "Django", "React", "Pandas"]
+    assert profile.roles == ["iCloudware, Backend Engineer (Jun 2020 - Dec 2022)",
+                             "Northwind Labs, Data Engineering Intern (Jan 2020 - May 2020)"]
+    assert profile.projects == [("Inventory forecaster", "Forecast weekly stock levels with gradient boosting."),
+                                ("Chat App using React", "Realtime chat with websockets and Redis.")]
+    assert profile.years == 3.0
+
+def test_sample_resume_prompt_is_compact():
+    prompt = build_profile(SAMPLE_RESUME).to_prompt()
+    assert prompt.startswith("Name: JANE DOE")
+    assert "555" not in prompt and "@" not in prompt
+    assert "millions of invoices" not in prompt
+
+def test_year_only_ranges_survive_contact_scrubbing():
+    text = ("EXPERIENCE\nSoftware Engineer, Acme Corp 2018 - 2021\n\u2022 Shipped the API\n"
+            "Senior Engineer, Globex 2021 - 2024\n\u2022 Led the platform team\n")
+    profile = build_profile(text)
+    assert profile.roles == ["Software Engineer, Acme Corp (2018 - 2021)", "Senior Engineer, Globex (2021 - 2024)"]
+    assert profile.years == 7.0
+
+def test_indented_continuation_is_not_a_bullet():
+    text = "PROJECTS\nChat App\n• Built a chat server\n   with websockets and Redis\n"
+    assert split_sections(text)["projects"] == [("Chat App", False),
+                                                ("Built a chat server with websockets and Redis", True)]
+
+def test_heading_variants():
+    text = "SKILLS SUMMARY\nPython, Go\nWork Experience:\nAcme\n▸ Shipped things\n"
+    sections = split_sections(text)
+    assert sections["skills"] == [("Python, Go", False)]
+    assert sections["experience"] == [("Acme", False), ("Shipped things", True)]
+
+def test_unrecognised_layout_falls_back_to_text():
+    text = "Jane Doe\njane@example.com\nI have built many things over the years.\nmostly in Python and Go.\n"
+    profile = build_profile(text)
+    assert not profile.roles and not profile.projects
+    assert profile.to_prompt() == "Jane Doe\nI have built many things over the years.\nmostly in Python and Go."
@@ -0,0 +1,179 @@
+import asyncio
+import logging
+
+import pytest
+
+import session_manager
+import session_store
+from session_manager import SessionManager, SessionBusy, SessionNotFound
+from session_store import MemorySessionStore, SQLiteSessionStore
+
+class FakeClock:
+    """Stands in for time.time/time.monotonic and asyncio.sleep, so lease waits take no real time"""
+
+    def __init__(self):
+        self.now = 1_000_000.0
+        self._sleep = asyncio.sleep
+
+    def time(self):
+        return self.now
+
+    def monotonic(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.now += seconds
+        await self._sleep(0)
+
+class FakeAgent:
+    def __init__(self, session_id, answers=None):
+        self.session_id = session_id
+        self.answers = list(answers or [])
+        self.messages = []
+        self.conversation_history = []
+
+    def to_state(self):
+        return {"session_id": self.session_id, "answers": self.answers}
+
+    @classmethod
+    def from_state(cls, state):
+        return cls(state["session_id"], state["answers"])
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(session_manager, "time", clock)
+    monkeypatch.setattr(session_store, "time", clock)
+    monkeypatch.setattr(asyncio, "sleep", clock.sleep)
+    return clock
+
+@pytest.fixture
+def store():
+    return MemorySessionStore()
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+def make_manager(store, **options):
+    return SessionManager(rehydrate=FakeAgent.from_state, store=store, **options)
+
+def test_turn_saves_state_and_bumps_the_version(clock, store):
+    async def scenario():
+        manager = make_manager(store)
+        await manager.add("s1", FakeAgent("s1"))
+        async with manager.turn("s1") as session:
+            session["agent"].answers.append("first answer")
+        return store.load("s1")
+
+    assert run(scenario()) == ({"session_id": "s1", "answers": ["first answer"]}, 2)
+
+def test_turns_on_one_worker_run_one_at_a_time(clock, store):
+    async def scenario():
+        manager = make_manager(store)
+        await manager.add("s1", FakeAgent("s1"))
+        events = []
+
+        async def turn(name):
+            async with manager.turn("s1") as session:
+                events.append(f"{name} start")
+                await clock.sleep(1)
+                session["agent"].answers.append(name)
+                events.append(f"{name} end")
+
+        await asyncio.gather(turn("a"), turn("b"))
+        return events
+
+    assert run(scenario()) == ["a start", "a end", "b start", "b end"]
+    assert store.load("s1") == ({"session_id": "s1", "answers": ["a", "b"]}, 3)
+
+def test_turn_held_elsewhere_raises_session_busy_after_the_wait(clock, store):
+    async def scenario():
+        manager = make_manager(store, turn_wait=30, turn_lease=120)
+        await manager.add("s1", FakeAgent("s1"))
+        # Another worker is mid-turn
+        assert store.acquire_lease("s1", 120)
+        started = clock.now
+        with pytest.raises(SessionBusy):
+            async with manager.turn("s1"):
+                pass
+        return clock.now - started
+
+    assert 30 <= run(scenario()) < 35
+
+def test_lease_of_a_dead_worker_expires(clock, store):
+    async def scenario():
+        manager = make_manager(store, turn_wait=30)
+        await manager.add("s1", FakeAgent("s1"))
+        assert store.acquire_lease("s1", 5)
+        async with manager.turn("s1") as session:
+            session["agent"].answers.append("after the lease expired")
+        return store.load("s1")
+
+    assert run(scenario())[0]["answers"] == ["after the lease expired"]
+
+def test_stale_version_is_not_saved_and_the_agent_is_reloaded(clock, store, caplog):
+    async def scenario():
+        manager = make_manager(store)
+        await manager.add("s1", FakeAgent("s1"))
+        async with manager.turn("s1") as session:
+            # Another writer moves the session on during the turn
+            store.save("s1", {"session_id": "s1", "answers": ["from elsewhere"]}, 1)
+            session["agent"].answers.append("lost")
+        reloaded = await manager.get("s1")
+        return reloaded["agent"].answers, manager.rehydrated
+
+    with caplog.at_level(logging.WARNING, logger="session_manager"):
+        answers, rehydrated = run(scenario())
+    assert "turn not saved" in caplog.text
+    assert answers == ["from elsewhere"] and rehydrated == 1
+    assert store.load("s1") == ({"session_id": "s1", "answers": ["from elsewhere"]}, 2)
+
+def test_failed_turn_saves_nothing_and_releases_the_lease(clock, store):
+    async def scenario():
+        manager = make_manager(store)
+        await manager.add("s1", FakeAgent("s1"))
+        with pytest.raises(RuntimeError):
+            async with manager.turn("s1") as session:
+                session["agent"].answers.append("half done")
+                raise RuntimeError("LLM failed")
+        reloaded = await manager.get("s1")
+        return reloaded["agent"].answers, store.acquire_lease("s1", 1) is not None
+
+    assert run(scenario()) == ([], True)
+
+@pytest.mark.parametrize("kind", ["memory", "sqlite"])
+def test_release_keeps_a_lease_taken_over_by_another_worker(clock, tmp_path, kind):
+    store = MemorySessionStore() if kind == "memory" else SQLiteSessionStore(str(tmp_path / "sessions.sqlite3"))
+    store.create("s1", {"session_id": "s1", "answers": []})
+    stalled = store.acquire_lease("s1", 5)
+    # The first turn outlives its lease and another worker takes the session over
+    clock.now += 10
+    current = store.acquire_lease("s1", 120)
+    assert current is not None
+
+    store.release_lease("s1", stalled)
+    assert store.acquire_lease("s1", 1) is None
+    store.release_lease("s1", current)
+    assert store.acquire_lease("s1", 1) is not None
+
+def test_missing_session_raises_not_found(clock, store):
+    async def scenario():
+        async with make_manager(store).turn("nope"):
+            pass
+
+    with pytest.raises(SessionNotFound):
+        run(scenario())
+
+def test_count_is_cached_for_stats(clock, store):
+    async def scenario():
+        manager = make_manager(store, idle_ttl=60)
+        await manager.add("s1", FakeAgent("s1"))
+        await manager.add("s2", FakeAgent("s2"))
+        added = manager.stats()["active_sessions"]
+        await manager.remove("s1")
+        removed = manager.stats()["active_sessions"]
+        clock.now += 120
+        await manager.reap_expired()
+        return added, removed, manager.stats()["active_sessions"]
+
+    assert run(scenario()) == (2, 1, 0)
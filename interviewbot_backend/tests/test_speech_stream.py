@@ -0,0 +1,70 @@
+import math
+import struct
+
+import pytest
+
+from speech_stream import EnergyVAD, RecognizerBackend, Utterance, VAD_FRAME_MS, VAD_PREROLL_MS, load_recognizer_model
+
+SAMPLE_RATE = 16000
+
+def tone(seconds: float, amplitude: int = 8000) -> bytes:
+    count = int(SAMPLE_RATE * seconds)
+    return struct.pack(f"<{count}h", *(int(amplitude * math.sin(2 * math.pi * 220 * i / SAMPLE_RATE)) for i in range(count)))
+
+def silence(seconds: float) -> bytes:
+    return b"\0\0" * int(SAMPLE_RATE * seconds)
+
+class RecordingRecognizer(RecognizerBackend):
+    def __init__(self, sample_rate: int):
+        super().__init__(sample_rate)
+        self.received = bytearray()
+
+    def accept(self, pcm: bytes) -> str:
+        self.received.extend(pcm)
+        return None
+
+    def finish(self) -> str:
+        return "recorded"
+
+def energy_utterance() -> Utterance:
+    utterance = Utterance(SAMPLE_RATE, backend="stub")
+    utterance.vad = EnergyVAD()
+    utterance.recognizer = RecordingRecognizer(SAMPLE_RATE)
+    return utterance
+
+def test_speech_from_the_first_frame_is_detected():
+    utterance = energy_utterance()
+    assert not utterance.feed(tone(2.0))
+    assert utterance.feed(silence(1.5))
+    assert utterance.speech_ms >= 1900
+
+def test_preroll_is_sent_with_the_first_voiced_frame():
+    utterance = energy_utterance()
+    leading_frames = 40
+    utterance.feed(silence(leading_frames * VAD_FRAME_MS / 1000) + tone(1.0) + silence(1.0))
+    preroll_frames = VAD_PREROLL_MS // VAD_FRAME_MS
+    received = utterance.recognizer.received
+    # Everything from the pre-roll onwards, and none of the silence before it
+    assert len(received) == (utterance.total_ms // VAD_FRAME_MS - leading_frames + preroll_frames) * utterance.frame_bytes
+    assert not any(received[:preroll_frames * utterance.frame_bytes])
+
+def test_noise_floor_ignores_speech():
+    vad = EnergyVAD()
+    frame = tone(VAD_FRAME_MS / 1000)
+    assert all(vad.is_speech(frame, SAMPLE_RATE) for _ in range(100))
+    assert vad.noise_floor == 100.0
+
+def test_unsupported_sample_rate_is_rejected():
+    with pytest.raises(ValueError):
+        Utterance(44100, backend="stub")
+
+def test_recognizer_backends_must_implement_finish():
+    class Incomplete(RecognizerBackend):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete(SAMPLE_RATE)
+
+def test_unknown_backend_is_rejected_before_loading_a_model():
+    with pytest.raises(ValueError):
+        load_recognizer_model("whisper")
@@ -0,0 +1,77 @@
+import os
+import wave
+import asyncio
+import importlib.util
+from concurrent.futures import Future
+
+import pytest
+
+pytest.importorskip("langchain_ollama")
+httpx = pytest.importorskip("httpx")
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPLY = "Welcome to the interview. Could you start with a brief introduction?"
+
+class FakeChunk:
+    def __init__(self, content, response_metadata=None):
+        self.content = content
+        self.response_metadata = response_metadata or {}
+
+class FakeLLM:
+    model = "fake"
+
+    async def astream(self, prompt):
+        for start in range(0, len(REPLY), 8):
+            yield FakeChunk(REPLY[start:start + 8])
+        yield FakeChunk("", {"eval_count": 12})
+
+class SilentTTS:
+    """Renders each text straight away as a second of silence"""
+    available = True
+
+    def submit(self, text, dest_path):
+        with wave.open(dest_path, "wb") as clip:
+            clip.setnchannels(1)
+            clip.setsampwidth(2)
+            clip.setframerate(16000)
+            clip.writeframes(b"\0\0" * 16000)
+        future = Future()
+        future.set_result(dest_path)
+        return future
+
+def load_backend_main():
+    """The backend's main.py by path; a bare "import main" may find the analyzer's"""
+    spec = importlib.util.spec_from_file_location("interview_main", os.path.join(BACKEND_DIR, "main.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def test_audio_endpoint_serves_a_streamed_turn(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    main = load_backend_main()
+    from interview_agent import InterviewAgent
+    from session_manager import SessionManager
+    from session_store import MemorySessionStore
+    from common.llm_scheduler import LLMScheduler
+
+    monkeypatch.setattr(main, "sessions", SessionManager(rehydrate=InterviewAgent.from_state, store=MemorySessionStore()))
+    agent = InterviewAgent("Jane Doe\nPython developer", llm=FakeLLM(), tts=SilentTTS(), scheduler=LLMScheduler())
+
+    async def scenario():
+        await main.sessions.add(agent.session_id, agent)
+        events = [event async for event in agent.astream_turn()]
+        await agent.audio_futures[1]
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return events, await client.get(f"/audio/{agent.session_id}/1")
+
+    events, response = asyncio.run(scenario())
+    assert [event["sentence"] for event in events if event["type"] == "audio"] == [1, 2]
+    assert events[-1]["question_number"] == 1
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "audio/wav"
+    path = tmp_path / "served.wav"
+    path.write_bytes(response.content)
+    with wave.open(str(path), "rb") as clip:
+        # Both sentence clips, back to back
+        assert clip.getnframes() == 2 * 16000
@@ -0,0 +1,40 @@
+import os
+import signal
+
+import pytest
+
+import tts_service
+from tts_service import TTSService
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    # Workers are forked, so they pick up the silent engine too
+    monkeypatch.setattr(tts_service, "TTS_ENGINE", "silent")
+    service = TTSService(workers=1, queue_size=4, cache_dir=str(tmp_path / "cache"))
+    yield service
+    service.shutdown()
+
+def test_cache_hit_renders_again_when_the_clip_was_pruned(service, tmp_path, monkeypatch):
+    assert service.submit("Hello there.", str(tmp_path / "a.wav")).result(timeout=30)
+
+    publish = tts_service._publish
+    def pruned_first(cache_path, dest_path):
+        # As if prune_cache ran right after submit() saw the clip
+        os.remove(cache_path)
+        monkeypatch.setattr(tts_service, "_publish", publish)
+        return publish(cache_path, dest_path)
+    monkeypatch.setattr(tts_service, "_publish", pruned_first)
+
+    assert service.submit("Hello there.", str(tmp_path / "b.wav")).result(timeout=30) == str(tmp_path / "b.wav")
+    assert os.path.getsize(tmp_path / "b.wav") > 0
+
+def test_broken_pool_is_replaced_instead_of_disabling_tts(service, tmp_path):
+    assert service.submit("One.", str(tmp_path / "a.wav")).result(timeout=30)
+    for process in list(service._executor._processes.values()):
+        os.kill(process.pid, signal.SIGKILL)
+
+    # Depending on when the pool notices, this render is lost with it or goes to the new pool
+    service.submit("Two.", str(tmp_path / "b.wav")).result(timeout=30)
+    assert service.available
+    assert service._generation == 1
+    assert service.submit("Three.", str(tmp_path / "c.wav")).result(timeout=30) == str(tmp_path / "c.wav")
@@ -0,0 +1,347 @@
+import os
+import time
+import shutil
+import hashlib
+import logging
+import threading
+import importlib.util
+from concurrent.futures import CancelledError, Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from audio_encoding import AudioEncoder
+from metrics import STAGE_SECONDS, TTS_RENDERS, TTS_INFLIGHT
+
+logger = logging.getLogger(__name__)
+
+TTS_CACHE_DIR = os.path.join("static", "audio", "cache")
+TTS_WORKERS = int(os.getenv("TTS_WORKERS", "2"))
+TTS_QUEUE_SIZE = int(os.getenv("TTS_QUEUE_SIZE", "32"))
+TTS_CACHE_MAX_FILES = int(os.getenv("TTS_CACHE_MAX_FILES", "2000"))
+TTS_TIMEOUT = float(os.getenv("TTS_TIMEOUT", "10"))
+# A render reported as running may still be waiting behind one job in the pool's call queue, hence the margin
+TTS_RENDER_TIMEOUT = float(os.getenv("TTS_RENDER_TIMEOUT", str(2 * TTS_TIMEOUT)))
+TTS_RATE = 200
+TTS_VOLUME = 0.9
+TTS_VOICES = ("Zira", "David")
+# "pyttsx3" for real speech; "silent" writes silent WAVs (benchmarks, headless hosts)
+TTS_ENGINE = os.getenv("TTS_ENGINE", "pyttsx3")
+
+class TTSQueueFull(Exception):
+    """Raised when the synthesis queue is at capacity"""
+
+# Engine owned by the current worker process (pyttsx3 is not safe to share)
+_engine = None
+
+class SilentEngine:
+    """Stand-in engine that writes silence roughly as long as the text would take to speak"""
+
+    def __init__(self, rate: int):
+        self.rate = rate
+        self.jobs = []
+
+    def save_to_file(self, text: str, path: str):
+        self.jobs.append((text, path))
+
+    def runAndWait(self):
+        import wave
+        for text, path in self.jobs:
+            seconds = max(0.5, len(text.split()) * 60 / self.rate)
+            with wave.open(path, "wb") as clip:
+                clip.setnchannels(1)
+                clip.setsampwidth(2)
+                clip.setframerate(16000)
+                clip.writeframes(b"\0\0" * int(16000 * seconds))
+        self.jobs.clear()
+
+def _init_worker(rate: int, volume: float, voices: tuple):
+    global _engine
+    if TTS_ENGINE == "silent":
+        _engine = SilentEngine(rate)
+        return
+    import pyttsx3
+    _engine = pyttsx3.init()
+    _engine.setProperty('rate', rate)
+    _engine.setProperty('volume', volume)
+    for voice in _engine.getProperty('voices'):
+        if any(name in voice.name for name in voices):
+            _engine.setProperty('voice', voice.id)
+            break
+
+def _render(text: str, out_path: str) -> tuple:
+    """Render text into out_path inside a worker process.
+
+    Returns (out_path, started, elapsed); started is wall-clock time so the
+    parent can work out how long the job waited in the queue.
+    """
+    started = time.time()
+    tmp_path = f"{out_path}.{os.getpid()}.tmp"
+    _engine.save_to_file(text, tmp_path)
+    _engine.runAndWait()
+    if not os.path.exists(tmp_path) or os.path.getsize(tmp_path) == 0:
+        raise RuntimeError("TTS engine produced no audio")
+    os.replace(tmp_path, out_path)
+    return out_path, started, time.time() - started
+
+class TTSService:
+    """Fixed pool of TTS engine processes behind a bounded queue.
+
+    Rendered clips are cached under a hash of (text, voice, rate), so
+    repeated phrasing is served from disk without touching an engine.
+    Identical requests that are already rendering share one job. Engines
+    write WAV; a compact Opus/MP3 copy is encoded in the background and
+    published next to the session's WAV once ready (see audio_encoding.py).
+    A watchdog replaces the pool when a render runs past TTS_RENDER_TIMEOUT,
+    so a hung engine cannot hold queue slots forever; a pool broken by a
+    crashed worker is replaced the same way.
+    """
+
+    def __init__(self, workers: int = TTS_WORKERS, queue_size: int = TTS_QUEUE_SIZE,
+                 cache_dir: str = TTS_CACHE_DIR, rate: int = TTS_RATE, voices: tuple = TTS_VOICES):
+        self.available = TTS_ENGINE == "silent" or importlib.util.find_spec("pyttsx3") is not None
+        self.workers = workers
+        self.rate = rate
+        self.voices = voices
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        self._inflight = {}
+        # Reentrant: submit() replaces a pool that broke while idle without letting go of it
+        self._lock = threading.RLock()
+        self._renders = 0
+        self._encoding = {}
+        self._running_since = {}
+        # Bumped whenever the pool is replaced; failures of renders on an old pool are expected
+        self._generation = 0
+        self._stopped = threading.Event()
+        self._executor = None
+        self.encoder = None
+        if self.available:
+            self._executor = self._start_pool()
+            logger.info(f"✅ TTS pool started with {workers} workers")
+            TTS_INFLIGHT.set_function(lambda: len(self._inflight))
+            threading.Thread(target=self._watchdog, name="tts-watchdog", daemon=True).start()
+            self.encoder = AudioEncoder()
+        else:
+            logger.warning("⚠️ pyttsx3 not installed. Audio responses will be disabled.")
+
+    def _start_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(self.rate, TTS_VOLUME, self.voices)
+        )
+
+    def cache_key(self, text: str) -> str:
+        payload = "\0".join([text, ",".join(self.voices), str(self.rate)])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def submit(self, text: str, dest_path: str) -> Future:
+        """Queue text for synthesis into dest_path (a .wav path).
+
+        Returns a Future resolving to dest_path, or to None if synthesis
+        failed. Raises TTSQueueFull when the queue is at capacity.
+        """
+        if not self.available:
+            return _completed(None)
+
+        key = self.cache_key(text)
+        cache_path = os.path.join(self.cache_dir, f"{key}.wav")
+
+        if os.path.exists(cache_path):
+            try:
+                os.utime(cache_path)
+                published = _publish(cache_path, dest_path)
+            except OSError:
+                # Pruned since the check above; render it again
+                logger.info(f"[TTS] Cached clip {key[:12]} vanished, rendering again")
+            else:
+                logger.info(f"[TTS] Cache hit for {key[:12]}")
+                TTS_RENDERS.inc(outcome="cache_hit")
+                self._encode_later(key, cache_path, dest_path)
+                return _completed(published)
+
+        submitted = time.time()
+        with self._lock:
+            generation = self._generation
+            render = self._inflight.get(key)
+            is_new = render is None
+            if is_new:
+                if not self._slots.acquire(blocking=False):
+                    TTS_RENDERS.inc(outcome="rejected")
+                    raise TTSQueueFull("TTS queue is full")
+                try:
+                    render = self._executor.submit(_render, text, cache_path)
+                except BrokenProcessPool:
+                    # A worker died while the pool was idle, so no render reported it
+                    logger.error("[TTS] ❌ Worker pool failed, restarting it")
+                    self._recycle_pool(generation)
+                    generation = self._generation
+                    render = self._executor.submit(_render, text, cache_path)
+                self._inflight[key] = render
+            else:
+                TTS_RENDERS.inc(outcome="shared")
+        if is_new:
+            # Outside the lock: a render that already finished runs the callback inline
+            render.add_done_callback(lambda f, key=key: self._on_rendered(key, f, submitted))
+
+        result = Future()
+
+        def publish(render: Future):
+            try:
+                rendered_path = render.result()[0]
+                result.set_result(_publish(rendered_path, dest_path))
+                self._encode_later(key, rendered_path, dest_path)
+            except (BrokenProcessPool, CancelledError) as e:
+                if self._recycle_pool(generation):
+                    logger.error(f"[TTS] ❌ Worker pool failed, restarting it: {str(e)}")
+                else:
+                    logger.warning("[TTS] Render dropped with a recycled worker pool")
+                result.set_result(None)
+            except Exception as e:
+                logger.error(f"[TTS] ❌ TTS Error: {str(e)}")
+                result.set_result(None)
+
+        render.add_done_callback(publish)
+        return result
+
+    def _encode_later(self, key: str, cache_path: str, dest_path: str):
+        """Publish a compact encoding of the clip next to dest_path, encoding it first if needed"""
+        if self.encoder is None or not self.encoder.available:
+            return
+        dest_base = os.path.splitext(dest_path)[0]
+        encoded = self.encoder.encoded_path(cache_path)
+        if encoded is not None:
+            _publish(encoded, dest_base + os.path.splitext(encoded)[1])
+            return
+
+        with self._lock:
+            job = self._encoding.get(key)
+            if job is None:
+                job = self.encoder.submit(cache_path)
+                if job is None:
+                    return
+                self._encoding[key] = job
+                job.add_done_callback(lambda f, key=key: self._encoding.pop(key, None))
+
+        def publish_encoded(job: Future):
+            try:
+                encoded = job.result()
+                # Skip sessions that were cleaned up while encoding
+                if encoded is not None and os.path.exists(dest_path):
+                    _publish(encoded, dest_base + os.path.splitext(encoded)[1])
+            except Exception as e:
+                logger.warning(f"[ENCODE] Could not publish encoded clip: {str(e)}")
+
+        job.add_done_callback(publish_encoded)
+
+    def _on_rendered(self, key: str, render: Future, submitted: float):
+        with self._lock:
+            self._running_since.pop(render, None)
+            # Renders abandoned by the watchdog already gave their slot back
+            owned = self._inflight.get(key) is render
+            if owned:
+                del self._inflight[key]
+                self._renders += 1
+            prune = owned and self._renders % 50 == 0
+        if not owned:
+            return
+        if not render.cancelled() and render.exception() is None:
+            _, started, elapsed = render.result()
+            STAGE_SECONDS.observe(max(0.0, started - submitted), stage="tts_queue_wait")
+            STAGE_SECONDS.observe(elapsed, stage="tts")
+            TTS_RENDERS.inc(outcome="rendered")
+        else:
+            TTS_RENDERS.inc(outcome="failed")
+        self._slots.release()
+        if prune:
+            self.prune_cache()
+
+    def _watchdog(self):
+        """Replace the worker pool when a render has been running past TTS_RENDER_TIMEOUT"""
+        while not self._stopped.wait(1.0):
+            now = time.monotonic()
+            with self._lock:
+                stuck = 0
+                for render in self._inflight.values():
+                    if render.running():
+                        stuck += now - self._running_since.setdefault(render, now) > TTS_RENDER_TIMEOUT
+                generation = self._generation
+            if stuck and self._recycle_pool(generation):
+                logger.error(f"[TTS] ❌ {stuck} render(s) exceeded {TTS_RENDER_TIMEOUT:g}s, recycled the worker pool")
+                TTS_RENDERS.inc(stuck, outcome="timeout")
+
+    def _recycle_pool(self, generation: int) -> bool:
+        """Replace the worker pool if it is still the given generation.
+
+        The pool cannot kill one job, so every render on it is abandoned and
+        its slot freed. Returns False if that pool was already replaced (or
+        the service is shutting down).
+        """
+        with self._lock:
+            if generation != self._generation or self._stopped.is_set():
+                return False
+            abandoned = len(self._inflight)
+            self._inflight.clear()
+            self._running_since.clear()
+            old_executor, self._executor = self._executor, self._start_pool()
+            self._generation += 1
+        for _ in range(abandoned):
+            self._slots.release()
+        _terminate_pool(old_executor)
+        return True
+
+    def prune_cache(self):
+        """Drop least recently used clips beyond TTS_CACHE_MAX_FILES"""
+        try:
+            entries = [e for e in os.scandir(self.cache_dir) if e.is_file() and ".tmp" not in e.name]
+        except FileNotFoundError:
+            return
+        if len(entries) <= TTS_CACHE_MAX_FILES:
+            return
+        entries.sort(key=lambda e: e.stat().st_mtime)
+        for entry in entries[:len(entries) - TTS_CACHE_MAX_FILES]:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+    def shutdown(self):
+        self._stopped.set()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        if self.encoder is not None:
+            self.encoder.shutdown()
+
+def _terminate_pool(executor: ProcessPoolExecutor):
+    """Shut a pool down without waiting, killing workers stuck in a render"""
+    # ProcessPoolExecutor has no public way to stop a busy worker before Python 3.14
+    processes = list((executor._processes or {}).values())
+    executor.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        process.terminate()
+
+def _completed(value) -> Future:
+    future = Future()
+    future.set_result(value)
+    return future
+
+def _publish(cache_path: str, dest_path: str) -> str:
+    """Expose a cached clip at dest_path (hard link, falling back to a copy)"""
+    if os.path.exists(dest_path):
+        os.remove(dest_path)
+    try:
+        os.link(cache_path, dest_path)
+    except OSError:
+        shutil.copyfile(cache_path, dest_path)
+    return dest_path
+
+_service = None
+_service_lock = threading.Lock()
+
+def get_tts_service() -> TTSService:
+    """Process-wide TTS service, started on first use"""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = TTSService()
+        return _service
@@ -1,21 +1,191 @@
 import os
 import csv
+import sys
+import time
+import atexit
+import sqlite3
+import threading
 
-ATS_LOG_FILE = os.path.join("ats_records", "ats_log.csv")
+ATS_RECORDS_DIR = "ats_records"
+ATS_LOG_FILE = os.path.join(ATS_RECORDS_DIR, "ats_log.csv")
+ATS_DB_FILE = os.path.join(ATS_RECORDS_DIR, "ats_records.sqlite3")
 
-# Ensure folder and CSV exist
-os.makedirs("ats_records", exist_ok=True)
-if not os.path.exists(ATS_LOG_FILE):
-    with open(ATS_LOG_FILE, mode="w", newline="", encoding="utf-8") as file:
-        writer = csv.writer(file)
-        writer.writerow(["Resume Name", "ATS Score", "Remarks"])
+# Buffered rows are written once this many are pending or this many seconds pass
+ATS_FLUSH_SIZE = int(os.getenv("ATS_FLUSH_SIZE", "50"))
+ATS_FLUSH_INTERVAL = float(os.getenv("ATS_FLUSH_INTERVAL", "2"))
 
-def log_ats_score(resume_name, ats_score):
+CSV_HEADER = ["Resume Name", "ATS Score", "Remarks", "Timestamp", "JD Hash", "Model"]
+
+def remarks_for(ats_score):
+    return "Good" if ats_score >= 70 else "Bad"
+
+class ATSRecordStore:
     """
-    Log resume name, ATS score, and remarks (Good/Bad) to CSV.
+    ATS scores in an indexed SQLite table with a buffered append path.
+
+    Appends from any thread go into an in-memory buffer that is written in one
+    transaction per batch. SQLite (WAL mode, busy timeout) serializes writers
+    across processes, so Streamlit sessions and batch jobs can log concurrently.
     """
-    remarks = "Good" if ats_score >= 70 else "Bad"
-    
-    with open(ATS_LOG_FILE, mode="a", newline="", encoding="utf-8") as file:
-        writer = csv.writer(file)
-        writer.writerow([resume_name, ats_score, remarks])
+
+    def __init__(self, path=ATS_DB_FILE, flush_size=ATS_FLUSH_SIZE, flush_interval=ATS_FLUSH_INTERVAL):
+        self.path = path
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._timer = None
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS ats_scores (
+                    id INTEGER PRIMARY KEY,
+                    created REAL NOT NULL,
+                    resume_name TEXT NOT NULL,
+                    ats_score INTEGER NOT NULL,
+                    remarks TEXT NOT NULL,
+                    jd_hash TEXT,
+                    model TEXT
+                );
+                CREATE INDEX IF NOT EXISTS ats_scores_jd ON ats_scores (jd_hash, ats_score);
+                CREATE INDEX IF NOT EXISTS ats_scores_created ON ats_scores (created);
+                CREATE INDEX IF NOT EXISTS ats_scores_score ON ats_scores (ats_score);
+            """)
+        self._import_legacy_csv()
+        atexit.register(self.flush)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _import_legacy_csv(self):
+        """
+        One-time import of rows logged to ats_log.csv before the store existed.
+        """
+        if not os.path.exists(ATS_LOG_FILE):
+            return
+        with self._connect() as conn:
+            if conn.execute("SELECT 1 FROM ats_scores LIMIT 1").fetchone():
+                return
+            with open(ATS_LOG_FILE, newline="", encoding="utf-8") as file:
+                rows = [
+                    (os.path.getmtime(ATS_LOG_FILE), row[0], int(row[1]), row[2], None, None)
+                    for row in csv.reader(file)
+                    if len(row) >= 3 and row[1].strip().isdigit()
+                ]
+            conn.executemany(
+                "INSERT INTO ats_scores (created, resume_name, ats_score, remarks, jd_hash, model) VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+
+    def append(self, resume_name, ats_score, jd_hash=None, model=None):
+        row = (time.time(), resume_name, int(ats_score), remarks_for(ats_score), jd_hash, model)
+        with self._lock:
+            self._buffer.append(row)
+            flush_now = len(self._buffer) >= self.flush_size
+            if not flush_now and self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if flush_now:
+            self.flush()
+
+    def flush(self):
+        """
+        Write all buffered rows in a single transaction.
+        """
+        with self._write_lock:
+            with self._lock:
+                rows, self._buffer = self._buffer, []
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+            if not rows:
+                return
+            with self._connect() as conn:
+                conn.executemany(
+                    "INSERT INTO ats_scores (created, resume_name, ats_score, remarks, jd_hash, model) VALUES (?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+
+    def _query(self, sql, params=()):
+        self.flush()
+        with self._connect() as conn:
+            return conn.execute(sql, params).fetchall()
+
+    def score_distribution(self, bucket=10, jd_hash=None):
+        """
+        {bucket_start: count} of scores, optionally for a single JD.
+        """
+        where, params = ("WHERE jd_hash = ?", (jd_hash,)) if jd_hash else ("", ())
+        rows = self._query(
+            f"SELECT (ats_score / ?) * ? AS bucket, COUNT(*) FROM ats_scores {where} GROUP BY bucket ORDER BY bucket",
+            (bucket, bucket) + params
+        )
+        return dict(rows)
+
+    def jd_averages(self):
+        """
+        Per-JD (count, average, min, max) score, most scored JDs first.
+        """
+        rows = self._query(
+            "SELECT jd_hash, COUNT(*), AVG(ats_score), MIN(ats_score), MAX(ats_score) FROM ats_scores"
+            " WHERE jd_hash IS NOT NULL GROUP BY jd_hash ORDER BY COUNT(*) DESC"
+        )
+        return [
+            {"jd_hash": jd_hash, "count": count, "average": round(average, 1), "min": low, "max": high}
+            for jd_hash, count, average, low, high in rows
+        ]
+
+    def summary(self):
+        count, average, good = self._query(
+            "SELECT COUNT(*), AVG(ats_score), SUM(ats_score >= 70) FROM ats_scores"
+        )[0]
+        return {"records": count, "average": round(average or 0, 1), "good": good or 0, "bad": count - (good or 0)}
+
+    def export_csv(self, path=ATS_LOG_FILE):
+        """
+        Write every record to CSV (original three columns first, for compatibility).
+        """
+        rows = self._query(
+            "SELECT resume_name, ats_score, remarks, datetime(created, 'unixepoch'), jd_hash, model FROM ats_scores ORDER BY id"
+        )
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, mode="w", newline="", encoding="utf-8") as file:
+            writer = csv.writer(file)
+            writer.writerow(CSV_HEADER)
+            writer.writerows(rows)
+        os.replace(tmp_path, path)
+        return len(rows)
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_record_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ATSRecordStore()
+        return _store
+
+def log_ats_score(resume_name, ats_score, jd_hash=None, model=None):
+    """
+    Log resume name, ATS score, and remarks (Good/Bad), plus the JD hash and scoring model.
+    """
+    get_record_store().append(resume_name, ats_score, jd_hash, model)
+
+if __name__ == "__main__":
+    store = get_record_store()
+    command = sys.argv[1] if len(sys.argv) > 1 else "summary"
+    if command == "export":
+        print(f"Exported {store.export_csv()} records to {ATS_LOG_FILE}")
+    elif command == "distribution":
+        for start, count in store.score_distribution().items():
+            print(f"{start:>3}-{start + 9:<3} {count}")
+    elif command == "jds":
+        for row in store.jd_averages():
+            print(row)
+    else:
+        print(store.summary())
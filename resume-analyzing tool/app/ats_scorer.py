@@ -0,0 +1,162 @@
+"""
+Deterministic local ATS scoring.
+
+The job description is tokenized once into a weighted term vector (known
+skills and terms on "required"/"must" lines weigh more). Resumes are scored
+by vectorized term matching against it:
+    score = 100 * (SKILL_WEIGHT * weighted skill coverage
+                   + (1 - SKILL_WEIGHT) * BM25-saturated keyword match)
+The keyword match counts one mention of every JD term as a full match;
+repeats add a little (capped by REPEAT_CAP), so keyword stuffing cannot
+make up for missing terms.
+No LLM is involved, so scoring takes milliseconds and always gives the
+same answer for the same inputs.
+"""
+import re
+import math
+
+import numpy as np
+
+# Multi-word and symbol-bearing skills are matched as phrases before tokenizing
+SKILLS = [
+    "python", "java", "javascript", "typescript", "c++", "c#", "golang", "rust", "kotlin", "swift", "scala", "ruby", "php",
+    "sql", "nosql", "postgresql", "mysql", "mongodb", "redis", "elasticsearch", "kafka", "spark", "hadoop", "airflow",
+    "html", "css", "react", "angular", "vue", "node.js", "django", "flask", "fastapi", "spring", "spring boot", ".net",
+    "rest api", "graphql", "microservices", "docker", "kubernetes", "terraform", "ansible", "jenkins", "ci/cd", "git",
+    "aws", "azure", "gcp", "linux", "bash", "agile", "scrum", "jira", "unit testing", "tdd", "oop",
+    "machine learning", "deep learning", "nlp", "computer vision", "pytorch", "tensorflow", "scikit-learn", "pandas",
+    "numpy", "data analysis", "data engineering", "power bi", "tableau", "excel", "llm", "generative ai", "langchain",
+    "communication", "leadership", "problem solving", "project management", "stakeholder management",
+]
+# Skills that are ordinary words in lower case, matched only as written and counted as the canonical skill
+CASED_SKILLS = {"Go": "golang"}
+
+STOPWORDS = set("""
+a an and are as at be by for from has have in is it its of on or that the this to was were will with we you your
+our their they them who what when where which while about above after again all also am any been before being
+below between both but can could did do does doing during each few further had he her here hers him his how i if
+into just me more most my no nor not now off once only other out over own same she should so some such than then
+there these those through too under until up very would able etc e.g i.e including within across per via using
+role job candidate candidates position team work working company years year experience plus strong good excellent
+knowledge understanding skills skill ability responsibilities requirements required preferred must nice
+""".split())
+
+# Lines mentioning these are treated as hard requirements
+REQUIRED_MARKERS = re.compile(r"\b(required|requirements|must|mandatory|essential|minimum)\b", re.IGNORECASE)
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9+#]+)*")
+
+SKILL_WEIGHT = 0.6
+SKILL_BOOST = 3.0
+REQUIRED_BOOST = 1.5
+BM25_K1 = 1.2
+# BM25 length normalization, used by the resume index
+BM25_B = 0.75
+# Most a term's repeated mentions can count, relative to a single mention
+REPEAT_CAP = 1.2
+MAX_KEYWORDS = 60
+
+def _phrase_pattern(skill):
+    return re.compile(r"(?<![a-z0-9])" + re.escape(skill) + r"(?![a-z0-9+#])")
+
+SKILL_PATTERNS = {skill: _phrase_pattern(skill) for skill in SKILLS}
+CASED_SKILL_PATTERNS = {
+    re.compile(r"(?<![A-Za-z0-9])" + re.escape(name) + r"(?![A-Za-z0-9+#-])"): skill for name, skill in CASED_SKILLS.items()
+}
+
+def tokenize(text):
+    """
+    Lowercased terms of a text: known skill phrases plus remaining non-stopword tokens.
+    """
+    terms = []
+    for pattern, skill in CASED_SKILL_PATTERNS.items():
+        hits = pattern.findall(text)
+        if hits:
+            terms.extend([skill] * len(hits))
+            text = pattern.sub(" ", text)
+    text = text.lower()
+    for skill, pattern in SKILL_PATTERNS.items():
+        if " " in skill or not skill.isalnum():
+            hits = pattern.findall(text)
+            if hits:
+                terms.extend([skill] * len(hits))
+                text = pattern.sub(" ", text)
+    for token in TOKEN_PATTERN.findall(text):
+        token = token.rstrip(".")
+        if token in SKILL_PATTERNS or (len(token) > 2 and token not in STOPWORDS and not token.isdigit()):
+            terms.append(token)
+    return terms
+
+class JobProfile:
+    """
+    Weighted term vector of a job description, built once and reused for every resume.
+    """
+
+    def __init__(self, jd_text, max_keywords=MAX_KEYWORDS):
+        frequency = {}
+        boost = {}
+        for line in jd_text.splitlines():
+            line_boost = REQUIRED_BOOST if REQUIRED_MARKERS.search(line) else 1.0
+            for term in tokenize(line):
+                frequency[term] = frequency.get(term, 0) + 1
+                boost[term] = max(boost.get(term, 1.0), line_boost)
+        weights = {
+            term: math.log1p(count) * boost[term] * (SKILL_BOOST if term in SKILL_PATTERNS else 1.0)
+            for term, count in frequency.items()
+        }
+
+        ranked = sorted(weights, key=lambda term: (-weights[term], term))[:max_keywords]
+        self.terms = ranked
+        self.index = {term: i for i, term in enumerate(ranked)}
+        self.weights = np.array([weights[term] for term in ranked], dtype=np.float64)
+        self.is_skill = np.array([term in SKILL_PATTERNS for term in ranked], dtype=bool)
+
+    def term_counts(self, resume_texts):
+        """
+        Matrix (n_resumes x n_terms) of JD-term occurrence counts.
+        """
+        counts = np.zeros((len(resume_texts), len(self.terms)), dtype=np.float64)
+        for row, text in enumerate(resume_texts):
+            columns = [self.index[term] for term in tokenize(text) if term in self.index]
+            if columns:
+                np.add.at(counts[row], columns, 1.0)
+        return counts
+
+    def score_many(self, resume_texts):
+        """
+        Score several resumes at once; returns a list of result dicts.
+        """
+        if not self.terms:
+            return [{"score": 0, "matched_keywords": [], "missing_keywords": []} for _ in resume_texts]
+
+        counts = self.term_counts(resume_texts)
+        present = counts > 0
+        # BM25 term-frequency saturation (no length normalization), scaled so one mention counts 1
+        saturated = np.minimum(counts * (BM25_K1 + 1) / (counts + BM25_K1), REPEAT_CAP)
+        keyword_score = np.minimum(saturated @ self.weights / self.weights.sum(), 1.0)
+
+        skill_weights = self.weights * self.is_skill
+        if skill_weights.sum() > 0:
+            coverage = present @ skill_weights / skill_weights.sum()
+            combined = SKILL_WEIGHT * coverage + (1 - SKILL_WEIGHT) * keyword_score
+        else:
+            combined = keyword_score
+        scores = np.rint(np.clip(combined, 0, 1) * 100).astype(int)
+
+        terms = np.array(self.terms, dtype=object)
+        return [
+            {
+                "score": int(scores[row]),
+                "matched_keywords": terms[present[row]].tolist(),
+                "missing_keywords": terms[~present[row]].tolist()
+            }
+            for row in range(len(resume_texts))
+        ]
+
+    def score(self, resume_text):
+        return self.score_many([resume_text])[0]
+
+def score_resume(resume_text, jd_text):
+    """
+    One-off score of a resume against a job description.
+    """
+    return JobProfile(jd_text).score(resume_text)
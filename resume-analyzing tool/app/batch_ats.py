@@ -0,0 +1,197 @@
+"""
+Headless batch ATS scoring of many resumes against one job description.
+
+Examples (run from the app directory):
+    python batch_ats.py --jd jd.pdf resumes/
+    python batch_ats.py --jd jd.docx "applicants/**/*.pdf" --concurrency 2
+
+By default resumes are scored with the deterministic local scorer
+(ats_scorer.py); --scorer llm asks the model instead. Resumes already scored
+for the same JD and scorer/model (matched by content hash) are skipped, so
+an interrupted run can simply be started again.
+"""
+import os
+import sys
+import glob
+import json
+import time
+import hashlib
+import argparse
+import statistics
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+# The LLM scheduler is shared with the interview backend (repo root/common)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from utils import extract_text_from_path, parse_ats_score
+from prompts import ats_prompt
+from ats_logger import log_ats_score, get_record_store
+from llm_cache import LLMCache
+from ats_scorer import JobProfile
+from common.llm_scheduler import SchedulerBusy, scheduled, PRIORITY_HEADER
+
+BATCH_STATE_FILE = os.path.join("ats_records", "batch_state.jsonl")
+RESUME_EXTENSIONS = (".pdf", ".docx")
+# Attempts per resume when the LLM scheduler or gateway reports it is busy
+BUSY_RETRIES = 5
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def collect_resumes(sources, extensions=RESUME_EXTENSIONS):
+    """
+    Expand directories and glob patterns into a sorted list of resume paths.
+    """
+    paths = set()
+    for source in sources:
+        if os.path.isdir(source):
+            matches = glob.glob(os.path.join(source, "**", "*"), recursive=True)
+        else:
+            matches = glob.glob(source, recursive=True)
+        paths.update(path for path in matches if path.lower().endswith(extensions) and os.path.isfile(path))
+    return sorted(paths)
+
+def load_state(path):
+    """
+    Keys (resume_hash, jd_hash, model) of resumes scored by earlier runs.
+    """
+    done = set()
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # partially written line from an interrupted run
+                done.add((record["resume_hash"], record["jd_hash"], record["model"]))
+    return done
+
+def extract_job(path):
+    """
+    Worker: (path, text, seconds) for one resume.
+    """
+    start = time.perf_counter()
+    return path, extract_text_from_path(path), time.perf_counter() - start
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("resumes", nargs="+", help="resume directories or glob patterns")
+    parser.add_argument("--jd", required=True, help="job description (PDF/DOCX)")
+    parser.add_argument("--scorer", choices=["local", "llm"], default="local")
+    parser.add_argument("--model", default="llama3", help="Ollama model for --scorer llm")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="extraction processes")
+    parser.add_argument("--concurrency", type=int, default=int(os.getenv("OLLAMA_NUM_PARALLEL", "2")),
+                        help="concurrent LLM generations")
+    parser.add_argument("--state", default=BATCH_STATE_FILE, help="resume-state file (JSON lines)")
+    args = parser.parse_args(argv)
+
+    jd_text = extract_text_from_path(args.jd)
+    jd_hash = hashlib.sha256(jd_text.encode("utf-8")).hexdigest()
+    done = load_state(args.state)
+    # Local scores are recorded under their own "model" so they never mask LLM scores
+    scorer_name = args.model if args.scorer == "llm" else "local"
+
+    pending = {}
+    skipped = 0
+    for path in collect_resumes(args.resumes):
+        resume_hash = file_hash(path)
+        if (resume_hash, jd_hash, scorer_name) in done:
+            skipped += 1
+        else:
+            pending[path] = resume_hash
+    print(f"Found {len(pending) + skipped} resumes, {skipped} already scored, {len(pending)} to score")
+    if not pending:
+        return 0
+
+    os.makedirs(os.path.dirname(args.state) or ".", exist_ok=True)
+    if args.scorer == "local":
+        profile = JobProfile(jd_text)
+
+        def score_job(path, text):
+            start = time.perf_counter()
+            return profile.score(text)["score"], time.perf_counter() - start
+    else:
+        # Only the LLM scorer needs langchain
+        from langchain.llms.ollama import Ollama
+
+        # Batch work yields to interview turns and analysis at a shared gateway
+        llm = Ollama(model=args.model, base_url=os.getenv("OLLAMA_HOST", "http://localhost:11434"),
+                     headers={PRIORITY_HEADER: "batch"})
+        generate = scheduled(llm.invoke, "batch")
+        cache = LLMCache()
+
+        def score_job(path, text):
+            start = time.perf_counter()
+            for attempt in range(BUSY_RETRIES):
+                try:
+                    ats_result = cache.cached_call(ats_prompt(text, jd_text), args.model, generate)
+                    break
+                except SchedulerBusy as e:
+                    if attempt == BUSY_RETRIES - 1:
+                        raise
+                    time.sleep(e.retry_after)
+            return parse_ats_score(ats_result), time.perf_counter() - start
+
+    latencies = []
+    failures = 0
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as extractors, \
+            ThreadPoolExecutor(max_workers=args.concurrency) as scorers, \
+            open(args.state, "a", encoding="utf-8") as state:
+        extraction = {extractors.submit(extract_job, path): path for path in pending}
+        scoring = {}
+        for future in as_completed(extraction):
+            path = extraction[future]
+            try:
+                _, text, extract_seconds = future.result()
+            except Exception as e:
+                failures += 1
+                print(f"❌ {path}: extraction failed: {e}", file=sys.stderr)
+                continue
+            scoring[scorers.submit(score_job, path, text)] = (path, extract_seconds)
+
+        for future in as_completed(scoring):
+            path, extract_seconds = scoring[future]
+            try:
+                ats_score, score_seconds = future.result()
+            except Exception as e:
+                failures += 1
+                print(f"❌ {path}: scoring failed: {e}", file=sys.stderr)
+                continue
+            if ats_score is None:
+                failures += 1
+                print(f"❌ {path}: no score in LLM response", file=sys.stderr)
+                continue
+            resume_name = os.path.basename(path)
+            log_ats_score(resume_name, ats_score, jd_hash=jd_hash, model=scorer_name)
+            state.write(json.dumps({
+                "resume": path,
+                "resume_hash": pending[path],
+                "jd_hash": jd_hash,
+                "model": scorer_name,
+                "score": ats_score
+            }) + "\n")
+            state.flush()
+            latency = extract_seconds + score_seconds
+            latencies.append(latency)
+            print(f"{ats_score:>3}  {latency:6.2f}s  {resume_name}")
+
+    get_record_store().flush()
+    elapsed = time.perf_counter() - started
+    print(f"\nScored {len(latencies)} resumes in {elapsed:.1f}s "
+          f"({len(latencies) / elapsed:.2f} resumes/s), {failures} failed, {skipped} skipped")
+    if latencies:
+        print(f"Per-resume latency: mean {statistics.mean(latencies):.2f}s, "
+              f"p50 {percentile(latencies, 0.5):.2f}s, p95 {percentile(latencies, 0.95):.2f}s, "
+              f"max {max(latencies):.2f}s")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+
+LLM_CACHE_FILE = os.path.join("llm_cache", "responses.sqlite3")
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "500"))
+
+class LLMCache:
+    """
+    Persistent prompt -> completion cache keyed by hash(model, prompt).
+    Least recently used entries are evicted beyond max_entries.
+    """
+
+    def __init__(self, path=LLM_CACHE_FILE, max_entries=LLM_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY, model TEXT, response TEXT,"
+                " created REAL, last_used REAL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    @staticmethod
+    def key(prompt, model):
+        return hashlib.sha256(f"{model}\0{prompt}".encode("utf-8")).hexdigest()
+
+    def get(self, prompt, model):
+        key = self.key(prompt, model)
+        with self._lock, self._connect() as conn:
+            row = conn.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (time.time(), key))
+            return row[0]
+
+    def put(self, prompt, model, response):
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, created, last_used) VALUES (?, ?, ?, ?, ?)",
+                (self.key(prompt, model), model, response, now, now)
+            )
+            conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                " SELECT key FROM responses ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+
+    def cached_call(self, prompt, model, generate):
+        """
+        Return the cached completion for (prompt, model), calling generate(prompt) on a miss.
+        """
+        response = self.get(prompt, model)
+        if response is None:
+            response = generate(prompt)
+            self.put(prompt, model, response)
+        return response
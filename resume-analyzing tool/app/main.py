@@ -1,13 +1,41 @@
+import os
+import sys
 import streamlit as st
+
+# The LLM scheduler is shared with the interview backend (repo root/common)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
 from utils import extract_text_from_pdf, extract_text_from_docx
+from ats_scorer import JobProfile
 from prompts import ats_prompt, resume_rewrite_prompt, cover_letter_prompt
 from ats_logger import log_ats_score
-import re
+from llm_cache import LLMCache
+import queue
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from langchain.llms.ollama import Ollama
+from common.llm_scheduler import SchedulerBusy, get_scheduler, busy_from_error, PRIORITY_HEADER
+
+MODEL_NAME = "llama3"
+OLLAMA_HOST = os.getenv("OLLAMA_HOST", "http://localhost:11434")
 
 # -------------------- Load LLaMA 3 via Ollama --------------------
-# Ollama automatically runs local models (no API key needed)
-llama_llm = Ollama(model="llama3")
+# Ollama automatically runs local models (no API key needed).
+# Cached resources survive Streamlit reruns instead of being rebuilt each time.
+@st.cache_resource
+def get_llm():
+    # Analysis ranks below live interview turns at a shared LLM gateway
+    return Ollama(model=MODEL_NAME, base_url=OLLAMA_HOST, headers={PRIORITY_HEADER: "analysis"})
+
+@st.cache_resource
+def get_llm_cache():
+    return LLMCache()
+
+# Keyed by the uploaded bytes, so unchanged files are not re-extracted
+@st.cache_data(max_entries=64, show_spinner=False)
+def extract_text(data, file_type):
+    if file_type == "application/pdf":
+        return extract_text_from_pdf(data)
+    return extract_text_from_docx(data)
 
 # -------------------- Streamlit App UI --------------------
 st.set_page_config(page_title="Career Copilot", layout="wide")
@@ -20,9 +48,61 @@ jd_file = st.file_uploader("Upload Job Description (PDF/DOCX)", type=["pdf", "do
 role = st.text_input("Target Role")
 optimize = st.radio("Optimize Resume for this Job?", ["Yes", "No"])
 
-# -------------------- LLaMA 3 Call Function --------------------
-def call_llama(prompt):
-    return llama_llm(prompt)
+# -------------------- LLaMA 3 Generations --------------------
+# Concurrent generations, matched to the slots the shared LLM scheduler grants
+# (LLM_MAX_IN_FLIGHT); further sections wait for a free worker
+MAX_PARALLEL_GENERATIONS = get_scheduler().max_in_flight
+# Sections already on screen wait behind interview turns rather than failing busy
+ANALYSIS_QUEUE_TIMEOUT = float(os.getenv("ANALYSIS_QUEUE_TIMEOUT", "600"))
+
+def stream_llama(name, prompt, llm, cache, updates):
+    """
+    Worker: stream one completion into the updates queue as ("chunk", name, text)
+    events followed by ("done", name, full_text). Runs off the Streamlit thread,
+    so the llm and cache are passed in rather than looked up.
+    """
+    try:
+        response = cache.get(prompt, MODEL_NAME)
+        if response is None:
+            parts = []
+            with get_scheduler().slot("analysis", ANALYSIS_QUEUE_TIMEOUT):
+                for chunk in llm.stream(prompt):
+                    parts.append(chunk)
+                    updates.put(("chunk", name, chunk))
+            response = "".join(parts)
+            cache.put(prompt, MODEL_NAME, response)
+        updates.put(("done", name, response))
+    except Exception as e:
+        busy = e if isinstance(e, SchedulerBusy) else busy_from_error(e)
+        if busy is not None:
+            updates.put(("error", name, f"The model is busy with live interviews, please retry in {busy.retry_after}s"))
+        else:
+            updates.put(("error", name, str(e)))
+
+def run_generations(prompts, placeholders):
+    """
+    Run independent prompts concurrently, rendering each section as it streams in.
+    Returns {name: full_text}.
+    """
+    llm, cache = get_llm(), get_llm_cache()
+    updates = queue.Queue()
+    partial = {name: "" for name in prompts}
+    results = {}
+    with ThreadPoolExecutor(max_workers=MAX_PARALLEL_GENERATIONS) as executor:
+        for name, prompt in prompts.items():
+            executor.submit(stream_llama, name, prompt, llm, cache, updates)
+        while len(results) < len(prompts):
+            kind, name, text = updates.get()
+            if kind == "chunk":
+                partial[name] += text
+                placeholders[name].text(partial[name])
+            elif kind == "done":
+                results[name] = text
+                placeholders[name].text(text)
+            else:
+                results[name] = ""
+                placeholders[name].error(f"Generation failed: {text}")
+    return results
 
 # -------------------- Main Workflow --------------------
 if st.button("Submit"):
@@ -30,38 +110,38 @@ if st.button("Submit"):
         st.warning("Please upload all files and enter a target role.")
     else:
         # --- Extract Text from Files ---
-        if resume_file.type == "application/pdf":
-            resume_text = extract_text_from_pdf(resume_file)
-        else:
-            resume_text = extract_text_from_docx(resume_file)
+        resume_text = extract_text(resume_file.getvalue(), resume_file.type)
+        jd_text = extract_text(jd_file.getvalue(), jd_file.type)
 
-        if jd_file.type == "application/pdf":
-            jd_text = extract_text_from_pdf(jd_file)
-        else:
-            jd_text = extract_text_from_docx(jd_file)
-
-        # --- 1. ATS Score ---
-        with st.spinner("Generating ATS score..."):
-            ats_result = call_llama(ats_prompt(resume_text, jd_text))
-        st.subheader("ATS Score & Feedback")
-        st.text(ats_result)
-
-        # Extract numeric ATS score for logging
-        ats_numeric = re.search(r"(\d+)", ats_result)
-        if ats_numeric:
-            ats_score = int(ats_numeric.group(1))
-            log_ats_score(resume_file.name, ats_score)
-            st.subheader("ATS Record Stored")
-            st.text(f"Resume: {resume_file.name} | Score: {ats_score} | Remarks: {'Good' if ats_score >= 70 else 'Bad'}")
-
-        # --- 2. Resume Optimization + Cover Letter ---
+        # --- 1. Deterministic ATS score (local, no LLM) ---
+        ats = JobProfile(jd_text).score(resume_text)
+        ats_score = ats["score"]
+        st.subheader("ATS Score")
+        st.metric("ATS compatibility", f"{ats_score} / 100")
+        st.text(f"Matched keywords: {', '.join(ats['matched_keywords']) or '-'}")
+        st.text(f"Missing keywords: {', '.join(ats['missing_keywords']) or '-'}")
+
+        jd_hash = hashlib.sha256(jd_text.encode("utf-8")).hexdigest()
+        log_ats_score(resume_file.name, ats_score, jd_hash=jd_hash, model="local")
+        st.subheader("ATS Record Stored")
+        st.text(f"Resume: {resume_file.name} | Score: {ats_score} | Remarks: {'Good' if ats_score >= 70 else 'Bad'}")
+
+        # --- 2. LLM feedback, resume optimization and cover letter ---
+        # All prompts depend only on the resume/JD, so they run concurrently
+        prompts = {"ats": ats_prompt(resume_text, jd_text)}
         if optimize == "Yes":
-            with st.spinner("Optimizing resume..."):
-                optimized_resume = call_llama(resume_rewrite_prompt(resume_text, jd_text))
-            st.subheader("Optimized Resume")
-            st.text(optimized_resume)
+            prompts["resume"] = resume_rewrite_prompt(resume_text, jd_text)
+            prompts["cover_letter"] = cover_letter_prompt(resume_text, jd_text, role)
 
-            with st.spinner("Generating cover letter..."):
-                cover_letter = call_llama(cover_letter_prompt(resume_text, jd_text, role))
+        # Sections are laid out up front and filled as results stream in
+        st.subheader("ATS Feedback")
+        placeholders = {"ats": st.empty()}
+        if optimize == "Yes":
+            st.subheader("Optimized Resume")
+            placeholders["resume"] = st.empty()
             st.subheader("Cover Letter")
-            st.text(cover_letter)
+            placeholders["cover_letter"] = st.empty()
+        for placeholder in placeholders.values():
+            placeholder.info("Generating...")
+
+        run_generations(prompts, placeholders)
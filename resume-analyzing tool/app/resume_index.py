@@ -0,0 +1,299 @@
+"""
+Persistent, incrementally updatable resume index for top-k retrieval against a JD.
+
+Storage (under resume_index/ by default):
+  * index.sqlite3    - documents plus an inverted index term -> (doc, tf)
+  * embeddings.f16   - optional memory-mapped float16 matrix, one row per document
+
+Queries rank documents with BM25 over the JD's weighted terms (see ats_scorer)
+and optionally blend in cosine similarity of the compact vectors. Documents can
+be added, re-added (re-indexed only if their content changed) or removed without
+a rebuild.
+
+Examples (run from the app directory):
+    python resume_index.py add ../../interviewbot_backend/uploads resumes/
+    python resume_index.py query --jd jd.pdf -k 20
+    python resume_index.py remove resumes/old.pdf
+"""
+import os
+import sys
+import time
+import sqlite3
+import hashlib
+import argparse
+import threading
+from collections import Counter
+
+import numpy as np
+
+from ats_scorer import tokenize, JobProfile, BM25_K1, BM25_B
+from utils import extract_text_from_path
+from batch_ats import collect_resumes
+
+RESUME_INDEX_DIR = "resume_index"
+RESUME_EXTENSIONS = (".pdf", ".docx", ".txt")
+EMBEDDING_DIM = 256
+# Share of the final score taken by vector similarity when embeddings are on
+EMBEDDING_BLEND = 0.3
+
+def hashed_embedding(terms, dim=EMBEDDING_DIM):
+    """
+    Compact signed feature-hashing vector of a bag of terms (L2-normalized).
+    """
+    vector = np.zeros(dim, dtype=np.float32)
+    for term, count in Counter(terms).items():
+        digest = hashlib.blake2b(term.encode("utf-8"), digest_size=8).digest()
+        bucket = int.from_bytes(digest[:4], "little") % dim
+        sign = 1.0 if digest[4] & 1 else -1.0
+        vector[bucket] += sign * (1.0 + np.log(count))
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+class ResumeIndex:
+    """
+    Inverted index over extracted resume text, stored in SQLite, with optional
+    memory-mapped embedding vectors.
+    """
+
+    def __init__(self, directory=RESUME_INDEX_DIR, embeddings=True, dim=EMBEDDING_DIM):
+        self.directory = directory
+        self.use_embeddings = embeddings
+        self.dim = dim
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(directory, "index.sqlite3"), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS docs (
+                doc_id INTEGER PRIMARY KEY,
+                path TEXT UNIQUE NOT NULL,
+                content_hash TEXT NOT NULL,
+                length INTEGER NOT NULL,
+                slot INTEGER,
+                added REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS postings (
+                term TEXT NOT NULL,
+                doc_id INTEGER NOT NULL,
+                tf INTEGER NOT NULL,
+                PRIMARY KEY (term, doc_id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS postings_doc ON postings (doc_id);
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+            INSERT OR IGNORE INTO meta (key, value) VALUES ('generation', 0);
+        """)
+        self._vectors = None
+        self._doc_lengths = None
+        self._generation = None
+
+    # ---------- embeddings ----------
+
+    def _vector_store(self, min_rows=0):
+        """
+        Memory-mapped (rows x dim) float16 matrix, grown geometrically as needed.
+        """
+        path = os.path.join(self.directory, "embeddings.f16")
+        rows = os.path.getsize(path) // (2 * self.dim) if os.path.exists(path) else 0
+        if self._vectors is None or rows < min_rows or len(self._vectors) != rows:
+            if rows < min_rows:
+                rows = max(min_rows, rows * 2, 1024)
+                with open(path, "ab") as file:
+                    file.truncate(rows * self.dim * 2)
+            self._vectors = np.memmap(path, dtype=np.float16, mode="r+", shape=(rows, self.dim)) if rows else None
+        return self._vectors
+
+    # ---------- updates ----------
+
+    def add(self, path, text=None):
+        """
+        Index a resume. Returns False if it is already indexed with the same content.
+        """
+        path = os.path.abspath(path)
+        if text is None:
+            text = extract_text_from_path(path)
+        content_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        terms = tokenize(text)
+        counts = Counter(terms)
+
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT doc_id, content_hash, slot FROM docs WHERE path = ?", (path,)).fetchone()
+            if row and row[1] == content_hash:
+                return False
+            if row:
+                doc_id = row[0]
+                self._conn.execute("DELETE FROM postings WHERE doc_id = ?", (doc_id,))
+                self._conn.execute(
+                    "UPDATE docs SET content_hash = ?, length = ?, added = ? WHERE doc_id = ?",
+                    (content_hash, len(terms), time.time(), doc_id)
+                )
+            else:
+                doc_id = self._conn.execute(
+                    "INSERT INTO docs (path, content_hash, length, added) VALUES (?, ?, ?, ?)",
+                    (path, content_hash, len(terms), time.time())
+                ).lastrowid
+            # Vector rows are addressed by doc_id; rows of removed docs are simply ignored
+            slot = doc_id if self.use_embeddings else None
+            self._conn.execute("UPDATE docs SET slot = ? WHERE doc_id = ?", (slot, doc_id))
+            self._conn.executemany(
+                "INSERT INTO postings (term, doc_id, tf) VALUES (?, ?, ?)",
+                [(term, doc_id, tf) for term, tf in counts.items()]
+            )
+            if self.use_embeddings and slot is not None:
+                vectors = self._vector_store(min_rows=slot + 1)
+                vectors[slot] = hashed_embedding(terms, self.dim)
+                vectors.flush()
+            self._bump_generation()
+        return True
+
+    def remove(self, path):
+        path = os.path.abspath(path)
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT doc_id FROM docs WHERE path = ?", (path,)).fetchone()
+            if row is None:
+                return False
+            self._conn.execute("DELETE FROM postings WHERE doc_id = ?", (row[0],))
+            self._conn.execute("DELETE FROM docs WHERE doc_id = ?", (row[0],))
+            self._bump_generation()
+        return True
+
+    def _bump_generation(self):
+        """
+        Mark the document set as changed, for every ResumeIndex open on this directory.
+        """
+        self._conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'generation'")
+
+    # ---------- queries ----------
+
+    def _load_doc_stats(self):
+        """
+        Dense arrays indexed by doc_id: length, slot (-1 if none) and a validity mask.
+
+        Cached until the generation in the database moves, which any writer
+        (this instance, another one, or another process) bumps.
+        """
+        generation = self._conn.execute("SELECT value FROM meta WHERE key = 'generation'").fetchone()[0]
+        if self._doc_lengths is None or generation != self._generation:
+            rows = self._conn.execute("SELECT doc_id, length, COALESCE(slot, -1) FROM docs").fetchall()
+            size = max((row[0] for row in rows), default=0) + 1
+            lengths = np.zeros(size, dtype=np.float64)
+            slots = np.full(size, -1, dtype=np.int64)
+            valid = np.zeros(size, dtype=bool)
+            if rows:
+                data = np.array(rows, dtype=np.int64)
+                lengths[data[:, 0]] = data[:, 1]
+                slots[data[:, 0]] = data[:, 2]
+                valid[data[:, 0]] = True
+            self._doc_lengths = (lengths, slots, valid)
+            self._generation = generation
+        return self._doc_lengths
+
+    def query(self, jd_text, k=20):
+        """
+        Top-k resumes for a job description as a list of (path, score) pairs.
+        """
+        profile = JobProfile(jd_text)
+        with self._lock:
+            # One read transaction, so stats and postings come from the same snapshot
+            self._conn.execute("BEGIN")
+            try:
+                return self._query(profile, jd_text, k)
+            finally:
+                self._conn.rollback()
+
+    def _query(self, profile, jd_text, k):
+        """
+        BM25 (plus optional vector) ranking; runs under the lock inside a read transaction.
+        """
+        lengths, slots, valid = self._load_doc_stats()
+        doc_count = int(valid.sum())
+        if doc_count == 0 or not profile.terms:
+            return []
+        avg_length = lengths[valid].mean() or 1.0
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / avg_length)
+
+        scores = np.zeros(len(lengths), dtype=np.float64)
+        for term, weight in zip(profile.terms, profile.weights):
+            rows = self._conn.execute("SELECT doc_id, tf FROM postings WHERE term = ?", (term,)).fetchall()
+            if not rows:
+                continue
+            postings = np.array(rows, dtype=np.int64)
+            doc_ids, tf = postings[:, 0], postings[:, 1].astype(np.float64)
+            known = doc_ids < len(valid)
+            known[known] = valid[doc_ids[known]]
+            doc_ids, tf = doc_ids[known], tf[known]
+            idf = np.log(1 + (doc_count - len(rows) + 0.5) / (len(rows) + 0.5))
+            scores[doc_ids] += weight * idf * tf * (BM25_K1 + 1) / (tf + norm[doc_ids])
+
+        if scores.max() > 0:
+            scores /= scores.max()
+        if self.use_embeddings:
+            vectors = self._vector_store()
+            has_vector = valid & (slots >= 0)
+            if vectors is not None and has_vector.any():
+                query_vector = hashed_embedding(tokenize(jd_text), self.dim)
+                similarity = np.zeros_like(scores)
+                similarity[has_vector] = vectors[slots[has_vector]].astype(np.float32) @ query_vector
+                scores = (1 - EMBEDDING_BLEND) * scores + EMBEDDING_BLEND * np.clip(similarity, 0, 1)
+
+        scores[~valid] = -np.inf
+        k = min(k, doc_count)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        paths = dict(self._conn.execute(
+            f"SELECT doc_id, path FROM docs WHERE doc_id IN ({','.join('?' * len(top))})",
+            [int(doc_id) for doc_id in top]
+        ).fetchall())
+        return [(paths[int(doc_id)], float(scores[doc_id])) for doc_id in top if int(doc_id) in paths]
+
+    def stats(self):
+        with self._lock:
+            docs, terms = self._conn.execute(
+                "SELECT (SELECT COUNT(*) FROM docs), (SELECT COUNT(DISTINCT term) FROM postings)"
+            ).fetchone()
+        return {"documents": docs, "terms": terms, "embeddings": self.use_embeddings}
+
+    def close(self):
+        self._conn.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--index-dir", default=RESUME_INDEX_DIR)
+    parser.add_argument("--no-embeddings", action="store_true", help="BM25 only, no vector store")
+    commands = parser.add_subparsers(dest="command", required=True)
+    add = commands.add_parser("add", help="index resume files, directories or globs")
+    add.add_argument("sources", nargs="+")
+    remove = commands.add_parser("remove", help="drop resumes from the index")
+    remove.add_argument("paths", nargs="+")
+    query = commands.add_parser("query", help="top-k resumes for a job description")
+    query.add_argument("--jd", required=True)
+    query.add_argument("-k", type=int, default=20)
+    commands.add_parser("stats")
+    args = parser.parse_args(argv)
+
+    index = ResumeIndex(args.index_dir, embeddings=not args.no_embeddings)
+    if args.command == "add":
+        added = 0
+        for path in collect_resumes(args.sources, RESUME_EXTENSIONS):
+            try:
+                added += index.add(path)
+            except Exception as e:
+                print(f"❌ {path}: {e}", file=sys.stderr)
+        print(f"Indexed {added} new or changed resumes")
+    elif args.command == "remove":
+        removed = sum(index.remove(path) for path in args.paths)
+        print(f"Removed {removed} resumes")
+    elif args.command == "query":
+        start = time.perf_counter()
+        results = index.query(extract_text_from_path(args.jd), args.k)
+        elapsed = time.perf_counter() - start
+        for rank, (path, score) in enumerate(results, 1):
+            print(f"{rank:>3}. {score:.3f}  {path}")
+        print(f"\n{len(results)} results in {elapsed * 1000:.1f} ms")
+    else:
+        print(index.stats())
+    index.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
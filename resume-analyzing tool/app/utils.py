@@ -1,16 +1,37 @@
-import PyPDF2
-import docx
+import os
+import re
+import sys
+
+# The extraction engine is shared with the interview backend (repo root/common)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from common.extraction import extract_pdf_text, extract_docx_text, extract_text
 
 def extract_text_from_pdf(file):
-    pdf_reader = PyPDF2.PdfReader(file)
-    text = ""
-    for page in pdf_reader.pages:
-        text += page.extract_text() + "\n"
-    return text
+    return extract_pdf_text(file)
 
 def extract_text_from_docx(file):
-    doc = docx.Document(file)
-    text = ""
-    for para in doc.paragraphs:
-        text += para.text + "\n"
-    return text
+    return extract_docx_text(file)
+
+def extract_text_from_path(path):
+    """
+    Extract text from a PDF, DOCX or TXT file on disk, dispatching on the extension.
+    """
+    return extract_text(path)
+
+# Tried in order: a number following the word "score" ("1. ATS Score: 85", "a score of 72%"),
+# then a bare "85/100" or "85 out of 100"
+SCORE_PATTERNS = (
+    re.compile(r"score\b[^\d\n]{0,40}?(\d{1,3})(?!\d|\.\d)", re.IGNORECASE),
+    re.compile(r"(?<![\d.])(\d{1,3})\s*(?:/|out of)\s*100\b", re.IGNORECASE),
+)
+
+def parse_ats_score(ats_result):
+    """
+    Pull the numeric ATS score (0-100) out of the LLM's free-form feedback, or None.
+    """
+    for pattern in SCORE_PATTERNS:
+        for match in pattern.finditer(ats_result):
+            score = int(match.group(1))
+            if score <= 100:
+                return score
+    return None
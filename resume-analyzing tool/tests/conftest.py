@@ -0,0 +1,6 @@
+import os
+import sys
+
+# The app modules import each other as top-level modules, as when run from the app directory
+APP_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app")
+sys.path.insert(0, APP_DIR)
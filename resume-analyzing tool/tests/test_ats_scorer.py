@@ -0,0 +1,34 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from ats_scorer import JobProfile, tokenize
+
+JD = """
+Backend Engineer
+Requirements: Python, Go, PostgreSQL, Docker and Kubernetes.
+Must have experience designing REST API services and microservices.
+Nice to have: Kafka, Terraform, observability tooling.
+"""
+
+@pytest.fixture(scope="module")
+def profile():
+    return JobProfile(JD)
+
+def test_one_mention_of_every_term_scores_full_marks(profile):
+    assert profile.score(" ".join(profile.terms))["score"] == 100
+
+def test_repeats_do_not_make_up_for_missing_terms(profile):
+    half = profile.terms[::2]
+    once = profile.score(" ".join(half))["score"]
+    stuffed = profile.score(" ".join(half * 20))["score"]
+    assert once < stuffed <= once + 10
+    assert stuffed < 75
+
+def test_empty_resume_scores_zero(profile):
+    assert profile.score("")["score"] == 0
+
+def test_go_is_a_skill_only_when_capitalised():
+    assert "golang" in tokenize("Built services in Go and Python")
+    assert "golang" not in tokenize("Ready to go the extra mile")
+    assert JobProfile(JD).score("Golang developer")["matched_keywords"] == ["golang"]
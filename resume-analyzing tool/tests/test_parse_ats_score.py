@@ -0,0 +1,15 @@
+import pytest
+
+from utils import parse_ats_score
+
+@pytest.mark.parametrize("feedback, expected", [
+    ("1. Score: 85\n2. Missing skills: Docker", 85),
+    ("Missing 3 keywords.\nATS compatibility score: 72/100", 72),
+    ("Overall, I'd give this resume a score of 64%.", 64),
+    ("ATS Score - 90.", 90),
+    ("Top 5 gaps listed below. Estimated match: 78 out of 100", 78),
+    ("Score: 8.5/10 formatting; overall score 70", 70),
+    ("No numeric assessment given.", None),
+])
+def test_parse_ats_score(feedback, expected):
+    assert parse_ats_score(feedback) == expected
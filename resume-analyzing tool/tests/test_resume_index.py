@@ -0,0 +1,26 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from resume_index import ResumeIndex
+
+JD = "Backend Engineer. Requirements: Python, PostgreSQL, Docker and Kubernetes."
+
+def test_query_sees_documents_added_by_another_instance(tmp_path):
+    reader = ResumeIndex(str(tmp_path))
+    writer = ResumeIndex(str(tmp_path))
+    writer.add(str(tmp_path / "a.txt"), text="Python developer with PostgreSQL")
+    assert [path for path, _ in reader.query(JD)] == [str(tmp_path / "a.txt")]
+
+    writer.add(str(tmp_path / "b.txt"), text="Python, Docker and Kubernetes on PostgreSQL")
+    assert [path for path, _ in reader.query(JD)] == [str(tmp_path / "b.txt"), str(tmp_path / "a.txt")]
+
+def test_query_drops_documents_removed_by_another_instance(tmp_path):
+    reader = ResumeIndex(str(tmp_path))
+    writer = ResumeIndex(str(tmp_path))
+    writer.add(str(tmp_path / "a.txt"), text="Python developer with PostgreSQL")
+    writer.add(str(tmp_path / "b.txt"), text="Docker and Kubernetes operator")
+    assert len(reader.query(JD)) == 2
+
+    writer.remove(str(tmp_path / "a.txt"))
+    assert [path for path, _ in reader.query(JD)] == [str(tmp_path / "b.txt")]